@@ -0,0 +1,175 @@
+'''	Measure startup of editor and check it against budgets.
+
+	Usage: python bench/startup.py [tabcount ...]
+
+	First, time of 'import simple_editor' is measured with -X importtime
+	and slowest imports are listed. Modules in DEFERRED must not be
+	imported by it.
+
+	Then, for every tabcount, a temporary directory with that many
+	python-files and an editor.cnf listing them as tabs is created,
+	and editor is started there in a fresh interpreter. Time from start
+	of Editor() to first idle (ready for first keystroke) is measured.
+	This part needs a display.
+
+	Exit status is 1 if some measurement is over its budget.
+'''
+
+import subprocess
+import tempfile
+import pathlib
+import json
+import sys
+import os
+
+
+# Seconds
+IMPORT_BUDGET = 0.1
+STARTUP_BUDGET = 0.5
+
+TABCOUNTS = [1, 10, 50, 150]
+
+# Lines in each generated file
+LINES = 2000
+
+# How many slowest imports are shown
+SHOW_IMPORTS = 10
+
+# Modules imported only where they are used, not at startup
+DEFERRED = ['subprocess', 'ast', 'tempfile']
+
+# Package is imported from here, not from installed one
+SRC = pathlib.Path(__file__).resolve().parent.parent / 'src'
+
+CHILD = '''
+import time
+import simple_editor
+
+e = simple_editor.Editor()
+while e.startup_time is None:
+	e.update()
+	time.sleep(0.001)
+
+print(e.startup_time)
+e.destroy()
+'''
+
+
+def environment():
+	'''	Environment of child interpreters, so that they import package
+		from SRC also when run in temporary directory.
+	'''
+	env = dict(os.environ)
+	paths = [str(SRC), env.get('PYTHONPATH')]
+	env['PYTHONPATH'] = os.pathsep.join(filter(None, paths))
+	return env
+
+
+def import_times():
+	'''	Returns list of (cumulative seconds, module), slowest first.
+	'''
+	res = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+		'import simple_editor'], stderr=subprocess.PIPE, check=True,
+		env=environment())
+
+	times = list()
+
+	for line in res.stderr.decode().splitlines():
+		if not line.startswith('import time:') or 'cumulative' in line:
+			continue
+
+		selftime, cumulative, module = line[12:].split('|')
+		times.append((int(cumulative) / 1e6, module.rstrip()))
+
+	times.sort(reverse=True)
+	return times
+
+
+def imported_deferred():
+	'''	Returns list of modules in DEFERRED imported by
+		'import simple_editor'.
+	'''
+	code = 'import sys, simple_editor; print(*sys.modules)'
+	res = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE,
+		check=True, env=environment())
+
+	modules = set(res.stdout.decode().split())
+	return [ module for module in DEFERRED if module in modules ]
+
+
+def make_session(directory, tabcount):
+	tabs = list()
+
+	for i in range(tabcount):
+		path = directory / ('module_%d.py' % i)
+		path.write_text(''.join('x_%d = %d\n' % (j, j) for j in range(LINES)),
+			encoding='utf-8')
+
+		tabs.append(dict(active=(i == tabcount - 1), filepath=str(path),
+			contents='', position='1.0', type='normal'))
+
+	conf = dict(
+		fgcolor='#000000', bgcolor='#D3D7CF',
+		fgdaycolor='#000000', bgdaycolor='#D3D7CF',
+		fgnightcolor='#D3D7CF', bgnightcolor='#000000',
+		curcolor='day', lastdir=str(directory),
+		font=dict(family='TkFixedFont', size=12),
+		menufont=dict(family='TkDefaultFont', size=10),
+		scrollbar_width=30, elementborderwidth=4,
+		tabs=tabs
+		)
+
+	(directory / 'editor.cnf').write_text(json.dumps(conf), encoding='utf-8')
+
+
+def measure(tabcount):
+	with tempfile.TemporaryDirectory() as tmpdir:
+		directory = pathlib.Path(tmpdir)
+		make_session(directory, tabcount)
+
+		res = subprocess.run([sys.executable, '-c', CHILD], cwd=directory,
+			stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+			env=environment())
+
+		return float(res.stdout.decode().split()[-1])
+
+
+if __name__ == '__main__':
+	counts = [ int(arg) for arg in sys.argv[1:] ] or TABCOUNTS
+	failed = False
+
+	times = import_times()
+	print('Slowest imports, cumulative:')
+
+	for seconds, module in times[:SHOW_IMPORTS]:
+		print('  %.4f s  %s' % (seconds, module))
+
+	total = dict((module.strip(), seconds) for seconds, module in times)['simple_editor']
+	if total > IMPORT_BUDGET:
+		print('OVER BUDGET: import simple_editor %.3f s > %.3f s' % (total, IMPORT_BUDGET))
+		failed = True
+
+	imported = imported_deferred()
+	if imported:
+		print('IMPORTED AT STARTUP: %s' % ', '.join(imported))
+		failed = True
+
+	print('\nEditor() to first idle:')
+
+	for count in counts:
+		try:
+			seconds = measure(count)
+		except subprocess.CalledProcessError as e:
+			print(e.stderr.decode(errors='replace'))
+			print('Could not start editor')
+			failed = True
+			break
+
+		print('  %4d tabs: %.3f s' % (count, seconds))
+
+		if seconds > STARTUP_BUDGET:
+			print('OVER BUDGET: %.3f s > %.3f s' % (seconds, STARTUP_BUDGET))
+			failed = True
+
+	sys.exit(1 if failed else 0)
+
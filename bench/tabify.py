@@ -0,0 +1,113 @@
+'''	Compare simple_editor.tabify with per-line tabify used earlier in
+	Editor.save, on large generated inputs.
+
+	Usage: python bench/tabify.py [linecount ...]
+
+	For every linecount, inputs with different kinds of indentation are
+	generated. Both implementations are timed and their output is checked
+	to be identical. Exit status is 1 if outputs differ.
+'''
+
+import random
+import time
+import sys
+
+from simple_editor.tabify import tabify
+
+
+TAB_WIDTH = 4
+
+LINECOUNTS = [10000, 50000, 200000]
+
+# Best of this many runs is shown
+REPEAT = 3
+
+
+def tabify_line(line):
+	'''	Earlier Editor.tabify, kept here as reference.
+	'''
+	indent_stop_index = 0
+
+	for char in line:
+		if char in [' ', '\t']: indent_stop_index += 1
+		else: break
+
+	if indent_stop_index == 0: return line
+
+	indent_string = line[:indent_stop_index]
+	line = line[indent_stop_index:]
+
+	count = 0
+	for char in indent_string:
+		if char == '\t':
+			count = 0
+			continue
+		if char == ' ': count += 1
+		if count == TAB_WIDTH:
+			indent_string = indent_string.replace(TAB_WIDTH * ' ', '\t', True)
+			count = 0
+
+	tabified_line = ''.join([indent_string, line])
+	return tabified_line
+
+
+def tabify_lines(text):
+	tmp = text.splitlines(True)
+	tmp[:] = [tabify_line(line) for line in tmp]
+	return ''.join(tmp)
+
+
+def make_text(linecount, pieces):
+	'''	Lines have random indentation made of pieces, and some spaces
+		also after indentation.
+	'''
+	rand = random.Random(linecount)
+	lines = list()
+
+	for i in range(linecount):
+		indent = ''.join(rand.choice(pieces) for j in range(rand.randint(0, 6)))
+		lines.append('%sx_%d = %d    # comment\n' % (indent, i, i))
+
+	return ''.join(lines)
+
+
+INPUTS = {
+	'tabs': ['\t'],
+	'spaces': [TAB_WIDTH * ' '],
+	'mixed': [TAB_WIDTH * ' ', '\t', '  ', ' '],
+	}
+
+
+def best(func, text):
+	times = list()
+
+	for i in range(REPEAT):
+		start = time.perf_counter()
+		res = func(text)
+		times.append(time.perf_counter() - start)
+
+	return min(times), res
+
+
+if __name__ == '__main__':
+	counts = [ int(arg) for arg in sys.argv[1:] ] or LINECOUNTS
+	failed = False
+
+	print('%8s %8s %10s %10s %8s' % ('lines', 'indent', 'per-line', 'tabify', 'speedup'))
+
+	for count in counts:
+		for name, pieces in INPUTS.items():
+			text = make_text(count, pieces)
+
+			old_time, old_res = best(tabify_lines, text)
+			new_time, new_res = best(lambda text: tabify(text, TAB_WIDTH), text)
+
+			print('%8d %8s %9.4fs %9.4fs %7.1fx' % (count, name, old_time,
+				new_time, old_time / new_time))
+
+			if old_res != new_res:
+				print('OUTPUT DIFFERS: %d lines, %s' % (count, name))
+				failed = True
+
+	sys.exit(1 if failed else 0)
+
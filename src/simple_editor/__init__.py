@@ -11,11 +11,16 @@
 # Constants
 # Tab Related
 # Configuration Related
+# Journal Related
+# File Watching
+# View Related
+# Follow Related
 # Theme Related
 # Run file Related
 # Overrides
 # Save and Load
 # Gotoline and Help
+# Quick Open
 # Indent and Comment
 # Search
 # Replace
@@ -30,31 +35,71 @@
 
 # from standard library
 import tkinter.scrolledtext
-import tkinter.colorchooser
-import tkinter.filedialog
 import tkinter.font
 import tkinter
 import pathlib
-import random
+import hashlib
 import json
+import time
+import zlib
+import sys
 import os
 
-import pkg_resources
+# Rarely needed modules are imported where they are used, to keep
+# startup fast: importlib.resources, tkinter.colorchooser,
+# tkinter.filedialog, random, concurrent.futures and subprocess.
+# Same for runner, which imports subprocess, tempfile and selectors.
 
 # from current directory
 from . import changefont
-
-# for executing edited file in the same env than this editor, which is nice:
-# It means you have your installed dependencies available. By self.run()
-import subprocess
-
+from . import checkpoint
+from . import fileindex
+from . import filewatch
+from . import follow
+from . import fontcache
+from . import journal
+from . import loader
+from . import projectfiles
+from . import savequeue
+from . import tabify
+from . import tabview
+from . import tracelinks
+from . import undo
+from . import viewer
+
+def resource(name):
+	'''	Return importlib.resources.abc.Traversable of file name
+		in this package.
+	'''
+	import importlib.resources
+	
+	return importlib.resources.files(__name__) / name
+	
 ############ Imports End
 ############ Class Tab Begin
 
+def checksum(contents):
+	'''	Used to check if contents of a tab are same as in disk.
+	'''
+	return hashlib.blake2b(contents.encode('utf-8'), digest_size=16).digest()
+
+
 class Tab:
 	'''	Represents a tab-page of an Editor-instance
+	
+		Contents of inactive tab can be hibernated: dropped if they are
+		same as in disk, or else compressed in memory. Dropped contents
+		are None and are read again in Editor.load_tab(), compressed are
+		decompressed there once with wake(). Until then, they are
+		decompressed when contents is accessed.
 	'''
 	
+	# Saved to configuration file
+	fields = ('active', 'filepath', 'contents', 'position', 'type')
+	
+	__slots__ = ('active', 'filepath', 'position', 'type',
+				'touched', 'diskhash', 'undo', '_contents', '_packed', '_hash')
+	
 	def __init__(self, **entries):
 		self.active = True
 		self.filepath = None
@@ -62,7 +107,122 @@ class Tab:
 		self.position = '1.0'
 		self.type = 'newtab'
 		
-		self.__dict__.update(entries)
+		# time.monotonic() when tab was last shown
+		self.touched = time.monotonic()
+		# checksum() of contents when last read from or written to disk
+		self.diskhash = None
+		# undo.UndoStack, set when tab is shown first time
+		self.undo = None
+		
+		for key, value in entries.items():
+			if key in Tab.fields:
+				setattr(self, key, value)
+	
+	
+	@property
+	def contents(self):
+		if self._packed is not None:
+			return zlib.decompress(self._packed).decode('utf-8')
+			
+		return self._contents
+		
+		
+	@contents.setter
+	def contents(self, value):
+		self._contents = value
+		self._packed = None
+		self._hash = None
+		
+		
+	@property
+	def contenthash(self):
+		'''	checksum() of contents, computed once per change of contents.
+			None if contents are not loaded.
+		'''
+		if self._hash is None and not self.dropped:
+			self._hash = checksum(self.contents)
+			
+		return self._hash
+		
+		
+	@property
+	def dirty(self):
+		'''	True if contents differ from file in disk. Changes in widget
+			of tab are not seen here until they are synced to tab,
+			see Editor.tab_dirty()
+		'''
+		if self.type != 'normal':
+			return False
+			
+		# Not loaded or dropped in hibernate(), so same as in disk
+		if self.dropped:
+			return False
+			
+		return self.contenthash != self.diskhash
+		
+		
+	@property
+	def readonly(self):
+		'''	View-tabs and follow-tabs show file, but can not be edited.
+		'''
+		return self.type in ('view', 'follow')
+		
+		
+	@property
+	def asleep(self):
+		return self._contents is None
+		
+		
+	@property
+	def dropped(self):
+		'''	True if contents are not loaded yet, or were dropped
+			in hibernate(). Compressed contents are not decompressed.
+		'''
+		return self._contents is None and self._packed is None
+		
+		
+	def hibernate(self):
+		if self.asleep:
+			return
+			
+		if self.type == 'normal' and not self.dirty:
+			self._contents = None
+		else:
+			self._packed = zlib.compress(self._contents.encode('utf-8'), 1)
+			self._contents = None
+			
+			
+	def wake(self):
+		'''	Decompress contents compressed in hibernate(), so that
+			they are not decompressed again on every access.
+		'''
+		if self._packed is not None:
+			self._contents = zlib.decompress(self._packed).decode('utf-8')
+			self._packed = None
+		
+		
+	def resident_size(self):
+		'''	Bytes used for contents of this tab.
+		'''
+		if self._packed is not None:
+			return sys.getsizeof(self._packed)
+		elif self._contents is not None:
+			return sys.getsizeof(self._contents)
+		else:
+			return 0
+			
+	
+	def asdict(self, position=None):
+		'''	Configuration of tab for serialization, contents are not included.
+			position is used instead of self.position if given.
+		'''
+		return dict(
+			active=self.active,
+			filepath=(self.filepath.__str__() if self.filepath else None),
+			contents='',
+			position=(position or self.position),
+			type=self.type
+			)
 		
 		
 	def __str__(self):
@@ -99,6 +259,69 @@ CONFPATH = pathlib.Path().cwd() /'editor.cnf'
 TAB_WIDTH = 4
 TAB_WIDTH_CHAR = ' '
 
+# When restoring session, only active tab is read from disk before
+# window is shown. Rest are read in background by this many threads.
+PREFETCH_WORKERS = 8
+# ms, how often finished background reads are collected
+PREFETCH_INTERVAL = 50
+
+# Inactive tabs are hibernated, least recently shown first, when their
+# contents take more than MEMORY_BUDGET bytes. Tabs shown during last
+# HIBERNATE_AGE seconds are left alone. Check is done every
+# HIBERNATE_INTERVAL ms.
+MEMORY_BUDGET = 64 * 2**20
+HIBERNATE_AGE = 300
+HIBERNATE_INTERVAL = 10000
+
+# ms, how often configuration is checkpointed to CONFPATH
+CHECKPOINT_INTERVAL = 30000
+
+# ms, how often finished background writes of files are collected
+SAVE_INTERVAL = 50
+
+# ms, how often set of watched files is updated, and files are polled
+# if inotify can not be used
+WATCH_INTERVAL = 2000
+
+# ms, how often chunks of large file being loaded are inserted, and
+# seconds used for inserting at a time. Files larger than
+# loader.LARGE_FILE bytes are loaded in chunks.
+LOAD_INTERVAL = 10
+LOAD_BUDGET = 0.02
+
+# Journal of tab is replaced with snapshot of its contents when it has
+# more edits than this. Checked when configuration is checkpointed.
+JOURNAL_COMPACT = 5000
+
+# Lines of file in widget of view-tab at a time, and how near to first or
+# last of them view can be scrolled before they are replaced.
+VIEW_WINDOW = 2000
+VIEW_MARGIN = 200
+
+# ms, how often files of follow-tabs are checked for new lines, and max
+# count of lines kept in follow-tab, older lines are dropped.
+FOLLOW_INTERVAL = 500
+FOLLOW_LINES = 10000
+
+# ms, how often results of quick-open are updated while project
+# files are being indexed
+QUICKOPEN_INTERVAL = 200
+
+# ms, how often output of running file is collected, and seconds used for
+# inserting it at a time. ms to wait after stopping before killing.
+RUN_INTERVAL = 50
+RUN_BUDGET = 0.02
+STOP_GRACE = 2000
+
+# Max count of rows in profile tables, see profile() and memory()
+PROFILE_ROWS = 100
+
+# Count of runs of every file kept in run history, see record_run()
+RUN_HISTORY = 5
+
+# ms, saves of watched files within this are run once, see toggle_watch()
+WATCH_DELAY = 300
+
 # This is list because order matters, best ones at the start etc..
 GOODFONTS = [
 			'Noto Mono',
@@ -109,15 +332,7 @@ GOODFONTS = [
 			'DejaVu Sans Mono'
 			]
 		
-BADFONTS = frozenset([
-					'Standard Symbols PS',
-					'OpenSymbol',
-					'Noto Color Emoji',
-					'FontAwesome',
-					'Dingbats',
-					'Droid Sans Fallback',
-					'D050000L'
-					])
+# Font families not suitable for editor are in fontcache.BADFONTS
 					
 			
 ############ Constants End
@@ -126,6 +341,8 @@ BADFONTS = frozenset([
 class Editor(tkinter.Toplevel):
 
 	def __init__(self):
+		self.starttime = time.perf_counter()
+		self.startup_time = None
 		self.root = tkinter.Tk().withdraw()
 		super().__init__(self.root, class_='Simple Editor')
 		self.protocol("WM_DELETE_WINDOW", self.quit_me)
@@ -139,10 +356,91 @@ class Editor(tkinter.Toplevel):
 		self.search_pos = 0
 		self.old_word = ''
 		self.new_word = ''
-		self.errlines = list()
 		self.lastdir = None
+		# Output of last run and locations of tracebacks in it
+		self.tracelinks = tracelinks.TraceLinks()
+		# True when self.infotext shows output of last run
+		self.showing_output = False
+		# Profile of last run if it was profiled: record sent by capture.py,
+		# and its table: order for every kind of profile and index of its
+		# first line in self.tracelinks.lines
+		self.profile_data = None
+		self.profile_orders = {'profile': 'cumulative time', 'memory': 'size'}
+		self.profile_start = 0
+		# Filepath as key, sizes of lines in last memory-run of it as value,
+		# and sizes before last memory-run, see memory()
+		self.memory_sizes = dict()
+		self.memory_previous = None
 		self.state = 'normal'
 		
+		# Tab as key, concurrent.futures.Future as value
+		self.prefetch = dict()
+		self.prefetcher = None
+		self.memory_budget = MEMORY_BUDGET
+		self.undohistory = undo.UndoHistory()
+		self.fileindex = fileindex.FileIndex()
+		self.checkpointer = checkpoint.CheckpointWriter(CONFPATH)
+		self.savequeue = savequeue.SaveQueue()
+		# True when poll_saves() is scheduled
+		self.saving = False
+		self.journal = journal.Journal()
+		# Started when editor is ready, see start_watching()
+		self.filewatch = None
+		# Tabs with unsaved changes whose files have changed in disk
+		self.conflicts = set()
+		# loader.FileReader of file being loaded, see start_load()
+		self.loader = None
+		self.loaded = list()
+		self.loadwidget = None
+		self.loadhooks = None
+		# Tab as key, viewer.FileView as value, see view_open()
+		self.views = dict()
+		# Tab as key, follow.Follower as value, see follow_file()
+		self.followers = dict()
+		# True when follow_files() is scheduled
+		self.following = False
+		# projectfiles.ProjectIndex of cwd, started on first quick_open()
+		self.projectindex = None
+		self.matcher = projectfiles.Matcher()
+		self.quickopen_query = None
+		self.quickopen_results = list()
+		self.quickopen_index = 0
+		# True when quick_open_update() is scheduled
+		self.quickopen_pending = False
+		# runner.Runner of file being run, see run()
+		self.runner = None
+		# If use_forkserver is True, files are run by forking from
+		# runner.ForkServer which has imported modules in self.preload
+		self.use_forkserver = False
+		self.preload = list()
+		self.forkserver = None
+		# Exceptions sent by run file in addition to uncaught ones,
+		# see capture.py
+		self.capture_logging = True
+		self.capture_handled = False
+		# If True, imports are also timed when profiling
+		self.profile_importtime = False
+		# Seconds, interval of memory snapshots, 0 for only at exit
+		self.memory_interval = 0
+		# Limits of run: seconds of wall time and cpu time, and MiB of
+		# address space, 0 for no limit
+		self.run_timeout = 0
+		self.run_cpu_limit = 0
+		self.run_memory_limit = 0
+		# File being run or last run, and whether it was stopped by timeout
+		self.run_filepath = None
+		self.run_timedout = False
+		# Filepath as key, list of resource usages of its runs as value
+		self.run_history = dict()
+		# Tab in watch-mode, resolved paths of files it can import, and id
+		# of scheduled watch_run(), see toggle_watch()
+		self.watching = None
+		self.watch_paths = set()
+		self.watch_after = None
+		# Output lines of previous run still in self.infotext when file
+		# is run again in watch-mode, see insert_output()
+		self.stale_output = None
+		
 		self.font = tkinter.font.Font(size=12)
 		self.menufont = tkinter.font.Font(size=10)
 		
@@ -166,42 +464,37 @@ class Editor(tkinter.Toplevel):
 		self.bind( "<Alt-t>", self.toggle_color)
 		self.bind( "<Alt-e>", self.open_eggs)
 		self.bind( "<Alt-w>", self.walk_files)
+		self.bind( "<Alt-v>", self.view_file)
+		self.bind( "<Alt-f>", self.follow_file)
+		self.bind( "<Alt-o>", self.quick_open)
+		self.bind( "<Alt-k>", self.stop_run)
+		self.bind( "<Alt-s>", self.sort_profile)
+		self.bind( "<Alt-r>", self.toggle_watch)
 		
-		if pkg_resources.resource_exists(__name__, ICONPATH):
-			realpath = pkg_resources.resource_filename(__name__, ICONPATH)
-			
-			try:
-				self.pic = tkinter.Image("photo", file=realpath)
-				self.tk.call('wm','iconphoto', self._w, self.pic)
-			except tkinter.TclError as e:
-				print(e)
-		
-		if pkg_resources.resource_exists(__name__, HELPPATH):
-			self.helptxt = pkg_resources.resource_string(__name__, HELPPATH)
+		# Icon is set when editor is ready, and help is read in help()
+		self.pic = None
+		self.helptxt = None
 		
 		
 		# Layout Begin:
 		####################################################
-		self.contents = tkinter.scrolledtext.ScrolledText(self, blockcursor=True, undo=True, maxundo=-1, autoseparators=True, tabstyle='wordprocessor')
-		
-		self.contents.tag_config('match', background='lightyellow', foreground='black')
-		self.contents.tag_config('found', background='lightgreen')
-		self.contents.pack(side=tkinter.BOTTOM, expand=True, fill=tkinter.BOTH)
-							
-		self.contents.bind( "<Return>", self.return_override)
-		self.contents.bind( "<Control-d>", self.del_tab)
-		self.contents.bind( "<Control-C>", self.comment)
-		self.contents.bind( "<Control-X>", self.uncomment)
-		self.contents.bind( "<Tab>", self.tab_override)
-		self.contents.bind( "<ISO_Left_Tab>", self.unindent)
-		self.contents.bind( "<Control-a>", self.select_all)
-		self.contents.bind( "<Control-z>", self.undo_override)
-		self.contents.bind( "<Control-Z>", self.redo_override)
-		self.contents.bind( "<Control-v>", self.paste)
-		self.contents.bind( "<Control-BackSpace>", self.search_next)
-
-		# Needed in leave() taglink in: Run file Related
-		self.name_of_cursor_in_text_widget = self.contents['cursor']
+		
+		# Every tab has its own Text-widget, self.contents is the one
+		# currently shown. Errors and help are shown in self.infotext.
+		self.tabview = tabview.TabView(self, self.create_textwidget)
+		self.tabview.frame.pack(side=tkinter.BOTTOM, expand=True, fill=tkinter.BOTH)
+		self.infotext = self.tabview.add_view()
+		self.contents = self.infotext
+		
+		# Every link in output of run has same tag, location of clicked
+		# line is found from self.tracelinks. Hovered link is underlined.
+		# Why ButtonRelease instead of just Button-1:
+		# https://stackoverflow.com/questions/24113946/unable-to-move-text-insert-index-with-mark-set-widget-function-python-tkint
+		self.infotext.tag_config('hover', underline=1)
+		self.infotext.tag_bind('link', "<ButtonRelease-1>", self.lclick)
+		self.infotext.tag_bind('link', "<Enter>", self.enter)
+		self.infotext.tag_bind('link', "<Motion>", self.enter)
+		self.infotext.tag_bind('link', "<Leave>", self.leave)
 		
 		self.popup_whohasfocus = None
 		self.popup = tkinter.Menu(self, tearoff=0, bd=0, activeborderwidth=0)
@@ -214,6 +507,8 @@ class Editor(tkinter.Toplevel):
 		self.popup.add_command(label="   uncomment", command=self.uncomment)
 		self.popup.add_command(label="      errors", command=self.show_errors)
 		self.popup.add_command(label="         run", command=self.run)
+		self.popup.add_command(label="     profile", command=self.profile)
+		self.popup.add_command(label="      memory", command=self.memory)
 		self.popup.add_command(label="        help", command=self.help)
 		
 		self.entry = tkinter.Entry(self)
@@ -255,7 +550,9 @@ class Editor(tkinter.Toplevel):
 			fontname = None
 			randfont = False
 						
-			fontfamilies = [f for f in tkinter.font.families() if f not in BADFONTS]
+			import random
+			
+			fontfamilies = fontcache.families()
 			random.shuffle(fontfamilies)
 			
 			for fontname in GOODFONTS:
@@ -273,11 +570,11 @@ class Editor(tkinter.Toplevel):
 		
 			self.scrollbar_width = 30
 			self.elementborderwidth = 4	
-			self.contents.vbar.config(width=self.scrollbar_width)
-			self.contents.vbar.config(elementborderwidth=self.elementborderwidth)
+			self.tabview.config_vbar(width=self.scrollbar_width,
+				elementborderwidth=self.elementborderwidth)
 			
 			self.tab_width = self.font.measure(TAB_WIDTH * TAB_WIDTH_CHAR)
-			self.contents.config(font=self.font, foreground=self.fgcolor,
+			self.tabview.config(font=self.font, foreground=self.fgcolor,
 				background=self.bgcolor, insertbackground=self.fgcolor, 
 				tabs=(self.tab_width, ))
 				
@@ -290,7 +587,19 @@ class Editor(tkinter.Toplevel):
 				print(f'WARNING: RANDOM FONT NAMED "{fontname.upper()}" IN USE. Select a better font with: ctrl-p')
 		
 		
-		self.title(self.titlepattern % (self.tabindex + 1, len(self.tabs)))
+		self.update_title()
+		self.after_idle(self.startup_done)
+		self.after_idle(self.set_icon)
+		self.after_idle(self.start_watching)
+		self.after_idle(self.start_forkserver)
+		self.after(HIBERNATE_INTERVAL, self.hibernate_tabs)
+		
+		self.checkpointer.start()
+		self.after(CHECKPOINT_INTERVAL, self.checkpoint)
+		self.savequeue.start()
+		
+		self.recover_journal()
+		self.journal.start()
 
 		############################# init End ######################
 		
@@ -300,8 +609,68 @@ class Editor(tkinter.Toplevel):
 		return 'break'
 		
 		
+	def startup_done(self):
+		'''	Called when editor is first time idle, that is: ready for
+			first keystroke. Time from start of __init__ is saved to
+			self.startup_time, it is used in bench/startup.py
+		'''
+		self.startup_time = time.perf_counter() - self.starttime
+		
+		
+	def set_icon(self):
+		import importlib.resources
+		
+		iconpath = resource(ICONPATH)
+		if not iconpath.is_file():
+			return
+			
+		with importlib.resources.as_file(iconpath) as realpath:
+			try:
+				self.pic = tkinter.Image("photo", file=realpath)
+				self.tk.call('wm','iconphoto', self._w, self.pic)
+			except tkinter.TclError as e:
+				print(e)
+		
+		
 	def quit_me(self):
+		if self.loader:
+			self.cancel_load()
+			
+		for view in self.views.values():
+			view.close()
+			
+		for follower in self.followers.values():
+			follower.close()
+			
+		if self.projectindex:
+			self.projectindex.cancel()
+			
+		if self.runner:
+			self.runner.kill()
+			
+		self.watching = None
+		self.cancel_watch_run()
+			
+		if self.forkserver:
+			self.forkserver.stop()
+			
+		if self.prefetcher:
+			self.prefetcher.shutdown(wait=False)
+			
 		self.save(forced=True)
+		# Finish writes before quitting
+		self.savequeue.stop()
+		self.collect_saves()
+		
+		# Keep journals of tabs that could not be saved. Files of
+		# conflicting tabs have changed, so their journals need snapshot.
+		for tab in self.tabs:
+			if tab.type == 'newtab' or not self.tab_dirty(tab):
+				self.journal.detach(tab, remove=True)
+			elif tab in self.conflicts and self.journal.isopen(tab):
+				self.snapshot_journal(tab)
+				
+		self.journal.stop()
 		self.save_config()
 		self.clipboard_clear()
 		self.quit()
@@ -309,13 +678,12 @@ class Editor(tkinter.Toplevel):
 	
 		
 	def open_eggs(self, event=None):
-		if pkg_resources.resource_exists(__name__, 'hen.egg') and \
-			pkg_resources.resource_exists(__name__, 'moon.egg'):
-			
-			henpath  = pkg_resources.resource_filename(__name__, 'hen.egg')
-			moonpath = pkg_resources.resource_filename(__name__, 'moon.egg')
+		import random
 		
-		else:
+		henpath  = resource('hen.egg')
+		moonpath = resource('moon.egg')
+		
+		if not (henpath.is_file() and moonpath.is_file()):
 			return 'break'
 			
 		
@@ -324,8 +692,7 @@ class Editor(tkinter.Toplevel):
 		# file decrypting:
 		for fname in t:
 		
-			with open(fname[0], 'rb') as f:
-				encrypted_data = f.read()
+			encrypted_data = fname[0].read_bytes()
 				
 			data_length = len(encrypted_data)
 			
@@ -362,28 +729,269 @@ class Editor(tkinter.Toplevel):
 
 ############## Tab Related Begin
 
-	def new_tab(self, event=None, error=False):
-
-		# event == None when clicked hyper-link in tag_link()
-		if self.state != 'normal' and event != None:
-			self.bell()
+	def create_textwidget(self, master):
+		'''	Used by self.tabview to create Text-widget for a tab
+			or for showing errors and help.
+		'''
+		widget = tkinter.scrolledtext.ScrolledText(master, blockcursor=True, undo=False, autoseparators=True, tabstyle='wordprocessor')
+		
+		# Undo-history is in Tab.undo instead of widget, see show_tab()
+		widget.edithook = undo.EditHook(widget)
+		
+		widget.tag_config('match', background='lightyellow', foreground='black')
+		widget.tag_config('found', background='lightgreen')
+		
+		widget.bind( "<Return>", self.return_override)
+		widget.bind( "<Control-d>", self.del_tab)
+		widget.bind( "<Control-C>", self.comment)
+		widget.bind( "<Control-X>", self.uncomment)
+		widget.bind( "<Tab>", self.tab_override)
+		widget.bind( "<ISO_Left_Tab>", self.unindent)
+		widget.bind( "<Control-a>", self.select_all)
+		widget.bind( "<Control-z>", self.undo_override)
+		widget.bind( "<Control-Z>", self.redo_override)
+		widget.bind( "<Control-v>", self.paste)
+		widget.bind( "<Control-BackSpace>", self.search_next)
+		widget.bind( "<<Modified>>", self.modified_changed)
+		
+		# Needed in leave() taglink in: Run file Related
+		self.name_of_cursor_in_text_widget = widget['cursor']
+		
+		return widget
+		
+		
+	def show_tab(self):
+		'''	Show current tab in self.tabview. Widget of tab is created
+			only if tab was not already in pool.
+		'''
+		tab = self.tabs[self.tabindex]
+		tab.touched = time.monotonic()
+		fresh = tab not in self.tabview
+		
+		if fresh:
+			self.load_tab(tab)
+			
+			if tab.type == 'view' and tab not in self.views:
+				self.view_open(tab)
+		
+		self.contents = self.tabview.widget(tab)
+		self.tabview.show(self.contents)
+		
+		# Read-only, so no undo-history or journal
+		if fresh and tab.type == 'view':
+			self.view_setup(tab, self.contents)
+			
+		elif fresh and tab.type == 'follow':
+			self.follow_setup(tab, self.contents)
+			
+		elif fresh:
+			if tab.undo is None:
+				tab.undo = self.undohistory.new_stack()
+			self.contents.edithook.stack = tab.undo
+			
+			widget = self.contents
+			self.contents.edithook.listener = lambda kind, pos, text: self.journal_record(tab, widget, kind, pos, text)
+		
+		self.entry.delete(0, tkinter.END)
+		if tab.filepath:
+			self.entry.insert(0, tab.filepath)
+		
+		self.contents.focus_set()
+		
+		if fresh:
+			line = self.contents.index(tkinter.INSERT)
+			# ensure we see something before and after
+			self.contents.see('%s - 2 lines' % line)
+			self.update_idletasks()
+			self.contents.see('%s + 2 lines' % line)
+		
+		self.update_title()
+		
+		
+	def load_tab(self, tab):
+		'''	Ensure contents of tab have been read from disk. When restoring
+			session, tabs other than active one are read in background and
+			tab.contents is None until then.
+			
+			If file can not be read anymore, tab is turned into newtab.
+			
+			Contents compressed in hibernate are decompressed here,
+			when tab is shown.
+		'''
+		tab.wake()
+		
+		if not tab.dropped:
+			return True
+			
+		future = self.prefetch.pop(tab, None)
+		
+		try:
+			if future:
+				tmp = future.result()
+			else:
+				tmp = tab.filepath.read_text(encoding='utf-8')
+		
+		except EnvironmentError as e:
+			print(e.__str__())
+			print('\n Could not open file %s' % tab.filepath)
+			self.fileindex.remove(tab)
+			tab.contents = ''
+			tab.filepath = None
+			tab.position = '1.0'
+			tab.type = 'newtab'
+			return False
+		
+		tab.contents = tmp
+		
+		# Contents were dropped in hibernate and file has changed since,
+		# undo-history is of old contents
+		if tab.undo is not None and tab.contenthash != tab.diskhash:
+			tab.undo.clear()
+			
+		tab.diskhash = tab.contenthash
+		return True
+		
+		
+	def start_prefetch(self):
+		'''	Start reading not yet loaded tabs in background threads.
+		'''
+		tabs = [ tab for tab in self.tabs if tab.contents is None ]
+		if len(tabs) == 0:
 			return
-	
-		if len(self.tabs) > 0  and not error:
-			tmp = self.contents.get('1.0', tkinter.END)
-			# [:-1]: remove unwanted extra newline
-			self.tabs[self.tabindex].contents = tmp[:-1]
+		
+		import concurrent.futures
+		
+		self.prefetcher = concurrent.futures.ThreadPoolExecutor(
+			max_workers=PREFETCH_WORKERS)
+		
+		for tab in tabs:
+			self.prefetch[tab] = self.prefetcher.submit(tab.filepath.read_text,
+				encoding='utf-8')
+			
+		self.after(PREFETCH_INTERVAL, self.poll_prefetch)
+		
+		
+	def poll_prefetch(self):
+		'''	Collect finished background reads. Tabs whose files have
+			vanished are reported and removed.
+		'''
+		for tab, future in list(self.prefetch.items()):
+			if not future.done():
+				continue
+				
+			self.prefetch.pop(tab)
 			
+			if tab.contents is not None or tab not in self.tabs:
+				continue
+				
 			try:
-				pos = self.contents.index(tkinter.INSERT)
-			except tkinter.TclError:
-				pos = '1.0'
+				tab.contents = future.result()
+				tab.diskhash = tab.contenthash
+			
+			except EnvironmentError as e:
+				print(e.__str__())
+				print('\n Could not open file %s' % tab.filepath)
+				
+				idx = self.tabs.index(tab)
+				self.tabs.pop(idx)
+				self.fileindex.remove(tab)
+				if idx < self.tabindex:
+					self.tabindex -= 1
 				
-			self.tabs[self.tabindex].position = pos
+				if self.state == 'normal':
+					self.update_title()
 		
+		if len(self.prefetch) > 0:
+			self.after(PREFETCH_INTERVAL, self.poll_prefetch)
+		else:
+			self.prefetcher.shutdown(wait=False)
+			self.prefetcher = None
 		
-		self.contents.delete('1.0', tkinter.END)
-		self.entry.delete(0, tkinter.END)
+		
+	def hibernate_tabs(self):
+		'''	Hibernate least recently shown inactive tabs while contents
+			of tabs take more than self.memory_budget bytes.
+		'''
+		total = self.resident_sizes()[1]
+		now = time.monotonic()
+		
+		# Tabs with widget in pool are not hibernated, their widget
+		# has the contents
+		tabs = [ tab for tab in self.tabs if not tab.active and not tab.asleep
+				and tab not in self.tabview and now - tab.touched > HIBERNATE_AGE ]
+		tabs.sort(key=lambda tab: tab.touched)
+		
+		for tab in tabs:
+			if total <= self.memory_budget:
+				break
+				
+			size = tab.resident_size()
+			tab.hibernate()
+			total -= size - tab.resident_size()
+		
+		self.after(HIBERNATE_INTERVAL, self.hibernate_tabs)
+		
+		
+	def resident_sizes(self):
+		'''	Returns tuple: (list of (tab, bytes), total bytes)
+			Can be used when tuning self.memory_budget.
+		'''
+		sizes = [ (tab, tab.resident_size()) for tab in self.tabs ]
+		total = sum(size for tab, size in sizes)
+		
+		return sizes, total
+		
+		
+	def tab_dirty(self, tab):
+		'''	True if contents of tab, also those in its widget, differ
+			from file in disk.
+		'''
+		if tab.type != 'normal':
+			return False
+			
+		widget = self.tabview.pool.get(tab)
+		
+		# Modified flag of widget is cleared when its contents
+		# are synced to tab, see TabView.sync()
+		if widget is not None and widget.edit_modified():
+			return True
+			
+		return tab.dirty
+		
+		
+	def update_title(self):
+		'''	Show index of current tab and numbers of tabs that have
+			unsaved changes, or whose files have changed in disk
+			while they had unsaved changes.
+		'''
+		title = self.titlepattern % (self.tabindex + 1, len(self.tabs))
+		dirty = [ str(i + 1) for i, tab in enumerate(self.tabs) if self.tab_dirty(tab) ]
+		conflicts = [ str(i + 1) for i, tab in enumerate(self.tabs) if tab in self.conflicts ]
+		
+		if dirty:
+			title += '  modified: %s' % ' '.join(dirty)
+		if conflicts:
+			title += '  changed in disk: %s' % ' '.join(conflicts)
+		if self.watching:
+			title += '  watching: %s' % self.watching.filepath.name
+			
+		self.title(title)
+		
+		
+	def modified_changed(self, event=None):
+		'''	Called when modified flag of widget changes, that is:
+			on first edit after widget was filled or synced.
+		'''
+		if self.state == 'normal' and event.widget is self.contents:
+			self.update_title()
+		
+		
+	def new_tab(self, event=None):
+
+		# event == None when clicked hyper-link in tag_link()
+		if self.state != 'normal' and event != None:
+			self.bell()
+			return
 		
 		if len(self.tabs) > 0:
 			self.tabs[self.tabindex].active = False
@@ -392,12 +1000,7 @@ class Editor(tkinter.Toplevel):
 		
 		self.tabindex += 1
 		self.tabs.insert(self.tabindex, newtab)
-		
-		self.contents.focus_set()
-		self.contents.see('1.0')
-		self.contents.mark_set('insert', '1.0')
-		
-		self.title(self.titlepattern % (self.tabindex + 1, len(self.tabs)))
+		self.show_tab()
 		
 		return 'break'
 		
@@ -411,9 +1014,19 @@ class Editor(tkinter.Toplevel):
 		if self.tabs[self.tabindex].type == 'normal':
 			self.save(deltab=True)
 			
-		self.tabs.pop(self.tabindex)
-		self.contents.delete('1.0', tkinter.END)
-		self.entry.delete(0, tkinter.END)
+		oldtab = self.tabs.pop(self.tabindex)
+		self.tabview.discard(oldtab)
+		self.view_close(oldtab)
+		self.follow_close(oldtab)
+		self.fileindex.remove(oldtab)
+		
+		if oldtab is self.watching:
+			self.watching = None
+			self.cancel_watch_run()
+			
+		self.conflicts.discard(oldtab)
+		# If tab is being saved, journal is removed when save is done
+		self.journal.detach(oldtab, remove=(not oldtab.dirty))
 			
 		if (len(self.tabs) == 0):
 			newtab = Tab(active=True, filepath=None, contents='', position='1.0', type='newtab')
@@ -423,28 +1036,7 @@ class Editor(tkinter.Toplevel):
 			self.tabindex -= 1
 	
 		self.tabs[self.tabindex].active = True
-
-		self.contents.insert(tkinter.INSERT, self.tabs[self.tabindex].contents)
-		if self.tabs[self.tabindex].filepath:
-			self.entry.insert(0, self.tabs[self.tabindex].filepath)
-
-		try:
-			line = self.tabs[self.tabindex].position
-			self.contents.focus_set()
-			self.contents.mark_set('insert', line)
-			# ensure we see something before and after
-			self.contents.see('%s - 2 lines' % line)
-			self.update_idletasks()
-			self.contents.see('%s + 2 lines' % line)
-			
-		except tkinter.TclError:
-			self.tabs[self.tabindex].position = '1.0'
-			self.contents.focus_set()
-			self.contents.see('1.0')
-			self.contents.mark_set('insert', '1.0')
-			
-		self.contents.edit_reset()
-		self.title(self.titlepattern % (self.tabindex + 1, len(self.tabs)))
+		self.show_tab()
 		
 		return 'break'
 
@@ -456,17 +1048,6 @@ class Editor(tkinter.Toplevel):
 			return "break"
 			
 		self.tabs[self.tabindex].active = False
-		
-		tmp = self.contents.get('1.0', tkinter.END)
-		# [:-1]: remove unwanted extra newline
-		self.tabs[self.tabindex].contents = tmp[:-1]
-		
-		try:
-			pos = self.contents.index(tkinter.INSERT)
-		except tkinter.TclError:
-			pos = '1.0'
-			
-		self.tabs[self.tabindex].position = pos
 
 		idx = self.tabindex
 		if idx == len(self.tabs) - 1:
@@ -475,30 +1056,7 @@ class Editor(tkinter.Toplevel):
 		
 		self.tabindex = idx
 		self.tabs[self.tabindex].active = True
-
-		self.contents.delete('1.0', tkinter.END)
-		self.contents.insert(tkinter.INSERT, self.tabs[self.tabindex].contents)
-		self.entry.delete(0, tkinter.END)
-		if self.tabs[self.tabindex].filepath:
-			self.entry.insert(0, self.tabs[self.tabindex].filepath)
-		
-		try:
-			line = self.tabs[self.tabindex].position
-			self.contents.focus_set()
-			self.contents.mark_set('insert', line)
-			# ensure we see something before and after
-			self.contents.see('%s - 2 lines' % line)
-			self.update_idletasks()
-			self.contents.see('%s + 2 lines' % line)
-			
-		except tkinter.TclError:
-			self.tabs[self.tabindex].position = '1.0'
-			self.contents.focus_set()
-			self.contents.see('1.0')
-			self.contents.mark_set('insert', '1.0')
-			
-		self.contents.edit_reset()
-		self.title(self.titlepattern % (self.tabindex + 1, len(self.tabs)))
+		self.show_tab()
 		
 		return 'break'
 
@@ -506,14 +1064,26 @@ class Editor(tkinter.Toplevel):
 ########## Configuration Related Begin
 
 	def save_config(self, event=None):
+		# Wait for possible checkpoint being written
+		self.checkpointer.stop()
+		
 		try:
-			with open(CONFPATH, 'w', encoding='utf-8') as f:
-				data = self.get_config()
-				string_representation = json.dumps(data)
-				f.write(string_representation)
+			data = self.get_config()
+			string_representation = json.dumps(data)
+			checkpoint.atomic_write(CONFPATH, string_representation)
 		except EnvironmentError as e:
 			print(e.__str__())
 			print('\nCould not save configuration')
+			
+			
+	def checkpoint(self):
+		'''	Save snapshot of configuration periodically, so session is not
+			lost if editor crashes. Snapshot is written in background.
+		'''
+		if self.checkpointer.is_alive():
+			self.checkpointer.put(self.get_config())
+			self.compact_journal()
+			self.after(CHECKPOINT_INTERVAL, self.checkpoint)
 
 	
 	def load_config(self, fileobject):
@@ -524,6 +1094,9 @@ class Editor(tkinter.Toplevel):
 		
 		
 	def get_config(self):
+		'''	Returns snapshot of configuration as dict which can be
+			serialized with json. Does not change state of editor.
+		'''
 		dictionary = dict()
 		
 		dictionary['fgcolor'] = self.contents.cget('foreground')
@@ -539,15 +1112,35 @@ class Editor(tkinter.Toplevel):
 		dictionary['menufont'] = self.menufont.config()
 		dictionary['scrollbar_width'] = self.scrollbar_width
 		dictionary['elementborderwidth'] = self.elementborderwidth
+		dictionary['poolsize'] = self.tabview.maxsize
+		dictionary['memory_budget'] = self.memory_budget
+		dictionary['undo_tab_budget'] = self.undohistory.tab_budget
+		dictionary['undo_budget'] = self.undohistory.total_budget
+		dictionary['fsync'] = self.savequeue.fsync
+		dictionary['forkserver'] = self.use_forkserver
+		dictionary['preload'] = self.preload
+		dictionary['capture_logging'] = self.capture_logging
+		dictionary['capture_handled'] = self.capture_handled
+		dictionary['profile_importtime'] = self.profile_importtime
+		dictionary['memory_interval'] = self.memory_interval
+		dictionary['run_timeout'] = self.run_timeout
+		dictionary['run_cpu_limit'] = self.run_cpu_limit
+		dictionary['run_memory_limit'] = self.run_memory_limit
+		
+		tmplist = list()
 		
 		for tab in self.tabs:
-			tab.contents = ''
+			# Contents of newtabs are not saved, so neither is position.
+			# Positions of tabs in pool are in their widgets.
+			if tab.type == 'normal':
+				pos = self.tabview.position(tab)
+			elif tab.type == 'view':
+				pos = self.view_position(tab)
+			else:
+				pos = '1.0'
+			
+			tmplist.append(tab.asdict(position=pos))
 			
-			# Convert tab.filepath to string for serialization
-			if tab.filepath:
-				tab.filepath = tab.filepath.__str__()
-		
-		tmplist = [ tab.__dict__ for tab in self.tabs ]
 		dictionary['tabs'] = tmplist
 		
 		return dictionary
@@ -566,8 +1159,22 @@ class Editor(tkinter.Toplevel):
 		self.menufont.config(**dictionary['menufont'])
 		self.scrollbar_width 	= dictionary['scrollbar_width']
 		self.elementborderwidth	= dictionary['elementborderwidth']
-		self.contents.vbar.config(width=self.scrollbar_width)
-		self.contents.vbar.config(elementborderwidth=self.elementborderwidth)
+		self.tabview.config_vbar(width=self.scrollbar_width,
+			elementborderwidth=self.elementborderwidth)
+		self.tabview.resize(dictionary.get('poolsize', tabview.POOLSIZE))
+		self.memory_budget = dictionary.get('memory_budget', MEMORY_BUDGET)
+		self.undohistory.tab_budget = dictionary.get('undo_tab_budget', undo.TAB_BUDGET)
+		self.undohistory.total_budget = dictionary.get('undo_budget', undo.TOTAL_BUDGET)
+		self.savequeue.fsync = dictionary.get('fsync', False)
+		self.use_forkserver = dictionary.get('forkserver', False)
+		self.preload = dictionary.get('preload', list())
+		self.capture_logging = dictionary.get('capture_logging', True)
+		self.capture_handled = dictionary.get('capture_handled', False)
+		self.profile_importtime = dictionary.get('profile_importtime', False)
+		self.memory_interval = dictionary.get('memory_interval', 0)
+		self.run_timeout = dictionary.get('run_timeout', 0)
+		self.run_cpu_limit = dictionary.get('run_cpu_limit', 0)
+		self.run_memory_limit = dictionary.get('run_memory_limit', 0)
 		
 		self.lastdir = dictionary['lastdir']
 		
@@ -578,31 +1185,35 @@ class Editor(tkinter.Toplevel):
 		
 		self.tabs = [ Tab(**item) for item in dictionary['tabs'] ]
 		
-		# Have to step backwards here to avoid for-loop breaking
-		# while removing items from the container.
-		
-		for i in range(len(self.tabs)-1, -1, -1):
-			tab = self.tabs[i]
-			
+		# Contents of normal tabs are read later, in load_tab(),
+		# only active one is read now. Files of view-tabs are
+		# opened when tab is shown.
+		for tab in self.tabs:
 			if tab.type == 'normal':
-				try:
-					with open(tab.filepath, 'r', encoding='utf-8') as f:
-						tab.contents = f.read()
-					tab.filepath = pathlib.Path(tab.filepath)
-				except EnvironmentError as e:
-					print(e.__str__())
-					self.tabs.pop(i)
+				tab.filepath = pathlib.Path(tab.filepath)
+				tab.contents = None
+			elif tab.readonly:
+				tab.filepath = pathlib.Path(tab.filepath)
 			
 		for i,tab in enumerate(self.tabs):
 			if tab.active == True:
 				self.tabindex = i
 				break
+		
+		if self.tabindex != None and self.tabs[self.tabindex].type == 'normal':
+			if not self.load_tab(self.tabs[self.tabindex]):
+				# recently active normal tab is gone
+				self.tabs.pop(self.tabindex)
+				self.tabindex = None
+		
+		self.fileindex.rebuild(self.tabs)
+		self.start_prefetch()
 				
 
 	def apply_config(self):
 	
 		self.tab_width = self.font.measure(TAB_WIDTH * TAB_WIDTH_CHAR)
-		self.contents.config(font=self.font, foreground=self.fgcolor,
+		self.tabview.config(font=self.font, foreground=self.fgcolor,
 			background=self.bgcolor, insertbackground=self.fgcolor, 
 			tabs=(self.tab_width, ))
 			
@@ -620,24 +1231,652 @@ class Editor(tkinter.Toplevel):
 				self.tabindex = 0
 				self.tabs[self.tabindex].active = True 
 			
-		if self.tabs[self.tabindex].type == 'normal':
-			self.contents.insert(tkinter.INSERT, self.tabs[self.tabindex].contents)
-			self.entry.insert(0, self.tabs[self.tabindex].filepath)
-		try:
-			line = self.tabs[self.tabindex].position
-			self.contents.focus_set()
-			# ensure we see something before and after
-			self.contents.see('%s - 2 lines' % line)
-			self.update_idletasks()
-			self.contents.see('%s + 2 lines' % line)
-			self.contents.mark_set('insert', line)
-		except tkinter.TclError:
-			self.tabs[self.tabindex].position = '1.0'
-			self.contents.focus_set()
-			self.contents.see('1.0')
-			self.contents.mark_set('insert', '1.0')
+		self.show_tab()
 		
 ########## Configuration Related End
+########## Journal Related Begin
+
+	def journal_header(self, tab, widget=None):
+		'''	Header for new journal of tab: what edits recorded after
+			this are applied to. widget is live widget of tab, if any.
+		'''
+		filepath = tab.filepath.__str__() if tab.filepath else None
+		
+		if tab.type == 'normal' and not self.tab_dirty(tab):
+			return dict(filepath=filepath, type=tab.type,
+				diskhash=tab.diskhash.hex(), snapshot=None)
+		
+		if widget is not None:
+			contents = widget.get('1.0', tkinter.END)[:-1]
+		else:
+			contents = tab.contents
+			
+		return dict(filepath=filepath, type=tab.type, diskhash=None,
+			snapshot=contents)
+		
+		
+	def journal_record(self, tab, widget, kind, pos, text):
+		'''	Called by EditHook of widget of tab before every insert and
+			delete.
+		'''
+		if not self.journal.isopen(tab):
+			self.journal.open(tab, self.journal_header(tab, widget))
+			
+		self.journal.record(tab, kind, pos, text)
+		
+		
+	def compact_journal(self):
+		'''	Replace long journals with snapshot of contents of their tabs.
+		'''
+		for tab in self.tabs:
+			if self.journal.isopen(tab) and self.journal.size(tab) >= JOURNAL_COMPACT:
+				self.snapshot_journal(tab)
+				
+				
+	def snapshot_journal(self, tab):
+		'''	Replace journal of tab with snapshot of its contents.
+		'''
+		widget = self.tabview.pool.get(tab)
+		
+		if widget is not None:
+			contents = widget.get('1.0', tkinter.END)[:-1]
+		else:
+			contents = tab.contents
+		
+		filepath = tab.filepath.__str__() if tab.filepath else None
+		header = dict(filepath=filepath, type=tab.type, diskhash=None,
+			snapshot=contents)
+		
+		self.journal.rebase(self.journal.mark(tab), header)
+		
+		
+	def recover_journal(self):
+		'''	If editor was not closed properly, journals of tabs with
+			unsaved changes are left in journal.JOURNALDIR. Offer to
+			apply them. Recovered tabs are added after other tabs.
+		'''
+		# Journals of saved tabs have nothing to recover
+		journals = [ (header, ops) for header, ops in journal.read_journals()
+					if len(ops) > 0 or header['snapshot'] is not None ]
+		
+		if len(journals) == 0:
+			journal.clear()
+			return
+			
+		import tkinter.messagebox
+		
+		answer = tkinter.messagebox.askyesno('Recover',
+			'Editor was not closed properly.\n\nRecover unsaved changes of %d tabs?'
+			% len(journals), parent=self)
+		
+		journal.clear()
+		
+		if not answer:
+			return
+		
+		recovered = list()
+		
+		for header, ops in journals:
+			base = header['snapshot']
+			filepath = header['filepath']
+			
+			if base is None:
+				try:
+					with open(filepath, 'r', encoding='utf-8') as f:
+						base = f.read()
+				except EnvironmentError as e:
+					print(e.__str__())
+					print('\n Could not recover changes of %s' % filepath)
+					continue
+				
+				if checksum(base).hex() != header['diskhash']:
+					print('\n Could not recover changes of %s, file has changed' % filepath)
+					continue
+			
+			try:
+				contents = journal.replay(base, ops)
+			except (ValueError, TypeError, IndexError) as e:
+				print(e.__str__())
+				print('\n Could not recover changes of %s' % filepath)
+				continue
+			
+			tab = None
+			if header['type'] == 'normal':
+				filepath = pathlib.Path(filepath)
+				tab = self.fileindex.find(filepath)
+			
+			if tab is None:
+				tab = Tab(active=False, filepath=None, contents='', position='1.0', type='newtab')
+				
+				if header['type'] == 'normal':
+					tab.filepath = filepath
+					tab.type = 'normal'
+						
+				self.tabs.append(tab)
+				self.fileindex.add(tab)
+				
+			else:
+				self.prefetch.pop(tab, None)
+				self.tabview.discard(tab)
+			
+			# Tab could be waiting to be read from disk
+			if tab.type == 'normal' and tab.diskhash is None:
+				try:
+					tab.diskhash = checksum(tab.filepath.read_text(encoding='utf-8'))
+				except EnvironmentError:
+					pass
+			
+			tab.contents = contents
+			recovered.append(tab)
+		
+		# So that recovered changes are not lost if editor crashes again
+		for tab in recovered:
+			self.journal.open(tab, self.journal_header(tab))
+		
+		if len(recovered) > 0:
+			self.show_tab()
+		
+########## Journal Related End
+########## File Watching Begin
+
+	def start_watching(self):
+		self.filewatch = filewatch.FileWatcher()
+		
+		if self.filewatch.fileno() is not None:
+			self.tk.createfilehandler(self.filewatch.fileno(),
+				tkinter.READABLE, self.file_events)
+		
+		self.watch_files()
+		
+		
+	def watch_files(self):
+		'''	Update set of watched files from files of tabs, and poll
+			those that are not watched with inotify.
+		'''
+		self.filewatch.set_files(self.fileindex.bypath)
+		
+		unwatched = self.filewatch.fileno() is not None
+		self.files_changed(self.filewatch.poll(unwatched=unwatched))
+		
+		self.after(WATCH_INTERVAL, self.watch_files)
+		
+		
+	def file_events(self, fd, mask):
+		self.files_changed(self.filewatch.read_events())
+		
+		
+	def files_changed(self, paths):
+		changed = False
+		
+		for path in paths:
+			tab = self.fileindex.bypath.get(path)
+			
+			if tab is not None:
+				changed = self.check_file(tab) or changed
+		
+		if changed and self.state == 'normal':
+			self.update_title()
+			
+	
+	def check_file(self, tab):
+		'''	Called when file of tab may have changed in disk. If tab has
+			no unsaved changes, it is reloaded, else it is marked as
+			conflicting. Returns True if something was done.
+		'''
+		# Own write, or file is just going to be replaced
+		if tab.type != 'normal' or tab in self.savequeue:
+			return False
+			
+		try:
+			tmp = tab.filepath.read_text(encoding='utf-8')
+		
+		except FileNotFoundError:
+			# Removed or renamed: tab is written again on next save
+			if tab.diskhash is None:
+				return False
+				
+			print('\n File %s was removed' % tab.filepath)
+			tab.diskhash = None
+			return True
+			
+		except (EnvironmentError, ValueError) as e:
+			print(e.__str__())
+			print('\n Could not read changed file %s' % tab.filepath)
+			return False
+		
+		digest = checksum(tmp)
+		
+		if digest == tab.diskhash:
+			return False
+		
+		# Not loaded yet or dropped in hibernate, new contents are read
+		# when tab is shown
+		if tab.dropped and tab not in self.tabview:
+			tab.diskhash = None
+			return False
+		
+		# Saved by editor and result not yet collected,
+		# or changed to same as tab.
+		if digest == tab.contenthash:
+			tab.diskhash = digest
+			self.conflicts.discard(tab)
+			return True
+		
+		if self.tab_dirty(tab):
+			if tab not in self.conflicts:
+				print('\n File %s has changed in disk, tab has unsaved changes' % tab.filepath)
+				self.conflicts.add(tab)
+				self.bell()
+			return True
+		
+		self.reload_tab(tab, tmp, digest)
+		return True
+		
+		
+	def reload_tab(self, tab, contents, digest):
+		'''	Replace contents of tab with contents, which is read from disk.
+			Only changed lines of widget of tab are replaced, so cursor
+			and view are kept. Reload can be undone if tab has widget,
+			else undo-history of tab is of old contents and is cleared.
+			Widget is disabled in search, so it is enabled for patch.
+		'''
+		widget = self.tabview.pool.get(tab)
+		
+		if widget is not None:
+			state = widget.cget('state')
+			widget.config(state='normal')
+			widget.edit_separator()
+			filewatch.patch(widget, widget.get('1.0', tkinter.END)[:-1], contents)
+			widget.edit_separator()
+			widget.config(state=state)
+			widget.edit_modified(False)
+			
+		elif tab.undo is not None:
+			tab.undo.clear()
+		
+		tab.contents = contents
+		tab.diskhash = digest
+		self.conflicts.discard(tab)
+		
+		# Edits of reload are in journal, file is now the base
+		if self.journal.isopen(tab):
+			self.journal.rebase(self.journal.mark(tab), self.journal_header(tab))
+		
+########## File Watching End
+########## View Related Begin
+
+	def view_file(self, event=None):
+		'''	Open file in entry to new read-only view-tab. File is not read
+			to widget, only lines near view are, so file can be large.
+		'''
+		if self.state != 'normal':
+			self.bell()
+			return 'break'
+			
+		tmp = self.entry.get().strip()
+		
+		if tmp == '':
+			self.bell()
+			return 'break'
+			
+		filename = pathlib.Path().cwd() / tmp
+		
+		if self.fileindex.find(filename) is not None:
+			print('file %s is already open' % filename)
+			self.bell()
+			return 'break'
+			
+		tab = Tab(active=True, filepath=filename, contents='', position='1.0', type='view')
+		
+		if not self.view_open(tab):
+			return 'break'
+			
+		self.tabs[self.tabindex].active = False
+		self.fileindex.add(tab)
+		
+		self.tabindex += 1
+		self.tabs.insert(self.tabindex, tab)
+		self.show_tab()
+		
+		return 'break'
+		
+		
+	def view_open(self, tab):
+		'''	Open file of view-tab to self.views. If file can not be opened,
+			tab is turned into newtab and False is returned.
+		'''
+		try:
+			view = viewer.FileView(tab.filepath)
+			
+		except (EnvironmentError, ValueError) as e:
+			print(e.__str__())
+			print('\n Could not view file %s' % tab.filepath)
+			self.fileindex.remove(tab)
+			tab.filepath = None
+			tab.position = '1.0'
+			tab.type = 'newtab'
+			return False
+		
+		# Until now, position was line of whole file, from now on it is
+		# line in widget, whose first line is line view.first of file.
+		line, col = tab.position.split('.')
+		view.first = max(0, int(line) - 1 - VIEW_WINDOW // 2)
+		tab.position = '%d.%s' % (int(line) - view.first, col)
+		
+		self.views[tab] = view
+		return True
+		
+		
+	def view_close(self, tab):
+		view = self.views.pop(tab, None)
+		if view is not None:
+			view.close()
+			
+			
+	def view_position(self, tab):
+		'''	Position of view-tab in whole file.
+		'''
+		view = self.views.get(tab)
+		if view is None:
+			return tab.position
+			
+		line, col = self.tabview.position(tab).split('.')
+		
+		return '%d.%s' % (view.first + int(line), col)
+		
+		
+	def view_setup(self, tab, widget):
+		'''	Called when widget of view-tab is created. Scrolling is
+			remapped to whole file, see view_scrolled()
+		'''
+		view = self.views[tab]
+		pos = tab.position
+		
+		widget.config(yscrollcommand=lambda first, last: self.view_scrolled(tab, widget))
+		widget.vbar.config(command=lambda *args: self.view_scrollbar(tab, widget, *args))
+		
+		self.view_render(tab, widget, view.first)
+		widget.mark_set('insert', pos)
+		
+		
+	def view_render(self, tab, widget, first, top=None):
+		'''	Replace lines in widget of view-tab with VIEW_WINDOW lines
+			starting from line first of file. If top is given, that line
+			of file is scrolled to top of view.
+		'''
+		view = self.views[tab]
+		first = max(0, min(first, view.lines() - VIEW_WINDOW))
+		
+		# Keep cursor in same line of file, if it is in new lines
+		line, col = widget.index(tkinter.INSERT).split('.')
+		line = view.first + int(line) - 1
+		
+		text = view.text(first, VIEW_WINDOW)
+		
+		widget.config(state='normal')
+		widget.delete('1.0', tkinter.END)
+		widget.insert('1.0', text)
+		widget.config(state='disabled')
+		# Lines are not copied to tab, see TabView.sync()
+		widget.edit_modified(False)
+		
+		view.first = first
+		view.count = text.count('\n') + 1
+		
+		if first <= line < first + view.count:
+			widget.mark_set('insert', '%d.%s' % (line - first + 1, col))
+		else:
+			widget.mark_set('insert', '1.0')
+			
+		if top is not None:
+			widget.yview('%d.0' % (top - first + 1))
+			
+			
+	def view_near_edge(self, view, line):
+		'''	True if line of file is not in widget, or so near first
+			or last line of widget that more lines should be rendered.
+		'''
+		if line - view.first < VIEW_MARGIN and view.first > 0:
+			return True
+			
+		if view.first + view.count - line < VIEW_MARGIN and view.first + view.count < view.lines():
+			return True
+			
+		return not view.first <= line < view.first + view.count
+		
+		
+	def view_see(self, tab, line, col=0):
+		'''	Move cursor of view-tab to line and col of file and show it.
+			Returns index of it in widget, or None if file does not have
+			line, or it is not indexed yet.
+		'''
+		view = self.views[tab]
+		widget = self.tabview.widget(tab)
+		
+		if not 0 <= line < view.lines():
+			return None
+			
+		if self.view_near_edge(view, line):
+			self.view_render(tab, widget, line - VIEW_WINDOW // 2)
+			
+		pos = '%d.%d' % (line - view.first + 1, col)
+		
+		# ensure we see something before and after
+		widget.see('%s - 2 lines' % pos)
+		self.update_idletasks()
+		widget.see('%s + 2 lines' % pos)
+		widget.mark_set('insert', pos)
+		
+		return pos
+		
+		
+	def view_scrolled(self, tab, widget):
+		'''	yscrollcommand of widget of view-tab. When view is scrolled
+			near first or last line in widget, lines around view are
+			rendered. Scrollbar shows position in whole file.
+		'''
+		view = self.views.get(tab)
+		if view is None:
+			return
+			
+		top = int(widget.index('@0,0').split('.')[0]) - 1
+		bottom = int(widget.index('@0,%d' % widget.winfo_height()).split('.')[0]) - 1
+		
+		if self.view_near_edge(view, view.first + top) or self.view_near_edge(view, view.first + bottom):
+			# Called again when widget has been updated
+			self.view_render(tab, widget, view.first + top - VIEW_WINDOW // 2,
+				top=view.first + top)
+			return
+			
+		total = view.lines()
+		widget.vbar.set((view.first + top) / total, (view.first + bottom + 1) / total)
+		
+		
+	def view_scrollbar(self, tab, widget, *args):
+		'''	Command of scrollbar of view-tab. Dragging moves to line of
+			whole file, rest is handled by widget.
+		'''
+		view = self.views[tab]
+		
+		if args[0] == 'moveto':
+			top = int(float(args[1]) * view.lines())
+			self.view_render(tab, widget, top - VIEW_WINDOW // 2, top=top)
+		else:
+			widget.yview(*args)
+			
+			
+	def view_search(self, event=None):
+		'''	Search in view-tab is done in file instead of widget,
+			one match at a time, see view_find()
+		'''
+		self.old_word = self.entry.get()
+		
+		if len(self.old_word) == 0 or not self.view_find():
+			self.bell()
+			return
+			
+		self.contents.focus_set()
+		self.bind("<Button-3>", self.do_nothing)
+		self.bind("<Alt-n>", self.view_find)
+		self.bind("<Alt-p>", lambda event: self.view_find(backwards=True))
+		
+		
+	def view_find(self, event=None, backwards=False):
+		'''	Show next match of self.old_word in file of view-tab,
+			after current match, or cursor if there is none.
+		'''
+		tab = self.tabs[self.tabindex]
+		
+		if self.state != 'search' or tab.type != 'view':
+			return False
+			
+		view = self.views[tab]
+		widget = self.contents
+		found = widget.tag_ranges('found')
+		
+		if not found:
+			pos = widget.index(tkinter.INSERT)
+		elif backwards:
+			pos = str(found[0])
+		else:
+			pos = str(found[1])
+			
+		line, col = map(int, pos.split('.'))
+		match = view.find(self.old_word, view.first + line - 1, col, backwards=backwards)
+		
+		if match is None:
+			self.bell()
+			return False
+			
+		pos = self.view_see(tab, *match)
+		
+		if pos is None:
+			self.title('Search: line %d is not indexed yet' % (match[0] + 1))
+			self.bell()
+			return False
+			
+		widget.tag_remove('found', '1.0', tkinter.END)
+		widget.tag_add('found', pos, '%s + %dc' % (pos, len(self.old_word)))
+		self.title('Search: line %d' % (match[0] + 1))
+		
+		return True
+		
+########## View Related End
+########## Follow Related Begin
+
+	def follow_file(self, event=None):
+		'''	Open file in entry to new read-only follow-tab, which shows
+			lines written to file, like tail -F. Only last FOLLOW_LINES
+			lines are kept.
+		'''
+		if self.state != 'normal':
+			self.bell()
+			return 'break'
+			
+		tmp = self.entry.get().strip()
+		
+		if tmp == '':
+			self.bell()
+			return 'break'
+			
+		filename = pathlib.Path().cwd() / tmp
+		
+		if self.fileindex.find(filename) is not None:
+			print('file %s is already open' % filename)
+			self.bell()
+			return 'break'
+			
+		if not filename.is_file():
+			print('\n Could not follow file %s' % filename)
+			self.bell()
+			return 'break'
+			
+		tab = Tab(active=True, filepath=filename, contents='', position='1.0', type='follow')
+		
+		self.tabs[self.tabindex].active = False
+		self.fileindex.add(tab)
+		
+		self.tabindex += 1
+		self.tabs.insert(self.tabindex, tab)
+		self.show_tab()
+		
+		return 'break'
+		
+		
+	def follow_setup(self, tab, widget):
+		'''	Called when widget of follow-tab is created. If widget was
+			evicted from pool, its lines were copied to tab and are
+			already in widget.
+		'''
+		widget.config(state='disabled')
+		
+		if tab not in self.followers:
+			self.followers[tab] = follow.Follower(tab.filepath)
+			
+		self.follow_files()
+		
+		
+	def follow_close(self, tab):
+		follower = self.followers.pop(tab, None)
+		if follower is not None:
+			follower.close()
+			
+			
+	def follow_files(self):
+		'''	Append new lines to widgets of follow-tabs. Tabs that are
+			not in pool are not read, they catch up when shown.
+		'''
+		for tab, follower in self.followers.items():
+			widget = self.tabview.pool.get(tab)
+			if widget is None:
+				continue
+				
+			try:
+				text, restarted = follower.read()
+			except OSError as e:
+				print(e.__str__())
+				print('\n Could not read followed file %s' % tab.filepath)
+				continue
+				
+			if text or restarted:
+				self.follow_append(widget, text, restarted)
+				
+		if len(self.followers) > 0:
+			if not self.following:
+				self.following = True
+				self.after(FOLLOW_INTERVAL, self.follow_poll)
+				
+				
+	def follow_poll(self):
+		self.following = False
+		self.follow_files()
+		
+		
+	def follow_append(self, widget, text, restarted):
+		'''	Add text to end of widget, and drop oldest lines if there
+			are more than FOLLOW_LINES. If end was visible, it is kept
+			visible.
+		'''
+		at_end = widget.yview()[1] == 1.0
+		
+		widget.config(state='normal')
+		
+		if restarted:
+			widget.delete('1.0', tkinter.END)
+			
+		widget.insert(tkinter.END, text)
+		
+		lines = int(widget.index(tkinter.END).split('.')[0]) - 1
+		
+		if lines > FOLLOW_LINES:
+			widget.delete('1.0', '%d.0' % (lines - FOLLOW_LINES + 1))
+			
+		widget.config(state='disabled')
+		
+		if at_end:
+			widget.see(tkinter.END)
+			
+########## Follow Related End
 ########## Theme Related Begin
 
 	def increase_scrollbar_width(self, event=None):
@@ -651,8 +1890,8 @@ class Editor(tkinter.Toplevel):
 			
 		self.scrollbar_width += 7
 		self.elementborderwidth += 1
-		self.contents.vbar.config(width=self.scrollbar_width)
-		self.contents.vbar.config(elementborderwidth=self.elementborderwidth)
+		self.tabview.config_vbar(width=self.scrollbar_width,
+			elementborderwidth=self.elementborderwidth)
 			
 		return 'break'
 		
@@ -668,8 +1907,8 @@ class Editor(tkinter.Toplevel):
 			
 		self.scrollbar_width -= 7
 		self.elementborderwidth -= 1
-		self.contents.vbar.config(width=self.scrollbar_width)
-		self.contents.vbar.config(elementborderwidth=self.elementborderwidth)
+		self.tabview.config_vbar(width=self.scrollbar_width,
+			elementborderwidth=self.elementborderwidth)
 			
 		return 'break'
 		
@@ -687,7 +1926,7 @@ class Editor(tkinter.Toplevel):
 		else:
 			self.curcolor = 'day'
 			
-		self.contents.config(foreground=self.fgcolor, background=self.bgcolor,
+		self.tabview.config(foreground=self.fgcolor, background=self.bgcolor,
 			insertbackground=self.fgcolor)
 			
 		return 'break'
@@ -747,11 +1986,12 @@ class Editor(tkinter.Toplevel):
 				self.fgcolor = self.fgnightcolor
 				self.bgcolor = self.bgnightcolor
 			
-			self.contents.config(foreground=self.fgcolor, background=self.bgcolor,
+			self.tabview.config(foreground=self.fgcolor, background=self.bgcolor,
 			insertbackground=self.fgcolor)
 		
 		
 	def chcolor(self, args, event=None):
+		import tkinter.colorchooser
 		
 		if args[0] == 'bg':
 			tmpcolorbg = tkinter.colorchooser.askcolor(initialcolor=self.bgcolor)[1]
@@ -776,7 +2016,7 @@ class Editor(tkinter.Toplevel):
 				self.fgnightcolor = tmpcolorfg
 				self.fgcolor = self.fgnightcolor
 			
-		self.contents.config(foreground=self.fgcolor, background=self.bgcolor,
+		self.tabview.config(foreground=self.fgcolor, background=self.bgcolor,
 			insertbackground=self.fgcolor)
 		
 		return 'break'
@@ -784,74 +2024,71 @@ class Editor(tkinter.Toplevel):
 ########## Theme Related End
 ########## Run file Related Begin
 
-	def enter(self, tagname, event=None):
-		''' Used in error-page, when mousecursor enters hyperlink tagname.
+	def enter(self, event=None):
+		''' Used in error-page, when mousecursor enters or moves over
+			hyperlink.
 		'''
-		self.contents.config(cursor="hand2")
-		self.contents.tag_config(tagname, underline=1)
+		line = event.widget.index('@%d,%d linestart' % (event.x, event.y))
+		event.widget.config(cursor="hand2")
+		event.widget.tag_remove('hover', '1.0', tkinter.END)
+		event.widget.tag_add('hover', line, '%s lineend' % line)
 
 
-	def leave(self, tagname, event=None):
-		''' Used in error-page, when mousecursor leaves hyperlink tagname.
+	def leave(self, event=None):
+		''' Used in error-page, when mousecursor leaves hyperlink.
 		'''
-		self.contents.config(cursor=self.name_of_cursor_in_text_widget)
-		self.contents.tag_config(tagname, underline=0)
+		event.widget.config(cursor=self.name_of_cursor_in_text_widget)
+		event.widget.tag_remove('hover', '1.0', tkinter.END)
 
 
-	def lclick(self, tagname, event=None):
-		'''	Used in error-page, when hyperlink tagname is clicked.
-		
-			self.taglinks is dict with tagname as key
-			and function (self.taglink) as value.
+	def lclick(self, event=None):
+		'''	Used in error-page, when hyperlink is clicked.
 		'''
+		line = event.widget.index('@%d,%d' % (event.x, event.y))
+		location = self.tracelinks.find(int(line.split('.')[0]))
 		
-		# passing tagname-string as argument to function self.taglink()
-		# which in turn is a value of tagname-key in dictionary taglinks: 
-		self.taglinks[tagname](tagname)
+		if location is not None:
+			self.tag_link(location)
 		
 
-	def tag_link(self, tagname, event=None):
-		''' Used in error-page, executed when hyperlink tagname is clicked.
+	def tag_link(self, location, event=None):
+		''' Used in error-page, executed when hyperlink is clicked.
+			location is (filepath, line) from self.tracelinks
 		'''
 		
-		i = int(tagname.split("-")[1])
-		filepath, errline = self.errlines[i]
+		filepath, errline = location
 		
 		filepath = pathlib.Path(filepath)
-		openfiles = [tab.filepath for tab in self.tabs]
+		tab = self.fileindex.find(filepath)
 		
-		if filepath == self.tabs[self.tabindex].filepath:
+		if tab is self.tabs[self.tabindex]:
 			pass
 			
-		elif filepath in openfiles:
-			for i,tab in enumerate(self.tabs):
-				if tab.filepath == filepath:
-					self.tabs[self.tabindex].active = False
-					self.tabindex = i
-					self.tabs[self.tabindex].active = True
-					break
+		elif tab is not None:
+			self.tabs[self.tabindex].active = False
+			self.tabindex = self.tabs.index(tab)
+			self.tabs[self.tabindex].active = True
+			
 		else:		
 			try:
 				with open(filepath, 'r', encoding='utf-8') as f:
-					self.new_tab(error=True)
-					self.tabs[self.tabindex].filepath = filepath
-					self.tabs[self.tabindex].contents = f.read()
-					self.tabs[self.tabindex].type = 'normal'
+					tmp = f.read()
 			except EnvironmentError as e:
 				print(e.__str__())
 				print('\n Could not open file %s' % filepath)
 				self.bell()
 				return
-
+			
+			self.tabs[self.tabindex].active = False
+			newtab = Tab(active=True, filepath=filepath, contents=tmp, position='1.0', type='normal')
+			newtab.diskhash = newtab.contenthash
+			self.tabindex += 1
+			self.tabs.insert(self.tabindex, newtab)
+			self.fileindex.add(newtab)
 		
-		self.entry.delete(0, tkinter.END)
-		self.entry.insert(0, self.tabs[self.tabindex].filepath)
-		self.contents.delete('1.0', tkinter.END)
-		self.contents.insert(tkinter.INSERT, self.tabs[self.tabindex].contents)
-		self.contents.edit_reset()
-		self.contents.focus_set()
+		self.show_tab()
 		
-		line = errline + '.0'
+		line = '%d.0' % errline
 		# ensure we see something before and after
 		self.contents.see('%s - 2 lines' % line)
 		self.update_idletasks()
@@ -859,145 +2096,544 @@ class Editor(tkinter.Toplevel):
 		self.contents.mark_set('insert', line)
 		self.bind("<Button-3>", lambda event: self.raise_popup(event))
 		self.state = 'normal'
-		self.title(self.titlepattern % (self.tabindex + 1, len(self.tabs)))
+		self.update_title()
 
 
-	def run(self):
-		'''	Run file currently being edited. This can not catch errlines of
-			those exceptions that are catched. Like:
+	def run(self, mode=None):
+		'''	Run file currently being edited. If mode is 'profile' or
+			'memory', it is profiled, see profile() and memory().
 			
-			try:
-				code we know sometimes failing with SomeError
-				(but might also fail with other error-type)
-			except SomeError:
-				some other code but no raising error
-				
-			Note: 	Above code will raise an error in case
-			 		code in try-block raises some other error than SomeError.
-					In that case those errlines will be of course catched.
+			File is run in background and its stdout and stderr are shown
+			in error-page while it runs, see poll_run(). Alt-k stops it.
+			
+			File is run with capture.py, which sends exceptions of file
+			to editor through own pipe as they happen: uncaught ones,
+			also in threads, and logged ones, like with logging.exception().
+			Exceptions that are catched are sent too if capture_handled
+			is True in configuration, this needs python 3.12 or newer.
+			Their frames are shown as links, stderr is then not parsed.
 			
-			What this means: If you self.run() with intention to spot possible 
-			errors in your program, you should use logging (in except-block)
-			if you are not 100% sure about your code in except-block.
+			When file has finished, its exit code, wall time, cpu time and
+			peak memory are shown with those of its previous runs.
+			If run_timeout is set in configuration, file is stopped after
+			that many seconds. run_cpu_limit and run_memory_limit are set
+			as limits of cpu time and address space of process.
 		'''
-		if (self.state != 'normal') or (self.tabs[self.tabindex].type == 'newtab'):
+		if (self.state != 'normal') or (self.tabs[self.tabindex].type == 'newtab') or self.runner:
 			self.bell()
 			return
 			
 		self.save(forced=True)
+		# Script must see saved files
+		self.flush_saves()
+		# File is run now, saves above need no watch-run
+		self.cancel_watch_run()
 		
-		# https://docs.python.org/3/library/subprocess.html
-
-		res = subprocess.run(['python', self.tabs[self.tabindex].filepath], stderr=subprocess.PIPE).stderr
+		filepath = self.tabs[self.tabindex].filepath
+		
+		if not self.start_run(filepath, mode):
+			return
+			
+		self.bind("<Escape>", self.stop_show_errors)
+		self.bind("<Button-3>", self.do_nothing)
+		self.state = 'error'
 		
-		err = res.decode()
+		self.showing_output = True
+		self.stale_output = None
 		
-		if len(err) != 0:
-			self.bind("<Escape>", self.stop_show_errors)
-			self.bind("<Button-3>", self.do_nothing)
-			self.state = 'error'
+		self.contents = self.infotext
+		self.tabview.show(self.contents)
+		self.contents.delete('1.0', tkinter.END)
+		
+		self.title('Running %s, stop with Alt-k' % filepath.name)
+		
+		
+	def start_run(self, filepath, mode=None):
+		'''	Start running filepath in background, see run().
+			Returns True if it was started.
+		'''
+		options = self.capture_options(mode)
+		importtime = mode == 'profile' and self.profile_importtime
+		
+		# Imports are already done in fork-server
+		if importtime:
+			self.runner = None
+		else:
+			self.runner = self.fork_runner(filepath, options)
+		
+		if self.runner is None:
+			from . import runner
+			
+			# For executing edited file in the same env than this editor, which
+			# is nice: It means you have your installed dependencies available.
+			args = ['python', runner.CAPTURE, options, filepath]
+			if importtime:
+				args[1:1] = ['-X', 'importtime']
+				
+			self.runner = runner.Runner(args, capture=True)
+			
+			try:
+				self.runner.start()
+			except EnvironmentError as e:
+				print(e.__str__())
+				print('\n Could not run file %s' % filepath)
+				self.runner = None
+				return False
+		
+		self.tracelinks = tracelinks.TraceLinks()
+		self.profile_data = None
+		self.run_filepath = filepath
+		self.run_timedout = False
+		
+		self.after(RUN_INTERVAL, self.poll_run)
+		
+		return True
+		
+		
+	def profile(self):
+		'''	Run file currently being edited with cProfile. When it has
+			finished, table of functions which took most time is added
+			to end of its output. Alt-s changes order of table, and line
+			of function is opened by clicking it. If profile_importtime
+			is True in configuration, file is run with -X importtime,
+			then time used by every import is in output.
+		'''
+		self.run(mode='profile')
+		
+		
+	def memory(self):
+		'''	Run file currently being edited with tracemalloc. When it has
+			finished, table of lines which had allocated most memory at
+			exit is added to end of its output, with growth compared to
+			previous memory-run of same file. Alt-s changes order of table,
+			and line is opened by clicking it. If memory_interval is set
+			in configuration, current and peak memory are shown that
+			often while file runs, and peak of line is largest of them.
+		'''
+		self.run(mode='memory')
+		
+		
+	def capture_options(self, mode=None):
+		'''	Options of capture.py, see run()
+		'''
+		options = list()
+		
+		if mode == 'profile':
+			options.append('profile')
 			
-			self.taglinks = dict()
-			self.errlines = list()
+		elif mode == 'memory' and self.memory_interval:
+			options.append('memory=%g' % self.memory_interval)
 			
-			self.contents.delete('1.0', tkinter.END)
+		elif mode == 'memory':
+			options.append('memory')
 			
-			for tag in self.contents.tag_names():
-				if 'hyper' in tag:
-					self.contents.tag_delete(tag)
-				
-			self.err = err.splitlines()
+		if self.run_cpu_limit:
+			options.append('cpu=%d' % self.run_cpu_limit)
 			
-			for line in self.err:
-				tmp = line
-
-				tagname = "hyper-%s" % len(self.errlines)
-				self.contents.tag_config(tagname)
+		if self.run_memory_limit:
+			options.append('as=%d' % (self.run_memory_limit * 2**20))
+			
+		if self.capture_logging:
+			options.append('logging')
+			
+		if self.capture_handled:
+			options.append('handled')
+			
+		return ','.join(options) or '-'
+		
+		
+	def start_forkserver(self):
+		'''	(Re)start helper process used in run() if it is enabled
+			in configuration. Modules in self.preload are imported in it.
+		'''
+		if self.forkserver:
+			self.forkserver.stop()
+			self.forkserver = None
+			
+		if not self.use_forkserver:
+			return
+			
+		from . import runner
+		
+		if not runner.ForkServer.available():
+			print('\n Fork-server is not available on this platform, running files normally')
+			self.use_forkserver = False
+			return
+			
+		self.forkserver = runner.ForkServer('python', self.preload)
+		
+		try:
+			self.forkserver.start()
+		except EnvironmentError as e:
+			print(e.__str__())
+			print('\n Could not start fork-server, running files normally')
+			self.forkserver = None
+			
+			
+	def fork_runner(self, filepath, options):
+		'''	Start running filepath with fork-server, exceptions are
+			captured with options. Returns started runner.ForkRunner,
+			or None if file should be run normally.
+		'''
+		if not self.use_forkserver:
+			return None
+			
+		# Helper has died or environment has changed: this time file
+		# is run normally, new helper is ready for next time.
+		if self.forkserver is None or not self.forkserver.usable():
+			self.start_forkserver()
+			return None
+			
+		proc = self.forkserver.runner(filepath, options)
+		
+		try:
+			proc.start()
+		except EnvironmentError as e:
+			# Helper can still be importing modules
+			print(e.__str__())
+			return None
+			
+		return proc
+		
+		
+	def poll_run(self):
+		'''	Insert output of running file to self.infotext, at most
+			RUN_BUDGET seconds at a time so editor stays responsive.
+			
+			Exceptions sent by capture.py are shown among output as
+			they come. When they are sent, stderr is not parsed.
+		'''
+		widget = self.infotext
+		at_end = widget.yview()[1] == 1.0
+		deadline = time.perf_counter() + RUN_BUDGET
+		start = len(self.tracelinks.lines)
+		first = len(self.tracelinks.starts)
+		parse = not self.runner.capture
+		
+		while time.perf_counter() < deadline:
+			item = self.runner.get()
+			if item is None:
+				break
 				
-				# Why ButtonRelease instead of just Button-1:
-				# https://stackoverflow.com/questions/24113946/unable-to-move-text-insert-index-with-mark-set-widget-function-python-tkint
+			name, data = item
+			
+			kind = data.get('kind') if name == 'capture' else None
+			
+			if kind == 'profile' or (kind == 'memory' and data.get('final')):
+				self.profile_data = data
+			elif kind == 'memory':
+				self.tracelinks.add('Memory at %.1f s: current %s, peak %s' % (data['time'],
+					tracelinks.format_size(data['current']),
+					tracelinks.format_size(data['peak'])), parse=False)
+			elif name == 'capture':
+				self.tracelinks.add_record(data)
+			else:
+				self.tracelinks.add(data, parse=(parse and name == 'stderr'))
 				
-				self.contents.tag_bind(tagname, "<ButtonRelease-1>", 
-					lambda event, arg=tagname: self.lclick(arg, event))
+		done = self.runner.done() and self.runner.output.empty()
+		
+		if done:
+			self.record_run()
+			
+		elif (self.run_timeout and not self.run_timedout
+				and self.runner.elapsed() > self.run_timeout):
+			self.run_timedout = True
+			self.tracelinks.add('Timeout: stopping after %g s' % self.run_timeout, parse=False)
+			self.stop_run()
+			
+		lines = self.tracelinks.lines[start:]
+		
+		# If infotext is used for something else, like help, output
+		# is inserted when it is shown again, see show_errors()
+		if lines and self.showing_output:
+			self.insert_output(start, lines)
+			
+			links = self.tracelinks.ranges(first)
+			if links:
+				widget.tag_add('link', *links)
 				
-				self.contents.tag_bind(tagname, "<Enter>", 
-					lambda event, arg=tagname: self.enter(arg, event))
+			if at_end and self.stale_output is None:
+				widget.see(tkinter.END)
+			
+		if not done:
+			self.after(RUN_INTERVAL, self.poll_run)
+			return
+			
+		# Output was shorter than previous one
+		if self.stale_output is not None:
+			if self.showing_output:
+				widget.delete('%d.0' % (len(self.tracelinks.lines) + 1), tkinter.END)
 				
-				self.contents.tag_bind(tagname, "<Leave>", 
-					lambda event, arg=tagname: self.leave(arg, event))
+			self.stale_output = None
+			
+		code = self.runner.returncode()
+		elapsed = self.runner.elapsed()
+		self.runner = None
+		
+		if self.profile_data and self.profile_data['kind'] == 'memory':
+			self.memory_previous = self.memory_sizes.get(self.run_filepath)
+			self.memory_sizes[self.run_filepath] = { (row[0], row[1]): row[2]
+				for row in self.profile_data['rows'] }
+			
+		if self.profile_data:
+			self.profile_start = len(self.tracelinks.lines)
+			self.show_profile()
+			
+		if self.state == 'error':
+			self.title('Finished, exit code: %d, %.2f s' % (code, elapsed))
+			
+			
+	def insert_output(self, start, lines):
+		'''	Insert output lines to self.infotext, start is index of first
+			of them in output.
+			
+			If self.stale_output is not None, it is output of previous run
+			still in infotext, see watch_run(). Lines same as in it are
+			left as they are, and rest of it is removed at first line
+			that differs, so only changed lines are updated.
+		'''
+		widget = self.infotext
+		stale = self.stale_output
+		
+		if stale is not None:
+			same = 0
+			
+			while (same < len(lines) and start + same < len(stale)
+					and stale[start + same] == lines[same]):
+				same += 1
 				
-				self.taglinks[tagname] = self.tag_link
+			if same == len(lines):
+				return
 				
-				# parse filepath and linenums from errors
-				if 'File ' in line and 'line ' in line:
-					data = line.split(',')[:2]
-					linenum = data[1][6:]
-					filepath = data[0][8:-1]
-					self.errlines.append((filepath, linenum)) 
-					self.contents.insert(tkinter.INSERT, tmp +"\n", tagname)
-				else:
-					self.contents.insert(tkinter.INSERT, tmp +"\n")
+			widget.delete('%d.0' % (start + same + 1), tkinter.END)
+			self.stale_output = None
+			lines = lines[same:]
+			
+		widget.insert(tkinter.END + '-1c', ''.join(line + '\n' for line in lines))
+		
+		
+	def toggle_watch(self, event=None):
+		'''	Toggle watch-mode of file of current tab: when it, or open file
+			it imports, is saved, it is run again in background. Saves
+			within WATCH_DELAY are run once, and if previous run is still
+			running, it is killed first. Output is updated in error-page.
+			
+			While watching, Save-button saves changed tabs like run does.
+		'''
+		if self.watching:
+			self.watching = None
+			self.cancel_watch_run()
+			
+		elif self.state != 'normal' or self.tabs[self.tabindex].type != 'normal':
+			self.bell()
+			return 'break'
+			
+		else:
+			self.watching = self.tabs[self.tabindex]
+			self.watch_imports()
+			
+		if self.state == 'normal':
+			self.update_title()
+			
+		return 'break'
+		
+		
+	def watch_imports(self):
+		from . import imports
+		
+		tab = self.watching
+		paths = imports.imported_files(tab.contents, tab.filepath,
+			[pathlib.Path().cwd()])
+		paths.add(tab.filepath)
+		
+		# Resolved, so that file saved through symlink or with relative
+		# path is recognized. Inode is not used, it changes on every save.
+		self.watch_paths = set(map(fileindex.resolved, paths))
+		
+		
+	def watch_saved(self, path):
+		'''	Called when file path has been saved.
+		'''
+		if self.watching is None:
+			return
+			
+		path = fileindex.resolved(path)
+		
+		# Imports can have changed
+		if path == fileindex.resolved(self.watching.filepath):
+			self.watch_imports()
+			
+		if path in self.watch_paths:
+			self.cancel_watch_run()
+			self.watch_after = self.after(WATCH_DELAY, self.watch_run)
+			
+			
+	def cancel_watch_run(self):
+		if self.watch_after is not None:
+			self.after_cancel(self.watch_after)
+			self.watch_after = None
+			
+			
+	def watch_run(self):
+		'''	Run watched file again, see toggle_watch()
+		'''
+		self.watch_after = None
+		
+		if self.watching not in self.tabs:
+			self.watching = None
+			return
+			
+		if self.runner:
+			self.runner.kill()
+			self.watch_after = self.after(RUN_INTERVAL, self.watch_run)
+			return
+			
+		# Wait until search, gotoline etc. is done
+		if self.state not in ('normal', 'error'):
+			self.watch_after = self.after(WATCH_DELAY, self.watch_run)
+			return
+			
+		stale = self.tracelinks.lines if self.showing_output else None
+		
+		if not self.start_run(self.watching.filepath):
+			return
+			
+		self.stale_output = stale
+		
+		if self.state == 'error':
+			self.title('Running %s, stop with Alt-k' % self.watching.filepath.name)
+			
+			
+	def record_run(self):
+		'''	Add resource usage of finished run to its output, with usage
+			of previous runs of same file, and to run history.
+		'''
+		record = dict(code=self.runner.returncode(), wall=self.runner.elapsed())
+		
+		# Not on all platforms
+		if self.runner.usage:
+			record.update(self.runner.usage)
+			
+		history = self.run_history.setdefault(self.run_filepath, list())
+		self.tracelinks.add('Finished: %s' % self.format_run(record), parse=False)
+		
+		for previous in reversed(history):
+			self.tracelinks.add('Previous: %s' % self.format_run(previous), parse=False)
+			
+		history.append(record)
+		del history[:-RUN_HISTORY]
+		
+		
+	def format_run(self, record):
+		'''	record is resource usage of run, see record_run()
+		'''
+		s = 'exit code %d, wall %.2f s' % (record['code'], record['wall'])
+		
+		if 'user' in record:
+			s += ', user %.2f s, system %.2f s, peak RSS %s' % (record['user'],
+				record['system'], tracelinks.format_size(record['maxrss']))
 				
-
+		return s
+		
+		
+	def show_profile(self):
+		'''	Add table of profile of last run to end of its output,
+			replacing previous table.
+		'''
+		self.tracelinks.truncate(self.profile_start)
+		first = len(self.tracelinks.starts)
+		kind = self.profile_data['kind']
+		order = self.profile_orders[kind]
+		
+		if kind == 'memory':
+			self.tracelinks.add_memory(self.profile_data, self.memory_previous,
+				order, PROFILE_ROWS)
+		else:
+			self.tracelinks.add_profile(self.profile_data['rows'], order, PROFILE_ROWS)
+		
+		if not self.showing_output:
+			return
+			
+		widget = self.infotext
+		start = '%d.0' % (self.profile_start + 1)
+		widget.delete(start, tkinter.END)
+		widget.insert(tkinter.END + '-1c', ''.join(line + '\n'
+			for line in self.tracelinks.lines[self.profile_start:]))
+		
+		links = self.tracelinks.ranges(first)
+		if links:
+			widget.tag_add('link', *links)
+			
+		widget.see(start)
+		
+		
+	def sort_profile(self, event=None):
+		'''	Change order of profile table in error-page.
+		'''
+		if self.state != 'error' or not self.profile_data or self.runner:
+			self.bell()
+			return 'break'
+			
+		kind = self.profile_data['kind']
+		
+		if kind == 'memory':
+			orders = list(tracelinks.MEMORY_ORDERS)
+		else:
+			orders = list(tracelinks.PROFILE_ORDERS)
+			
+		i = orders.index(self.profile_orders[kind]) + 1
+		self.profile_orders[kind] = orders[i % len(orders)]
+		self.show_profile()
+		
+		return 'break'
+		
+		
+	def stop_run(self, event=None):
+		'''	Stop running file and processes it has started. If they
+			have not exited after STOP_GRACE ms, they are killed.
+		'''
+		if not self.runner:
+			self.bell()
+			return 'break'
+			
+		self.runner.stop()
+		self.after(STOP_GRACE, lambda proc=self.runner: proc.done() or proc.kill())
+		
+		return 'break'
+		
+		
 	def show_errors(self):
-		''' Show traceback from last run with added hyperlinks.
+		''' Show output of last run with added hyperlinks. Output is
+			already parsed, and if infotext has not been used for
+			something else since, it is shown as is.
 		'''
 		
-		if len(self.errlines) != 0:
+		if len(self.tracelinks.lines) != 0:
 			self.bind("<Escape>", self.stop_show_errors)
 			self.bind("<Button-3>", self.do_nothing)
 			self.state = 'error'
 			
-			tmp = self.contents.get('1.0', tkinter.END)
-			# [:-1]: remove unwanted extra newline
-			self.tabs[self.tabindex].contents = tmp[:-1]
-			
-			try:
-				pos = self.contents.index(tkinter.INSERT)
-			except tkinter.TclError:
-				pos = '1.0'
-				
-			self.tabs[self.tabindex].position = pos
-			
-			self.contents.delete('1.0', tkinter.END)
+			self.contents = self.infotext
+			self.tabview.show(self.contents)
 			
-			i = 0
-			for line in self.err:
-				tmp = line
+			if not self.showing_output:
+				self.stale_output = None
+				self.contents.delete('1.0', tkinter.END)
+				self.contents.insert(tkinter.END + '-1c',
+					''.join(line + '\n' for line in self.tracelinks.lines))
 				
-				# parse filepath and linenums from errors
-				if 'File ' in line and 'line ' in line:
-					data = line.split(',')[:2]
-					linenum = data[1][6:]
-					filepath = data[0][8:-1]
-					self.errlines.append((filepath, linenum)) 
-					self.contents.insert(tkinter.INSERT, tmp +"\n", 'hyper-%d' % i)
-					i += 1
-				else:
-					self.contents.insert(tkinter.INSERT, tmp +"\n")
+				links = self.tracelinks.ranges()
+				if links:
+					self.contents.tag_add('link', *links)
+					
+				self.showing_output = True
 
 									
 	def stop_show_errors(self, event=None):
 		self.state = 'normal'
 		self.bind("<Escape>", self.do_nothing)
 		self.bind("<Button-3>", lambda event: self.raise_popup(event))
-		
-		self.contents.delete('1.0', tkinter.END)
-		self.contents.insert(tkinter.INSERT, self.tabs[self.tabindex].contents)
-		self.entry.delete(0, tkinter.END)
-		
-		if self.tabs[self.tabindex].type == 'normal':
-			self.entry.insert(0, self.tabs[self.tabindex].filepath)
-			
-		self.contents.edit_reset()
-		self.contents.focus_set()
-
-		# ensure we see something before and after
-		pos = self.tabs[self.tabindex].position
-		self.contents.see('%s - 2 lines' % pos)
-		self.update_idletasks()
-		self.contents.see('%s + 2 lines' % pos)
-		self.contents.mark_set('insert', pos)
+		self.show_tab()
 		
 ########## Run file Related End
 ########## Overrides Begin
@@ -1141,37 +2777,10 @@ class Editor(tkinter.Toplevel):
 			self.contents.see(f'{line+1}.0')
 			self.contents.edit_separator()
 			return "break"
-
-########## Overrides End
-########## Save and Load Begin
-
-	def tabify(self, line):
-		
-		indent_stop_index = 0
-		
-		for char in line:
-			if char in [' ', '\t']: indent_stop_index += 1
-			else: break
-			
-		if indent_stop_index == 0: return line
-		
-		indent_string = line[:indent_stop_index]
-		line = line[indent_stop_index:]
-		
-		count = 0
-		for char in indent_string:
-			if char == '\t': 
-				count = 0
-				continue
-			if char == ' ': count += 1
-			if count == TAB_WIDTH:
-				indent_string = indent_string.replace(TAB_WIDTH * ' ', '\t', True)
-				count = 0
-		
-		tabified_line = ''.join([indent_string, line])
-		return tabified_line
-	
-	
+
+########## Overrides End
+########## Save and Load Begin
+
 	def load(self, event=None):
 
 		if self.state != 'normal':
@@ -1180,6 +2789,8 @@ class Editor(tkinter.Toplevel):
 		
 		# event is button
 		if event == None:
+			import tkinter.filedialog
+			
 			d = tkinter.filedialog.FileDialog(self)
 			
 			d.dirs.configure(font=self.font)
@@ -1223,9 +2834,7 @@ class Editor(tkinter.Toplevel):
 		
 		filename = pathlib.Path().cwd() / tmp
 		
-		openfiles = [tab.filepath for tab in self.tabs]
-		
-		if filename in openfiles:
+		if self.fileindex.find(filename) is not None:
 			print('file %s is already open' % filename)
 			self.bell()
 			self.entry.delete(0, tkinter.END)
@@ -1234,26 +2843,56 @@ class Editor(tkinter.Toplevel):
 				self.entry.insert(0, self.tabs[self.tabindex].filepath)
 			return
 		
+		# Read-only tab is kept, file is opened in new tab
+		if self.tabs[self.tabindex].readonly:
+			self.new_tab()
+		
 		if self.tabs[self.tabindex].type == 'normal':
 			# keyword argument deltab should be renamed
 			self.save(deltab=True)
 		
+		# Journal is for old file. If it is being saved,
+		# journal is removed when save is done.
+		self.journal.detach(self.tabs[self.tabindex], remove=(not self.tabs[self.tabindex].dirty))
+		self.conflicts.discard(self.tabs[self.tabindex])
+		
+		try:
+			size = os.stat(filename).st_size
+		except OSError:
+			# Reported below
+			size = 0
+		
+		if size > loader.LARGE_FILE:
+			self.start_load(filename, size)
+			return
+		
 		# Using same tab:
 		try:
 			with open(filename, 'r', encoding='utf-8') as f:
 				self.tabs[self.tabindex].contents = f.read()
+				self.tabs[self.tabindex].diskhash = self.tabs[self.tabindex].contenthash
+				
+				# Replacing contents is not recorded to undo-history
+				# or journal, file is the new base
+				hook = self.contents.edithook
+				stack, listener = hook.stack, hook.listener
+				hook.stack = hook.listener = None
+				
 				self.contents.delete('1.0', tkinter.END)
 				self.entry.delete(0, tkinter.END)
 				self.tabs[self.tabindex].filepath = filename
+				self.fileindex.add(self.tabs[self.tabindex])
 				self.tabs[self.tabindex].type = 'normal'
 				self.tabs[self.tabindex].position = '1.0'
 				
 				self.contents.insert(tkinter.INSERT, self.tabs[self.tabindex].contents)
+				hook.stack, hook.listener = stack, listener
 				self.contents.focus_set()
 				self.contents.see('1.0')
 				self.contents.mark_set('insert', '1.0')			
 				self.entry.insert(0, filename)
 				self.contents.edit_reset()
+				self.contents.edit_modified(False)
 		except EnvironmentError as e:
 			print(e.__str__())
 			print('\n Could not open file %s' % filename)
@@ -1262,43 +2901,242 @@ class Editor(tkinter.Toplevel):
 			if self.tabs[self.tabindex].filepath != None:
 				self.entry.insert(0, self.tabs[self.tabindex].filepath)
 			
+			
+	def start_load(self, filename, size):
+		'''	Load large file to current tab in chunks, so editor stays
+			responsive. File is read in background and inserted in
+			poll_load(). Escape cancels loading.
+		'''
+		tab = self.tabs[self.tabindex]
+		
+		# Contents of tab are put back if loading is cancelled
+		self.tabview.sync(tab)
+		
+		self.loader = loader.FileReader(filename, size)
+		self.loaded = list()
+		self.loadwidget = self.contents
+		
+		# Undo-history and journal are not used while loading
+		hook = self.loadwidget.edithook
+		self.loadhooks = (hook.stack, hook.listener)
+		hook.stack = hook.listener = None
+		
+		self.state = 'loading'
+		self.bind("<Escape>", self.cancel_load)
+		self.bind("<Button-3>", self.do_nothing)
+		
+		self.loadwidget.delete('1.0', tkinter.END)
+		self.loadwidget.config(state='disabled')
+		
+		self.loader.start()
+		self.title('Loading %s  0%%' % filename.name)
+		self.after(LOAD_INTERVAL, self.poll_load, self.loader)
+		
+		
+	def poll_load(self, reader):
+		# Cancelled
+		if reader is not self.loader:
+			return
+			
+		widget = self.loadwidget
+		deadline = time.perf_counter() + LOAD_BUDGET
+		done = False
+		error = None
+		
+		widget.config(state='normal')
+		
+		while time.perf_counter() < deadline and not self.loader.chunks.empty():
+			chunk = self.loader.chunks.get()
+			
+			if chunk is None:
+				done = True
+				break
+			elif isinstance(chunk, Exception):
+				error = chunk
+				break
+				
+			widget.insert(tkinter.END, chunk)
+			self.loaded.append(chunk)
+		
+		if error is not None:
+			print(error.__str__())
+			print('\n Could not open file %s' % self.loader.path)
+			self.cancel_load()
+			return
+		
+		if done:
+			self.finish_load()
+			return
+		
+		widget.config(state='disabled')
+		self.title('Loading %s  %d%%' % (self.loader.path.name, self.loader.progress()))
+		self.after(LOAD_INTERVAL, self.poll_load, reader)
+		
+		
+	def finish_load(self):
+		tab = self.tabs[self.tabindex]
+		widget = self.loadwidget
+		
+		tab.contents = ''.join(self.loaded)
+		tab.diskhash = tab.contenthash
+		tab.filepath = self.loader.path
+		tab.type = 'normal'
+		tab.position = '1.0'
+		self.fileindex.add(tab)
+		
+		hook = widget.edithook
+		hook.stack, hook.listener = self.loadhooks
+		widget.edit_reset()
+		widget.edit_modified(False)
+		
+		widget.mark_set('insert', '1.0')
+		widget.see('1.0')
+		
+		self.entry.delete(0, tkinter.END)
+		self.entry.insert(0, tab.filepath)
+		
+		self.end_load()
+		
+		
+	def cancel_load(self, event=None):
+		'''	Stop loading and put back previous contents of tab.
+		'''
+		tab = self.tabs[self.tabindex]
+		widget = self.loadwidget
+		
+		self.loader.cancel()
+		
+		widget.config(state='normal')
+		widget.delete('1.0', tkinter.END)
+		widget.insert('1.0', tab.contents)
+		
+		hook = widget.edithook
+		hook.stack, hook.listener = self.loadhooks
+		widget.edit_modified(False)
+		
+		if tabview.valid_position(tab.position):
+			widget.mark_set('insert', tab.position)
+		else:
+			widget.mark_set('insert', '1.0')
+		widget.see('insert')
+		
+		self.entry.delete(0, tkinter.END)
+		if tab.filepath != None:
+			self.entry.insert(0, tab.filepath)
+		
+		self.end_load()
+		return 'break'
+		
+		
+	def end_load(self):
+		self.loader = None
+		self.loaded = list()
+		self.loadwidget = None
+		self.loadhooks = None
+		
+		self.state = 'normal'
+		self.bind("<Escape>", self.do_nothing)
+		self.bind("<Button-3>", lambda event: self.raise_popup(event))
+		
+		self.contents.focus_set()
+		self.update_title()
+			
 
+	def tabify_tab(self, tab):
+		'''	Tabify indentation of tab. If tab has live widget, changed
+			part of lines are replaced in widget, as one undo-step.
+			So widget, undo-history and journal of tab stay in sync
+			with Tab.contents. Widget is disabled in search, so it is
+			enabled for edits.
+		'''
+		if tab.readonly:
+			return
+			
+		widget = self.tabview.pool.get(tab)
+		
+		if widget is None:
+			tmp = tabify.tabify(tab.contents, TAB_WIDTH)
+			if tmp is not tab.contents:
+				tab.contents = tmp
+			return
+			
+		contents = widget.get('1.0', tkinter.END)[:-1]
+		tmp = tabify.tabify(contents, TAB_WIDTH)
+		
+		if tmp is not contents:
+			state = widget.cget('state')
+			autoseparators = widget.cget('autoseparators')
+			widget.edit_separator()
+			widget.config(state='normal', autoseparators=False)
+			
+			# Newlines are not changed, so lines match
+			for linenum, (old, new) in enumerate(zip(contents.split('\n'), tmp.split('\n')), 1):
+				if old == new:
+					continue
+					
+				# Replace only part between common start and end
+				shortest = min(len(old), len(new))
+				start = end = 0
+				
+				while start < shortest and old[start] == new[start]:
+					start += 1
+					
+				while end < shortest - start and old[-end-1] == new[-end-1]:
+					end += 1
+					
+				widget.replace('%d.%d' % (linenum, start), '%d.%d' % (linenum, len(old) - end),
+					new[start:len(new) - end])
+					
+			widget.config(state=state, autoseparators=autoseparators)
+			widget.edit_separator()
+			
+		tab.contents = tmp
+		widget.edit_modified(False)
+		
+		
 	def save(self, deltab=False, forced=False):
 		''' forced when run() or quit_me()
 			deltab==True from load() and del_tab()
+			
+			Only tabs whose contents differ from file in disk are written.
 		'''
 		
 		if forced:
-			# update active tab first
-			try:
-				pos = self.contents.index(tkinter.INSERT)
-			except tkinter.TclError:
-				pos = '1.0'
-				
-			tmp = self.contents.get('1.0', tkinter.END).splitlines(True)
-	
-			# Check indent (tabify):
-			tmp[:] = [self.tabify(line) for line in tmp]
-			tmp = ''.join(tmp)[:-1]
+			# Contents and positions of tabs in pool are in their widgets.
+			# Current widget can also be self.infotext, so not using
+			# self.contents here.
+			self.tabview.sync_all()
 			
-			self.tabs[self.tabindex].position = pos
-			self.tabs[self.tabindex].contents = tmp
+			# Check indent (tabify) of active tab
+			self.tabify_tab(self.tabs[self.tabindex])
 			
-			# then save tabs to disk
+			# then save changed tabs to disk
 			for tab in self.tabs:
 				if tab.type == 'normal':
-					try:
-						with open(tab.filepath, 'w', encoding='utf-8') as f:
-							f.write(tab.contents)
-					except EnvironmentError as e:
-						print(e.__str__())
-						print('\n Could not save file %s' % tab.filepath)
-				else:
+					# not loaded, or same as in disk
+					if not tab.dirty:
+						continue
+					
+					if tab in self.conflicts:
+						print('\n File %s has changed in disk, not overwriting it.' % tab.filepath)
+						print(' Close tab to overwrite file with contents of tab.')
+						continue
+					
+					self.queue_save(tab)
+				elif tab.type == 'newtab':
 					tab.position = '1.0'
+			
+			if self.state == 'normal':
+				self.update_title()
 					
 			return
 
 		# if not forced:
+		
+		# self.contents could be self.infotext
+		if self.state != 'normal' or self.tabs[self.tabindex].readonly:
+			self.bell()
+			return
 
 		tmp = self.entry.get().strip()
 		
@@ -1314,21 +3152,18 @@ class Editor(tkinter.Toplevel):
 		except tkinter.TclError:
 			pos = '1.0'
 					
-		tmp = self.contents.get('1.0', tkinter.END).splitlines(True)
-		
 		# Check indent (tabify):
-		tmp[:] = [self.tabify(line) for line in tmp]
-		tmp = ''.join(tmp)[:-1]
+		self.tabify_tab(self.tabs[self.tabindex])
+		tmp = self.tabs[self.tabindex].contents
 		
 		self.tabs[self.tabindex].position = pos
-		self.tabs[self.tabindex].contents = tmp
 
-		openfiles = [tab.filepath for tab in self.tabs]
+		opentab = self.fileindex.find(fpath_in_entry)
 		
 		# creating new file
-		if fpath_in_entry != self.tabs[self.tabindex].filepath and not deltab:
+		if opentab is not self.tabs[self.tabindex] and not deltab:
 		
-			if fpath_in_entry in openfiles:
+			if opentab is not None:
 				self.bell()
 				print('\nFile %s already opened' % fpath_in_entry)
 				self.entry.delete(0, tkinter.END)
@@ -1353,6 +3188,7 @@ class Editor(tkinter.Toplevel):
 					with open(fpath_in_entry, 'w', encoding='utf-8') as f:
 						self.tabs[self.tabindex].filepath = fpath_in_entry
 						self.tabs[self.tabindex].type = 'normal'
+						self.fileindex.add(self.tabs[self.tabindex])
 				except EnvironmentError as e: 
 					print(e.__str__())
 					print('\n Could not save file %s' % fpath_in_entry)
@@ -1378,6 +3214,7 @@ class Editor(tkinter.Toplevel):
 					
 				self.new_tab()
 				self.tabs[self.tabindex].filepath = fpath_in_entry
+				self.fileindex.add(self.tabs[self.tabindex])
 				self.tabs[self.tabindex].contents = tmp
 				self.tabs[self.tabindex].position = pos
 				self.tabs[self.tabindex].type = 'normal'
@@ -1387,46 +3224,133 @@ class Editor(tkinter.Toplevel):
 				self.contents.insert(tkinter.INSERT, self.tabs[self.tabindex].contents)
 				self.contents.edit_reset()
 				
-				try:
-					line = self.tabs[self.tabindex].position
-					self.contents.focus_set()
-					# ensure we see something before and after
-					self.contents.see('%s - 2 lines' % line)
-					self.update_idletasks()
-					self.contents.see('%s + 2 lines' % line)
-					self.contents.mark_set('insert', line)
-				except tkinter.TclError:
-					self.tabs[self.tabindex].position = '1.0'
+				line = self.tabs[self.tabindex].position
+				
+				if not tabview.valid_position(line):
+					line = self.tabs[self.tabindex].position = '1.0'
+					
+				self.contents.focus_set()
+				# ensure we see something before and after
+				self.contents.see('%s - 2 lines' % line)
+				self.update_idletasks()
+				self.contents.see('%s + 2 lines' % line)
+				self.contents.mark_set('insert', line)
 				
 		else:
-			# skip unnecessary disk-writing silently
+			# skip unnecessary disk-writing silently, but in watch-mode
+			# save changed tabs, see toggle_watch()
 			if not deltab:
+				if self.watching:
+					self.save(forced=True)
 				return
 
 			# if closing tab or loading file:
-			try:
-				with open(self.tabs[self.tabindex].filepath, 'w', encoding='utf-8') as f:
-					f.write(tmp)
-			except EnvironmentError as e:
-				print(e.__str__())
-				print('\n Could not save file %s' % self.tabs[self.tabindex].filepath)
-				return
+			if self.tabs[self.tabindex].dirty:
+				self.queue_save(self.tabs[self.tabindex])
+				
+				
+	def queue_save(self, tab):
+		'''	Write contents of tab to its file in background. Result is
+			handled in collect_saves()
+		'''
+		info = (tab.contenthash, self.journal.mark(tab))
+		self.savequeue.put(tab, tab.filepath, tab.contents, info)
+		
+		if not self.saving:
+			self.saving = True
+			self.after(SAVE_INTERVAL, self.poll_saves)
+			
+			
+	def poll_saves(self):
+		# Checked before collecting: result is put to queue before
+		# write is marked done.
+		unfinished = self.savequeue.unfinished()
+		self.collect_saves()
+		
+		if unfinished:
+			self.after(SAVE_INTERVAL, self.poll_saves)
+		else:
+			self.saving = False
+			
+			
+	def flush_saves(self):
+		'''	Wait until queued writes are done.
+		'''
+		self.savequeue.flush()
+		self.collect_saves()
+		
+		
+	def collect_saves(self):
+		'''	Handle results of finished background writes. Failed writes
+			are reported, their tabs stay modified and are written again
+			on next save.
+		'''
+		results = self.savequeue.results
+		
+		if results.empty():
+			return
+		
+		while not results.empty():
+			tab, path, (digest, mark), error = results.get()
+			
+			if error is not None:
+				print(error.__str__())
+				print('\n Could not save file %s' % path)
+				self.bell()
+				continue
+			
+			# Edits done before save are not needed in journal anymore.
+			# If tab was closed, or another file was loaded to it,
+			# journal is removed.
+			if mark is not None:
+				header = dict(filepath=str(path), type='normal',
+					diskhash=digest.hex(), snapshot=None)
+				self.journal.rebase(mark, header)
+			
+			# Tab could have been closed or another file loaded to it
+			if tab in self.tabs and tab.filepath == path:
+				tab.diskhash = digest
+				# File was replaced, so it has new inode
+				self.fileindex.add(tab)
+				
+			self.watch_saved(path)
+		
+		if self.state == 'normal':
+			self.update_title()
 	
 ########## Save and Load End
 ########## Gotoline and Help Begin
 
 	def do_gotoline(self, event=None):
-		try:
-			line = self.entry.get().strip() + '.0'
+		if self.tabs[self.tabindex].type == 'view':
+			try:
+				line = int(self.entry.get().strip()) - 1
+			except ValueError:
+				self.bell()
+				return
+				
+			if not self.view_see(self.tabs[self.tabindex], line):
+				self.bell()
+				return
+				
 			self.contents.focus_set()
-			# ensure we see something before and after
-			self.contents.see('%s - 2 lines' % line)
-			self.update_idletasks()
-			self.contents.see('%s + 2 lines' % line)
-			self.contents.mark_set('insert', line)
 			self.stop_gotoline()
-		except tkinter.TclError as e:
-			print(e)
+			return
+			
+		line = self.entry.get().strip() + '.0'
+		
+		# Widget command does not raise TclError, see undo.EditHook.dispatch
+		if not tabview.valid_position(line):
+			self.bell()
+			return
+			
+		self.contents.focus_set()
+		# ensure we see something before and after
+		self.contents.see('%s - 2 lines' % line)
+		self.update_idletasks()
+		self.contents.see('%s + 2 lines' % line)
+		self.contents.mark_set('insert', line)
+		self.stop_gotoline()
 	
 	
 	def stop_gotoline(self, event=None):
@@ -1434,7 +3358,7 @@ class Editor(tkinter.Toplevel):
 		self.entry.bind("<Return>", self.load)
 		self.entry.delete(0, tkinter.END)
 		self.entry.insert(0, self.tabs[self.tabindex].filepath)
-		self.title(self.titlepattern % (self.tabindex + 1, len(self.tabs)))
+		self.update_title()
 		
 	
 	def gotoline(self, event=None):
@@ -1443,8 +3367,17 @@ class Editor(tkinter.Toplevel):
 			return "break"
 			
 		counter = 0
-		for line in self.contents.get('1.0', tkinter.END).splitlines():
-			counter += 1
+		tab = self.tabs[self.tabindex]
+		
+		if tab.type == 'view':
+			# Only indexed lines are known
+			counter = self.views[tab].lines()
+			if not self.views[tab].index.done:
+				counter = '%d...' % counter
+		else:
+			for line in self.contents.get('1.0', tkinter.END).splitlines():
+				counter += 1
+				
 		self.entry.bind("<Return>", self.do_gotoline)
 		self.bind("<Escape>", self.stop_gotoline)
 		self.title('Go to line, 1-%s:' % str(counter))
@@ -1461,21 +3394,7 @@ class Editor(tkinter.Toplevel):
 		self.btn_open.config(state='normal')
 		self.btn_save.config(state='normal')
 		
-		self.contents.delete('1.0', tkinter.END)
-		self.contents.insert(tkinter.INSERT, self.tabs[self.tabindex].contents)
-		
-		if self.tabs[self.tabindex].filepath:
-			self.entry.insert(0, self.tabs[self.tabindex].filepath)
-		try:
-			line = self.tabs[self.tabindex].position
-			self.contents.focus_set()
-			# ensure we see something before and after
-			self.contents.see('%s - 2 lines' % line)
-			self.update_idletasks()
-			self.contents.see('%s + 2 lines' % line)
-			self.contents.mark_set('insert', line)
-		except tkinter.TclError:
-			self.tabs[self.tabindex].position = '1.0'
+		self.show_tab()
 		
 		self.bind("<Escape>", self.do_nothing)
 		self.bind("<Button-3>", lambda event: self.raise_popup(event))
@@ -1484,15 +3403,12 @@ class Editor(tkinter.Toplevel):
 	def help(self, event=None):
 		self.state = 'help'
 		
-		try:
-			pos = self.contents.index(tkinter.INSERT)
-		except tkinter.TclError:
-			pos = '1.0'
-		
-		self.tabs[self.tabindex].position = pos
-		tmp = self.contents.get('1.0', tkinter.END)
-		# [:-1]: remove unwanted extra newline
-		self.tabs[self.tabindex].contents = tmp[:-1]
+		self.contents = self.infotext
+		self.tabview.show(self.contents)
+		self.showing_output = False
+			
+		if self.helptxt is None:
+			self.helptxt = resource(HELPPATH).read_text(encoding='utf-8')
 			
 		self.entry.delete(0, tkinter.END)
 		self.contents.delete('1.0', tkinter.END)
@@ -1505,14 +3421,153 @@ class Editor(tkinter.Toplevel):
 		
 		self.bind("<Button-3>", self.do_nothing)
 		self.bind("<Escape>", self.stop_help)
-			
+		
 ########## Gotoline and Help End
+########## Quick Open Begin
+
+	def quick_open(self, event=None):
+		'''	Find file under current directory by typing parts of its path
+			to entry. Up and Down choose file, Return opens it.
+		'''
+		if self.state != 'normal':
+			self.bell()
+			return 'break'
+			
+		if self.projectindex is None:
+			self.projectindex = projectfiles.ProjectIndex(pathlib.Path().cwd())
+			self.projectindex.start()
+			
+		self.state = 'quickopen'
+		self.contents = self.infotext
+		self.tabview.show(self.contents)
+		self.showing_output = False
+		
+		self.btn_open.config(state='disabled')
+		self.btn_save.config(state='disabled')
+		self.bind("<Button-3>", self.do_nothing)
+		self.bind("<Escape>", self.stop_quick_open)
+		self.entry.bind("<Return>", self.quick_open_choose)
+		self.entry.bind("<KeyRelease>", self.quick_open_typed)
+		self.entry.bind("<Up>", lambda event: self.quick_open_move(-1))
+		self.entry.bind("<Down>", lambda event: self.quick_open_move(1))
+		
+		self.entry.delete(0, tkinter.END)
+		self.entry.focus_set()
+		self.quickopen_query = None
+		self.quick_open_update()
+		
+		return 'break'
+		
+		
+	def quick_open_typed(self, event=None):
+		'''	Keystrokes are coalesced: results are updated once
+			when editor is idle.
+		'''
+		if not self.quickopen_pending:
+			self.quickopen_pending = True
+			self.after_idle(self.quick_open_update)
+			
+			
+	def quick_open_update(self):
+		self.quickopen_pending = False
+		
+		if self.state != 'quickopen':
+			return
+			
+		index = self.projectindex
+		query = self.entry.get().strip()
+		
+		if not index.done:
+			self.after(QUICKOPEN_INTERVAL, self.quick_open_typed)
+			
+		# Nothing typed, only moved in results, or index not updated
+		if query == self.quickopen_query and index.files is self.matcher.files:
+			return
+			
+		self.quickopen_query = query
+		self.quickopen_results = self.matcher.match(query, index.files)
+		self.quickopen_index = 0
+		
+		self.contents.delete('1.0', tkinter.END)
+		self.contents.insert('1.0', '\n'.join(self.quickopen_results))
+		self.quick_open_move(0)
+		
+		title = 'Open: %d files' % len(self.matcher.matches)
+		if not index.done:
+			title += ', indexing...'
+			
+		self.title(title)
+		
+		
+	def quick_open_move(self, step):
+		'''	Choose result step lines up or down from current one.
+		'''
+		if len(self.quickopen_results) == 0:
+			return 'break'
+			
+		self.quickopen_index = max(0, min(len(self.quickopen_results) - 1,
+			self.quickopen_index + step))
+			
+		line = self.quickopen_index + 1
+		
+		self.contents.tag_remove('found', '1.0', tkinter.END)
+		self.contents.tag_add('found', '%d.0' % line, '%d.0 lineend' % line)
+		self.contents.see('%d.0' % line)
+		
+		return 'break'
+		
+		
+	def quick_open_choose(self, event=None):
+		'''	Open chosen file, python-files for editing, others read-only.
+		'''
+		# Results can be from query before last keystrokes
+		self.quick_open_update()
+		
+		if len(self.quickopen_results) == 0:
+			self.bell()
+			return 'break'
+			
+		path = self.quickopen_results[self.quickopen_index]
+		self.stop_quick_open()
+		
+		self.entry.delete(0, tkinter.END)
+		self.entry.insert(0, path)
+		
+		if '.py' in path:
+			self.load(event)
+		else:
+			self.view_file()
+			
+		return 'break'
+		
+		
+	def stop_quick_open(self, event=None):
+		self.state = 'normal'
+		
+		self.entry.unbind("<KeyRelease>")
+		self.entry.unbind("<Up>")
+		self.entry.unbind("<Down>")
+		self.entry.bind("<Return>", self.load)
+		self.btn_open.config(state='normal')
+		self.btn_save.config(state='normal')
+		
+		self.bind("<Escape>", self.do_nothing)
+		self.bind("<Button-3>", lambda event: self.raise_popup(event))
+		
+		self.contents.tag_remove('found', '1.0', tkinter.END)
+		self.show_tab()
+		
+########## Quick Open End
 ########## Indent and Comment Begin
 
 	def indent(self, event=None):
 		if self.state != 'normal':
 			self.bell()
 			
+		# Widget command does not raise TclError, see undo.EditHook.dispatch
+		if not self.contents.tag_ranges('sel'):
+			return
+			
 		try:
 			startline = int(self.contents.index(tkinter.SEL_FIRST).split(sep='.')[0])
 			endline = int(self.contents.index(tkinter.SEL_LAST).split(sep='.')[0])
@@ -1531,6 +3586,10 @@ class Editor(tkinter.Toplevel):
 			self.bell()
 			return "break"
 			
+		# Widget command does not raise TclError, see undo.EditHook.dispatch
+		if not self.contents.tag_ranges('sel'):
+			return "break"
+			
 		try:
 			startline = int(self.contents.index(tkinter.SEL_FIRST).split(sep='.')[0])
 			endline = int(self.contents.index(tkinter.SEL_LAST).split(sep='.')[0])
@@ -1564,6 +3623,10 @@ class Editor(tkinter.Toplevel):
 			self.bell()
 			return "break"
 			
+		# Widget command does not raise TclError, see undo.EditHook.dispatch
+		if not self.contents.tag_ranges('sel'):
+			return "break"
+			
 		try:
 			startline = int(self.contents.index(tkinter.SEL_FIRST).split(sep='.')[0])
 			endline = int(self.contents.index(tkinter.SEL_LAST).split(sep='.')[0])
@@ -1586,6 +3649,10 @@ class Editor(tkinter.Toplevel):
 			self.bell()
 			return "break"
 			
+		# Widget command does not raise TclError, see undo.EditHook.dispatch
+		if not self.contents.tag_ranges('sel'):
+			return "break"
+			
 		try:
 			startline = int(self.contents.index(tkinter.SEL_FIRST).split(sep='.')[0])
 			endline = int(self.contents.index(tkinter.SEL_LAST).split(sep='.')[0])
@@ -1747,6 +3814,10 @@ class Editor(tkinter.Toplevel):
 			
 		
 	def start_search(self, event=None):
+		if self.tabs[self.tabindex].type == 'view':
+			self.view_search()
+			return
+			
 		self.old_word = self.entry.get()
 		self.contents.tag_remove('match', '1.0', tkinter.END)
 		self.contents.tag_remove('found', '1.0', tkinter.END)
@@ -1791,7 +3862,8 @@ class Editor(tkinter.Toplevel):
 				
 				
 	def stop_search(self, event=None):
-		self.contents.config(state='normal')
+		if not self.tabs[self.tabindex].readonly:
+			self.contents.config(state='normal')
 		self.entry.config(state='normal')
 		self.btn_open.config(state='normal')
 		self.btn_save.config(state='normal')
@@ -1805,7 +3877,7 @@ class Editor(tkinter.Toplevel):
 		self.new_word = ''
 		self.search_matches = 0
 		self.replace_overlap_index = None
-		self.title(self.titlepattern % (self.tabindex + 1, len(self.tabs)))
+		self.update_title()
 		self.state = 'normal'
 		self.contents.focus_set()
 
@@ -1830,7 +3902,7 @@ class Editor(tkinter.Toplevel):
 ################ Replace Begin
 
 	def replace(self, event=None, state='replace'):
-		if self.state != 'normal':
+		if self.state != 'normal' or self.tabs[self.tabindex].readonly:
 			self.bell()
 			return "break"
 			
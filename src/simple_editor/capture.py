@@ -0,0 +1,358 @@
+'''	Bootstrap of file run from editor, run as script:
+
+	python capture.py options path [arg ...]
+
+	Environment variable SIMPLE_EDITOR_CAPTURE is file descriptor of pipe
+	to editor. Exceptions are sent to it as they happen, one json per line:
+	dict with keys kind, type, message and frames, frames is list of
+	[filename, line, function]. kind is one of:
+
+		uncaught	from sys.excepthook
+		thread		from threading.excepthook
+		logged		logging record with exception, if options has logging
+		handled		exception caught in file under directory of path,
+					if options has handled and python is 3.12 or newer
+
+	If options has profile, file is run with cProfile, and when it ends
+	statistics are sent as dict with keys kind, which is profile, and
+	rows. Row is: [filename, line, function, primitive calls, calls,
+	self time, cumulative time]. Only main thread is profiled.
+
+	If options has memory, or memory=seconds, file is run with tracemalloc.
+	Snapshot is taken at exit, while objects of file are still alive, and
+	every seconds if given. They are sent as dict with keys kind, which is
+	memory, final, time, current, peak and rows. Row is: [filename, line,
+	size, count, peak], peak of line is largest size in snapshots.
+	Only the final one has rows, at most MEMORY_ROWS with largest peak.
+
+	If options has cpu=seconds or as=bytes, they are set as soft limits of
+	cpu time and address space of process with resource.setrlimit(),
+	before file is run. Only where resource module is available.
+
+	options is comma separated, or - for none. Also used by forkhelper.py.
+	Only standard library is used, because this is not run as part of
+	package, and it is run with python of file being run.
+'''
+
+import traceback
+import threading
+import runpy
+import heapq
+import json
+import time
+import sys
+import os
+
+
+ENV = 'SIMPLE_EDITOR_CAPTURE'
+
+# Max count of exceptions sent, so that loop raising and catching
+# does not flood editor
+MAX_RECORDS = 1000
+
+# Max count of lines sent in memory snapshot
+MEMORY_ROWS = 1000
+
+_channel = None
+_count = 0
+_lock = threading.Lock()
+# (filename, line) as key, largest size in memory snapshots as value
+_peaks = dict()
+
+
+def write(record):
+	if _channel is None:
+		return
+
+	data = json.dumps(record)
+
+	with _lock:
+		try:
+			_channel.write(data + '\n')
+			_channel.flush()
+		except (OSError, ValueError):
+			pass
+
+
+def send(kind, etype, value, tb):
+	global _count
+
+	with _lock:
+		if _count >= MAX_RECORDS:
+			return
+
+		_count += 1
+
+	try:
+		message = str(value)
+	except Exception:
+		message = ''
+
+	frames = [ [f.filename, f.lineno, f.name] for f in traceback.extract_tb(tb) ]
+
+	# Location of SyntaxError is not in traceback, last frame is in runpy
+	filename = getattr(value, 'filename', None)
+	lineno = getattr(value, 'lineno', None)
+
+	if isinstance(filename, str) and isinstance(lineno, int):
+		if not frames or frames[-1][:2] != [filename, lineno]:
+			frames.append([filename, lineno, '<module>'])
+
+	write(dict(kind=kind, type=etype.__name__, message=message, frames=frames))
+
+
+def send_profile(profiler):
+	import pstats
+
+	rows = [ [filename, line, function, cc, nc, tt, ct]
+		for (filename, line, function), (cc, nc, tt, ct, callers)
+		in pstats.Stats(profiler).stats.items() if filename != __file__ ]
+
+	write(dict(kind='profile', rows=rows))
+
+
+def send_memory(final, start):
+	import tracemalloc
+
+	snapshot = tracemalloc.take_snapshot().filter_traces((
+		tracemalloc.Filter(False, __file__),
+		tracemalloc.Filter(False, tracemalloc.__file__)
+		))
+
+	current, peak = tracemalloc.get_traced_memory()
+	sizes = dict()
+
+	for stat in snapshot.statistics('lineno'):
+		frame = stat.traceback[0]
+		key = (frame.filename, frame.lineno)
+		sizes[key] = (stat.size, stat.count)
+
+		if stat.size > _peaks.get(key, 0):
+			_peaks[key] = stat.size
+
+	rows = list()
+
+	if final:
+		for key in heapq.nlargest(MEMORY_ROWS, _peaks, key=_peaks.get):
+			size, count = sizes.get(key, (0, 0))
+			rows.append([*key, size, count, _peaks[key]])
+
+	write(dict(kind='memory', final=final, time=time.monotonic() - start,
+		current=current, peak=peak, rows=rows))
+
+
+def install(fd, options, path):
+	'''	Send exceptions to file descriptor fd, see module docstring.
+	'''
+	global _channel
+
+	os.set_inheritable(fd, False)
+	_channel = os.fdopen(fd, 'w', encoding='utf-8')
+	options = options.split(',')
+
+	excepthook = sys.excepthook
+
+	def hook(etype, value, tb):
+		send('uncaught', etype, value, tb)
+		excepthook(etype, value, tb)
+
+	sys.excepthook = hook
+
+	threadhook = threading.excepthook
+
+	def thread_hook(args):
+		if args.exc_type is not SystemExit:
+			send('thread', args.exc_type, args.exc_value, args.exc_traceback)
+		threadhook(args)
+
+	threading.excepthook = thread_hook
+
+	if 'logging' in options:
+		# Handler is not added, it would prevent logging.basicConfig()
+		import logging
+
+		handle = logging.Logger.handle
+
+		def logged(self, record):
+			if record.exc_info and record.exc_info[0] is not None:
+				send('logged', *record.exc_info)
+			return handle(self, record)
+
+		logging.Logger.handle = logged
+
+	if 'handled' in options and hasattr(sys, 'monitoring'):
+		monitoring = sys.monitoring
+		root = os.path.dirname(os.path.abspath(path)) + os.sep
+
+		def handled(code, offset, exc):
+			if code.co_filename.startswith(root):
+				send('handled', type(exc), exc, exc.__traceback__)
+
+		for tool in range(5, 1, -1):
+			try:
+				monitoring.use_tool_id(tool, 'simple-editor')
+			except ValueError:
+				continue
+
+			monitoring.register_callback(tool, monitoring.events.EXCEPTION_HANDLED, handled)
+			monitoring.set_events(tool, monitoring.events.EXCEPTION_HANDLED)
+			break
+
+
+def parse(options):
+	'''	Returns keyword arguments of run() from options.
+	'''
+	kwargs = dict(profile=False, memory=None, limits=dict())
+
+	for option in options.split(','):
+		name, sep, value = option.partition('=')
+
+		if name in ('cpu', 'as') and value.isdigit():
+			kwargs['limits'][name] = int(value)
+
+		elif name == 'profile':
+			kwargs['profile'] = True
+
+		elif name == 'memory':
+			try:
+				kwargs['memory'] = float(value or 0)
+			except ValueError:
+				kwargs['memory'] = 0
+
+	return kwargs
+
+
+def set_limits(limits):
+	'''	Set soft limits, limits has keys cpu and as, see module docstring.
+	'''
+	try:
+		import resource
+	except ImportError:
+		print('Limits are not supported on this platform', file=sys.stderr)
+		return
+
+	for name, value in limits.items():
+		limit = resource.RLIMIT_CPU if name == 'cpu' else resource.RLIMIT_AS
+
+		try:
+			soft, hard = resource.getrlimit(limit)
+
+			if hard != resource.RLIM_INFINITY:
+				value = min(value, hard)
+
+			resource.setrlimit(limit, (value, hard))
+
+		except (ValueError, OSError) as e:
+			print('Could not set limit %s: %s' % (name, e), file=sys.stderr)
+
+
+def run(path, profile=False, memory=None, limits=None):
+	'''	Run file path as __main__, returns exit code. Frames of this file,
+		its caller and runpy are hidden from traceback of uncaught
+		exception, like when file is run normally.
+
+		If profile is True, file is run with cProfile. If memory is not
+		None, file is run with tracemalloc, and memory is interval of
+		snapshots in seconds, 0 for only at exit. See module docstring.
+		limits is dict of limits to set before running, see set_limits().
+	'''
+	if limits:
+		set_limits(limits)
+
+	if profile:
+		import cProfile
+
+		profiler = cProfile.Profile()
+
+		try:
+			return profiler.runcall(run_file, path)
+		finally:
+			send_profile(profiler)
+
+	if memory is not None:
+		return trace_memory(path, memory)
+
+	return run_file(path)
+
+
+def trace_memory(path, interval):
+	import tracemalloc
+
+	start = time.monotonic()
+	stop = threading.Event()
+
+	def snapshots():
+		while not stop.wait(interval):
+			send_memory(False, start)
+
+	thread = threading.Thread(target=snapshots, name='simple-editor-memory', daemon=True)
+
+	def finish():
+		stop.set()
+
+		if thread.is_alive():
+			thread.join()
+
+		send_memory(True, start)
+		tracemalloc.stop()
+
+	tracemalloc.start()
+
+	if interval > 0:
+		thread.start()
+
+	return run_file(path, finish)
+
+
+def run_file(path, finish=None):
+	try:
+		try:
+			runpy.run_path(path, run_name='__main__')
+		finally:
+			# Objects of file are still alive here
+			if finish is not None:
+				finish()
+
+	except SystemExit as e:
+		if e.code is None:
+			return 0
+		elif isinstance(e.code, int):
+			return e.code
+
+		print(e.code, file=sys.stderr)
+		return 1
+
+	except BaseException:
+		etype, value, tb = sys.exc_info()
+		target = os.path.abspath(path)
+
+		while tb is not None and tb.tb_next is not None:
+			if os.path.abspath(tb.tb_frame.f_code.co_filename) == target:
+				break
+			tb = tb.tb_next
+
+		sys.excepthook(etype, value.with_traceback(tb), tb)
+		return 1
+
+	return 0
+
+
+def main():
+	options, path = sys.argv[1:3]
+	sys.argv = sys.argv[2:]
+	sys.path[0] = os.path.dirname(os.path.abspath(path))
+
+	fd = os.environ.pop(ENV, None)
+	if fd is not None:
+		install(int(fd), options, path)
+
+	code = run(path, **parse(options))
+
+	sys.stdout.flush()
+	sys.stderr.flush()
+	sys.exit(code)
+
+
+if __name__ == '__main__':
+	main()
+
@@ -1,5 +1,7 @@
 import tkinter
 
+from . import fontcache
+
 
 class FontChooser(tkinter.Toplevel):
 		
@@ -10,22 +12,9 @@ class FontChooser(tkinter.Toplevel):
 		super().__init__(self.root)
 		self.title('Choose Font')
 		self.fonts = fontlist
-		self.badfonts = frozenset([
-					'Standard Symbols PS',
-					'OpenSymbol',
-					'Noto Color Emoji',
-					'FontAwesome',
-					'Dingbats',
-					'Droid Sans Fallback',
-					'D050000L'
-					])
-					
-		self.fontnames = [f for f in tkinter.font.families() if f not in self.badfonts]
 		
-		# Remove duplicates then sort
-		s = set(self.fontnames)
-		self.fontnames = [f for f in s]
-		self.fontnames.sort()
+		# Sorted, without duplicates and fontcache.BADFONTS
+		self.fontnames = fontcache.families()
 		self.max = 42
 		self.min = 8
 		
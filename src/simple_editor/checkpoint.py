@@ -0,0 +1,116 @@
+import threading
+import hashlib
+import pathlib
+import queue
+import json
+import stat
+import os
+
+
+def atomic_write(path, data, fsync=False):
+	'''	Write string data to path so that path has always either old or
+		new contents: data is first written to temporary file in same
+		directory, which is then renamed over path. Permissions and
+		owner of existing file are kept. If path is symlink, its target
+		is written and link is left as is.
+
+		If fsync is True, data is flushed to disk before renaming.
+	'''
+	path = pathlib.Path(os.path.realpath(path))
+	tmppath = path.with_name('.%s.%d.%d.tmp' % (path.name, os.getpid(),
+		threading.get_ident()))
+
+	fd = os.open(tmppath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+
+	try:
+		with os.fdopen(fd, 'w', encoding='utf-8') as f:
+			f.write(data)
+
+			if fsync:
+				f.flush()
+				os.fsync(f.fileno())
+
+		try:
+			st = os.stat(path)
+		except FileNotFoundError:
+			st = None
+
+		if st is not None:
+			os.chmod(tmppath, stat.S_IMODE(st.st_mode))
+
+			# Only possible to other owner with privileges
+			try:
+				os.chown(tmppath, st.st_uid, st.st_gid)
+			except (PermissionError, AttributeError):
+				pass
+
+		os.replace(tmppath, path)
+
+	except BaseException:
+		try:
+			os.unlink(tmppath)
+		except OSError:
+			pass
+		raise
+
+
+class CheckpointWriter(threading.Thread):
+	'''	Writes configuration snapshots, dicts from Editor.get_config(),
+		to path in background. Only latest snapshot put to queue is
+		written, and it is skipped if it has not changed since last write.
+	'''
+
+	def __init__(self, path):
+		super().__init__(daemon=True)
+		self.path = path
+		self.queue = queue.Queue()
+		self.lasthash = None
+
+
+	def put(self, snapshot):
+		self.queue.put(snapshot)
+
+
+	def stop(self):
+		'''	Write pending snapshot and wait for thread to finish.
+		'''
+		if self.is_alive():
+			self.queue.put(None)
+			self.join()
+
+
+	def run(self):
+		while True:
+			snapshot = self.queue.get()
+			stopping = snapshot is None
+
+			# Skip to latest snapshot
+			while not self.queue.empty():
+				tmp = self.queue.get()
+
+				if tmp is None:
+					stopping = True
+				else:
+					snapshot = tmp
+
+			if snapshot is not None:
+				self.write(snapshot)
+
+			if stopping:
+				break
+
+
+	def write(self, snapshot):
+		string_representation = json.dumps(snapshot)
+		digest = hashlib.blake2b(string_representation.encode('utf-8')).digest()
+
+		if digest == self.lasthash:
+			return
+
+		try:
+			atomic_write(self.path, string_representation)
+			self.lasthash = digest
+		except EnvironmentError as e:
+			print(e.__str__())
+			print('\nCould not save configuration checkpoint')
+
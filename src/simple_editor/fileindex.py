@@ -0,0 +1,93 @@
+import pathlib
+import os
+
+
+def file_key(path):
+	'''	Identity of file: device and inode, so that same file opened
+		through symlink or with different path is recognized.
+		If file can not be stat'ed, resolved path is used instead.
+	'''
+	try:
+		st = os.stat(path)
+		return ('inode', st.st_dev, st.st_ino)
+	except OSError:
+		return ('path', resolved(path))
+
+
+def resolved(path):
+	return str(pathlib.Path(path).resolve())
+
+
+class FileIndex:
+	'''	Maps files of tabs to tabs, so checking if file is already open
+		does not need to go through all tabs.
+
+		Tab is indexed both by file_key() and by resolved path of its
+		filepath, because inode of file changes when it is replaced.
+	'''
+
+	def __init__(self):
+		self.bykey = dict()
+		self.bypath = dict()
+		# Tab as key, (key, resolved path) as value
+		self.entries = dict()
+
+
+	def add(self, tab):
+		'''	Add tab, or update it if its filepath has changed.
+			Tabs without filepath are not indexed.
+		'''
+		self.remove(tab)
+
+		if tab.filepath is None:
+			return
+
+		key = file_key(tab.filepath)
+		path = resolved(tab.filepath)
+
+		self.bykey[key] = tab
+		self.bypath[path] = tab
+		self.entries[tab] = (key, path)
+
+
+	def remove(self, tab):
+		entry = self.entries.pop(tab, None)
+		if entry is None:
+			return
+
+		key, path = entry
+
+		if self.bykey.get(key) is tab:
+			del self.bykey[key]
+		if self.bypath.get(path) is tab:
+			del self.bypath[path]
+
+
+	def rebuild(self, tabs):
+		self.bykey.clear()
+		self.bypath.clear()
+		self.entries.clear()
+
+		for tab in tabs:
+			self.add(tab)
+
+
+	def find(self, path):
+		'''	Return tab which has file path open, or None.
+
+			If file of tab was replaced outside of editor, its old inode
+			can be reused by some other file. So key of tab is checked
+			before returning it, and stale entry is indexed again.
+		'''
+		key = file_key(path)
+		tab = self.bykey.get(key)
+
+		if tab is not None and file_key(tab.filepath) != key:
+			self.add(tab)
+			tab = None
+
+		if tab is None:
+			tab = self.bypath.get(resolved(path))
+
+		return tab
+
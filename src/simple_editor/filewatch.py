@@ -0,0 +1,246 @@
+import struct
+import errno
+import sys
+import os
+
+
+# From sys/inotify.h
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Files are replaced by renaming, so directories are watched
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_ONLYDIR
+
+# struct inotify_event without name: wd, mask, cookie, len
+EVENT = struct.Struct('iIII')
+
+
+def signature(path):
+	'''	Used when polling: file has changed if its signature has changed.
+	'''
+	try:
+		st = os.stat(path)
+		return (st.st_mtime_ns, st.st_size, st.st_ino)
+	except OSError:
+		return None
+
+
+class FileWatcher:
+	'''	Tells which of watched files have changed in disk.
+
+		On Linux inotify is used: parent directories of files are watched
+		and self.fileno() becomes readable when something has happened,
+		then changes are read with read_events(). Elsewhere, or if
+		inotify can not be used, files are polled with poll().
+
+		Directories that can not be watched with inotify are polled
+		with poll(unwatched=True)
+
+		Paths are strings, as returned by fileindex.resolved()
+	'''
+
+	def __init__(self, use_inotify=True):
+		# path as key, signature() as value
+		self.files = dict()
+
+		# directory as key, set of names of watched files in it as value
+		self.names = dict()
+
+		# inotify watch descriptors, directory as key or as value
+		self.wds = dict()
+		self.dirs = dict()
+
+		self.fd = None
+		self.libc = None
+		self.ctypes = None
+
+		if use_inotify and sys.platform.startswith('linux'):
+			self.init_inotify()
+
+
+	def init_inotify(self):
+		import ctypes
+		import ctypes.util
+
+		try:
+			libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+			fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+		except (OSError, AttributeError) as e:
+			print(e.__str__())
+			print('\n Could not use inotify, polling files instead')
+			return
+
+		if fd < 0:
+			print(os.strerror(ctypes.get_errno()))
+			print('\n Could not use inotify, polling files instead')
+			return
+
+		self.ctypes = ctypes
+		self.libc = libc
+		self.fd = fd
+
+
+	def fileno(self):
+		'''	inotify file descriptor, or None when polling.
+		'''
+		return self.fd
+
+
+	def set_files(self, paths):
+		'''	Watch files paths, and stop watching others.
+		'''
+		paths = set(paths)
+
+		for path in list(self.files):
+			if path not in paths:
+				del self.files[path]
+
+		for path in paths:
+			if path not in self.files:
+				self.files[path] = signature(path)
+
+		names = dict()
+		for path in paths:
+			directory, name = os.path.split(path)
+			names.setdefault(directory, set()).add(name)
+
+		self.names = names
+
+		if self.fd is None:
+			return
+
+		for directory in list(self.wds):
+			if directory not in names:
+				wd = self.wds.pop(directory)
+				self.dirs.pop(wd, None)
+				self.libc.inotify_rm_watch(self.fd, wd)
+
+		for directory in names:
+			if directory in self.wds:
+				continue
+
+			wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+
+			if wd < 0:
+				# Too many watches: poll this directory instead
+				err = self.ctypes.get_errno()
+				if err != errno.ENOENT:
+					print(os.strerror(err))
+					print('\n Could not watch directory %s' % directory)
+				continue
+
+			self.wds[directory] = wd
+			self.dirs[wd] = directory
+
+
+	def read_events(self):
+		'''	Returns set of paths of watched files that have changed,
+			according to inotify.
+		'''
+		res = set()
+
+		while True:
+			try:
+				data = os.read(self.fd, 65536)
+			except BlockingIOError:
+				break
+
+			if not data:
+				break
+
+			offset = 0
+
+			while offset < len(data):
+				wd, mask, cookie, length = EVENT.unpack_from(data, offset)
+				offset += EVENT.size
+				name = data[offset:offset + length].rstrip(b'\0')
+				offset += length
+
+				if mask & IN_Q_OVERFLOW:
+					# Events were lost
+					res.update(self.files)
+					continue
+
+				directory = self.dirs.get(wd)
+				if directory is None:
+					continue
+
+				name = os.fsdecode(name)
+				if name in self.names.get(directory, ()):
+					res.add(os.path.join(directory, name))
+
+		for path in res:
+			self.files[path] = signature(path)
+
+		return res
+
+
+	def poll(self, unwatched=False):
+		'''	Returns set of paths of files whose signature() has changed
+			since last call. If unwatched is True, only files in
+			directories not watched with inotify are checked.
+		'''
+		res = set()
+
+		for path, old in self.files.items():
+			if unwatched and os.path.dirname(path) in self.wds:
+				continue
+
+			new = signature(path)
+
+			if new != old:
+				self.files[path] = new
+				res.add(path)
+
+		return res
+
+
+	def close(self):
+		if self.fd is not None:
+			os.close(self.fd)
+			self.fd = None
+
+
+def lines(text):
+	'''	Lines of text with their line ends. Only newline ends line, like
+		in Text-widget, str.splitlines() would also split at form feed.
+	'''
+	res = [ line + '\n' for line in text.split('\n') ]
+	res[-1] = res[-1][:-1]
+
+	if not res[-1]:
+		res.pop()
+
+	return res
+
+
+def patch(widget, old, new):
+	'''	Change contents of Text-widget widget from old to new by replacing
+		only changed lines, so marks, tags and view of unchanged lines
+		are kept.
+	'''
+	import difflib
+
+	oldlines = lines(old)
+	newlines = lines(new)
+
+	matcher = difflib.SequenceMatcher(None, oldlines, newlines, autojunk=False)
+	opcodes = matcher.get_opcodes()
+
+	# From end to start, so that line numbers of earlier changes stay same
+	for tag, i1, i2, j1, j2 in reversed(opcodes):
+		if tag == 'equal':
+			continue
+
+		if i2 > i1:
+			widget.delete('%d.0' % (i1 + 1), '%d.0' % (i2 + 1))
+
+		if j2 > j1:
+			widget.insert('%d.0' % (i1 + 1), ''.join(newlines[j1:j2]))
+
@@ -0,0 +1,116 @@
+import codecs
+import io
+import os
+
+
+# When file is opened, or when more than this has been written to it
+# since last read, only last TAIL_BYTES bytes of it are read
+TAIL_BYTES = 256 * 2**10
+
+
+class Follower:
+	'''	Follows file that is being written to, like tail -F. read()
+		returns what has been written since last call, decoded as utf-8
+		with universal newlines.
+
+		If file is truncated, it is read again from start. If file is
+		replaced, as when log is rotated, rest of old file is read and
+		then new file is followed.
+	'''
+
+	def __init__(self, path):
+		self.path = path
+		self.file = None
+		self.inode = None
+		self.offset = 0
+		self.decoder = None
+
+
+	def open(self):
+		'''	(Re)open file, returns False if it can not be opened.
+		'''
+		try:
+			f = open(self.path, 'rb')
+		except OSError:
+			return False
+
+		self.close()
+		self.file = f
+		self.inode = os.fstat(f.fileno()).st_ino
+		self.offset = 0
+		self.new_decoder()
+
+		return True
+
+
+	def new_decoder(self):
+		self.decoder = io.IncrementalNewlineDecoder(
+			codecs.getincrementaldecoder('utf-8')(errors='replace'), translate=True)
+
+
+	def skip(self, size):
+		'''	Skip to start of first line in last TAIL_BYTES of file.
+		'''
+		self.file.seek(size - TAIL_BYTES)
+		self.file.readline()
+		self.offset = self.file.tell()
+		self.new_decoder()
+
+
+	def read_new(self):
+		'''	Returns (text, restarted) from current file, see read()
+		'''
+		restarted = False
+		size = os.fstat(self.file.fileno()).st_size
+
+		if size < self.offset:
+			# Truncated
+			self.file.seek(0)
+			self.offset = 0
+			self.new_decoder()
+			restarted = True
+
+		if size - self.offset > TAIL_BYTES:
+			self.skip(size)
+			restarted = True
+
+		data = self.file.read(TAIL_BYTES)
+		self.offset += len(data)
+
+		return self.decoder.decode(data), restarted
+
+
+	def read(self):
+		'''	Returns (text, restarted). If restarted is True, text does not
+			continue text returned earlier: file was truncated or
+			opened, or part of it was skipped.
+		'''
+		try:
+			inode = os.stat(self.path).st_ino
+		except OSError:
+			# Removed or renamed, old file is read until new one appears
+			inode = None
+
+		if self.file is None:
+			if inode is None or not self.open():
+				return '', False
+
+			text, restarted = self.read_new()
+			return text, True
+
+		text, restarted = self.read_new()
+
+		if inode is not None and inode != self.inode and self.open():
+			# Rotated, rest of old file was read above
+			tmp, skipped = self.read_new()
+			text += tmp
+			restarted = restarted or skipped
+
+		return text, restarted
+
+
+	def close(self):
+		if self.file is not None:
+			self.file.close()
+			self.file = None
+
@@ -0,0 +1,82 @@
+import tkinter.font
+import pathlib
+import json
+import os
+
+from .checkpoint import atomic_write
+
+
+# Kept in cwd like editor.cnf
+CACHEPATH = pathlib.Path().cwd() / 'editor.fonts'
+
+BADFONTS = frozenset([
+					'Standard Symbols PS',
+					'OpenSymbol',
+					'Noto Color Emoji',
+					'FontAwesome',
+					'Dingbats',
+					'Droid Sans Fallback',
+					'D050000L'
+					])
+
+# Fontconfig updates these when fonts are installed or removed
+FONTCONFIG_CACHEDIRS = [
+	pathlib.Path(os.environ.get('XDG_CACHE_HOME', pathlib.Path.home() / '.cache')) / 'fontconfig',
+	pathlib.Path('/var/cache/fontconfig')
+	]
+
+# In memory for the process: (stamp, families)
+_cache = None
+
+
+def stamp():
+	'''	Modification times of fontconfig cache directories. When this
+		changes, cached font families are not valid anymore.
+	'''
+	res = list()
+
+	for directory in FONTCONFIG_CACHEDIRS:
+		try:
+			res.append([str(directory), os.stat(directory).st_mtime_ns])
+		except OSError:
+			pass
+
+	return res
+
+
+def families(root=None, cachepath=CACHEPATH):
+	'''	Returns sorted list of names of font families, without duplicates
+		and without BADFONTS. This is same as filtering result of
+		tkinter.font.families(), which is slow when there are lots of
+		fonts, so result is cached in memory and in cachepath.
+	'''
+	global _cache
+
+	current = stamp()
+
+	if _cache is not None and _cache[0] == current:
+		return list(_cache[1])
+
+	try:
+		with open(cachepath, 'r', encoding='utf-8') as f:
+			data = json.load(f)
+
+		if data['stamp'] == current:
+			_cache = (current, data['families'])
+			return list(_cache[1])
+
+	except (EnvironmentError, ValueError, KeyError, TypeError):
+		pass
+
+	fontnames = set(f for f in tkinter.font.families(root) if f not in BADFONTS)
+	fontnames = sorted(fontnames)
+	_cache = (current, fontnames)
+
+	try:
+		atomic_write(cachepath, json.dumps(dict(stamp=current, families=fontnames)))
+	except EnvironmentError as e:
+		print(e.__str__())
+		print('\nCould not save font cache %s' % cachepath)
+
+	return list(fontnames)
+
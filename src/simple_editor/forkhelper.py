@@ -0,0 +1,159 @@
+'''	Helper process of runner.ForkServer, run as script:
+
+	python forkhelper.py socketpath [module ...]
+
+	Imports modules, then listens socketpath. For every connection, request
+	is read: json with keys path, cwd and options, and with it file
+	descriptors for stdout and stderr, and optionally third one to which
+	exceptions are sent, see capture.py. Child is forked to run file path
+	as __main__, its pid is sent back, and when child exits:
+	exit <code> <user time> <system time> <ru_maxrss>
+
+	Only standard library is used, because this is not run as part of
+	package, and it is run with python of file being run.
+'''
+
+import importlib
+import selectors
+import traceback
+import threading
+import socket
+import atexit
+import json
+import sys
+import os
+
+import capture
+
+
+def run_child(request, fds):
+	'''	In forked child: run file, never returns.
+	'''
+	os.setsid()
+	os.dup2(fds[0], 1)
+	os.dup2(fds[1], 2)
+
+	for fd in fds[:2]:
+		os.close(fd)
+
+	code = 1
+
+	try:
+		path = request['path']
+		os.chdir(request['cwd'])
+		sys.argv = [path]
+		sys.path[0] = os.path.dirname(os.path.abspath(path))
+
+		options = request.get('options') or '-'
+
+		if len(fds) == 3:
+			capture.install(fds[2], options, path)
+
+		code = capture.run(path, **capture.parse(options))
+
+	finally:
+		# Like at normal exit of interpreter: wait for non-daemon threads,
+		# run atexit-handlers and flush streams. os._exit() is needed so
+		# that state copied from helper, like its sockets, is left alone.
+		try:
+			threading._shutdown()
+		except Exception:
+			traceback.print_exc()
+
+		atexit._run_exitfuncs()
+
+		try:
+			sys.stdout.flush()
+			sys.stderr.flush()
+		except Exception:
+			pass
+
+		os._exit(code)
+
+
+def main(socketpath, modules):
+	for name in modules:
+		try:
+			importlib.import_module(name)
+		except Exception:
+			traceback.print_exc()
+
+	listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	listener.bind(socketpath)
+	listener.listen()
+
+	selector = selectors.DefaultSelector()
+	selector.register(listener, selectors.EVENT_READ)
+
+	parent = os.getppid()
+
+	# pid of running child as key, its connection as value
+	children = dict()
+
+	while os.getppid() == parent:
+		for key, mask in selector.select(timeout=0.1):
+			conn, addr = listener.accept()
+
+			try:
+				msg, fds, flags, addr = socket.recv_fds(conn, 65536, 3)
+				request = json.loads(msg)
+			except (OSError, ValueError):
+				conn.close()
+				continue
+
+			if len(fds) not in (2, 3):
+				for fd in fds:
+					os.close(fd)
+				conn.close()
+				continue
+
+			sys.stdout.flush()
+			sys.stderr.flush()
+			pid = os.fork()
+
+			if pid == 0:
+				selector.close()
+				listener.close()
+				conn.close()
+
+				for other in children.values():
+					other.close()
+
+				run_child(request, fds)
+
+			for fd in fds:
+				os.close(fd)
+
+			children[pid] = conn
+
+			try:
+				conn.sendall(b'%d\n' % pid)
+			except OSError:
+				pass
+
+		# Reap exited children
+		while children:
+			try:
+				pid, status, ru = os.wait4(-1, os.WNOHANG)
+			except ChildProcessError:
+				break
+
+			if pid == 0:
+				break
+
+			conn = children.pop(pid, None)
+			if conn is None:
+				continue
+
+			try:
+				conn.sendall(b'exit %d %f %f %d\n' % (os.waitstatus_to_exitcode(status),
+					ru.ru_utime, ru.ru_stime, ru.ru_maxrss))
+			except OSError:
+				pass
+
+			conn.close()
+
+
+if __name__ == '__main__':
+	main(sys.argv[1], sys.argv[2:])
+
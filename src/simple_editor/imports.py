@@ -0,0 +1,62 @@
+import ast
+
+
+def candidates(base, parts):
+	'''	Returns set of paths of modules and packages which dotted name
+		parts, and every package on the way, can be in directory base.
+	'''
+	paths = set()
+
+	for i in range(1, len(parts) + 1):
+		path = base.joinpath(*parts[:i])
+		paths.add(path.with_name(parts[i-1] + '.py'))
+		paths.add(path / '__init__.py')
+
+	return paths
+
+
+def imported_files(source, filepath, roots=()):
+	'''	Returns set of paths of files which source of file filepath can
+		import. Absolute imports are looked from directory of filepath
+		and directories in roots, relative imports from packages of
+		filepath. Files need not exist. If source has syntax error,
+		returns empty set.
+	'''
+	try:
+		tree = ast.parse(source)
+	except (SyntaxError, ValueError):
+		return set()
+
+	directory = filepath.parent
+	roots = [directory, *roots]
+	paths = set()
+
+	for node in ast.walk(tree):
+		if isinstance(node, ast.Import):
+			for alias in node.names:
+				for root in roots:
+					paths |= candidates(root, alias.name.split('.'))
+
+		elif isinstance(node, ast.ImportFrom):
+			parts = node.module.split('.') if node.module else []
+
+			if node.level == 0:
+				bases = roots
+			elif node.level - 2 < len(directory.parents):
+				bases = [directory] if node.level == 1 else [directory.parents[node.level - 2]]
+			else:
+				continue
+
+			for base in bases:
+				if parts:
+					paths |= candidates(base, parts)
+				else:
+					paths.add(base / '__init__.py')
+
+				# Imported names can be modules
+				for alias in node.names:
+					if alias.name != '*':
+						paths |= candidates(base, parts + [alias.name])
+
+	return paths
+
@@ -0,0 +1,301 @@
+import itertools
+import threading
+import pathlib
+import queue
+import json
+import os
+
+from .checkpoint import atomic_write
+
+
+# Kept in cwd like editor.cnf
+JOURNALDIR = pathlib.Path().cwd() / 'editor.journal'
+
+SUFFIX = '.journal'
+
+
+def replay(base, ops):
+	'''	Return base, which is string, with ops applied. Op is list:
+		['i', line, col, text] or ['d', line, col, count of chars]
+	'''
+	lines = base.split('\n')
+
+	for kind, line, col, arg in ops:
+		i = line - 1
+
+		if kind == 'i':
+			lines[i:i+1] = (lines[i][:col] + arg + lines[i][col:]).split('\n')
+
+		else:
+			tail = lines[i][col:]
+			j = i
+
+			while len(tail) < arg and j + 1 < len(lines):
+				j += 1
+				tail += '\n' + lines[j]
+
+			lines[i:j+1] = [lines[i][:col] + tail[arg:]]
+
+	return '\n'.join(lines)
+
+
+def read_journals(directory=JOURNALDIR):
+	'''	Returns list of (header, ops) of journals left in directory.
+		Last line of journal can be partial if editor was killed while
+		writing it, then it is ignored.
+	'''
+	res = list()
+
+	try:
+		paths = sorted(directory.glob('*' + SUFFIX))
+	except OSError:
+		return res
+
+	for path in paths:
+		try:
+			with open(path, 'r', encoding='utf-8') as f:
+				lines = f.read().splitlines()
+		except EnvironmentError as e:
+			print(e.__str__())
+			print('\n Could not read journal %s' % path)
+			continue
+
+		try:
+			header = json.loads(lines[0])
+			ops = [ json.loads(line) for line in lines[1:-1] ]
+		except (ValueError, IndexError):
+			print('\n Journal %s is broken' % path)
+			continue
+
+		try:
+			if len(lines) > 1:
+				ops.append(json.loads(lines[-1]))
+		except ValueError:
+			pass
+
+		res.append((header, ops))
+
+	return res
+
+
+def clear(directory=JOURNALDIR):
+	'''	Remove journals left in directory.
+	'''
+	try:
+		paths = list(directory.glob('*' + SUFFIX))
+	except OSError:
+		return
+
+	for path in paths:
+		try:
+			os.unlink(path)
+		except OSError:
+			pass
+
+
+class JournalWriter(threading.Thread):
+	'''	Writes journals in background. Every journal is file with header
+		as first line and one op per line after it. Ops since header are
+		also kept in memory, so journal can be rewritten with new header
+		without them, see rebase()
+	'''
+
+	def __init__(self, directory):
+		super().__init__(daemon=True)
+		self.directory = directory
+		self.queue = queue.Queue()
+
+		# jid as key, as value: list of (seq, line) or open file
+		self.ops = dict()
+		self.files = dict()
+
+
+	def path(self, jid):
+		return self.directory / ('%d%s' % (jid, SUFFIX))
+
+
+	def run(self):
+		while True:
+			items = [self.queue.get()]
+
+			# Handle all that is ready, then flush once
+			while not self.queue.empty():
+				items.append(self.queue.get())
+
+			for item in items:
+				if item is None:
+					self.close_all()
+					return
+
+				try:
+					getattr(self, item[0])(*item[1:])
+				except EnvironmentError as e:
+					print(e.__str__())
+					print('\n Could not write journal %d' % item[1])
+
+			for f in self.files.values():
+				f.flush()
+
+
+	def open(self, jid, header):
+		self.directory.mkdir(exist_ok=True)
+		self.ops[jid] = list()
+		self.files[jid] = open(self.path(jid), 'w', encoding='utf-8')
+		self.files[jid].write(json.dumps(header) + '\n')
+
+
+	def record(self, jid, seq, op):
+		f = self.files.get(jid)
+		if f is None:
+			return
+
+		line = json.dumps(op) + '\n'
+		self.ops[jid].append((seq, line))
+		f.write(line)
+
+
+	def rebase(self, jid, header, seq):
+		'''	Replace header, and forget ops older than seq.
+		'''
+		if jid not in self.files:
+			return
+
+		self.files.pop(jid).close()
+		self.ops[jid] = [ item for item in self.ops[jid] if item[0] >= seq ]
+
+		data = json.dumps(header) + '\n' + ''.join(line for s, line in self.ops[jid])
+		atomic_write(self.path(jid), data)
+
+		self.files[jid] = open(self.path(jid), 'a', encoding='utf-8')
+
+
+	def remove(self, jid):
+		f = self.files.pop(jid, None)
+		if f is None:
+			return
+
+		f.close()
+		self.ops.pop(jid, None)
+		os.unlink(self.path(jid))
+
+
+	def close_all(self):
+		for f in self.files.values():
+			f.close()
+
+		self.files.clear()
+
+
+class Journal:
+	'''	Append-only journal of edits of every tab, used to recover unsaved
+		changes after crash. Editor records every insert and delete, see
+		Editor.journal_record(), and they are written in background.
+
+		Journal of tab has header: contents to which ops are applied.
+		Header is dict with keys: filepath, type, diskhash and snapshot.
+		If snapshot is None, base is file filepath, whose checksum()
+		as hex must be diskhash. When tab is saved, header is replaced
+		with file, and when there are many ops, with snapshot of contents.
+
+		Journals are identified with jid. Tab is detached from its
+		journal when it is closed or other file is loaded to it.
+	'''
+
+	def __init__(self, directory=JOURNALDIR):
+		self.directory = directory
+		self.writer = JournalWriter(directory)
+		self.jids = itertools.count()
+
+		# Tab as key, jid as value
+		self.ids = dict()
+		# jid as key, as value: count of ops ever recorded
+		# or seq of first op after header
+		self.counts = dict()
+		self.bases = dict()
+
+
+	def start(self):
+		self.writer.start()
+
+
+	def stop(self):
+		'''	Write pending ops and wait for writer to finish.
+			Journals which are not removed are kept in disk.
+		'''
+		if self.writer.is_alive():
+			self.writer.queue.put(None)
+			self.writer.join()
+
+
+	def isopen(self, tab):
+		return tab in self.ids
+
+
+	def open(self, tab, header):
+		jid = next(self.jids)
+		self.ids[tab] = jid
+		self.counts[jid] = 0
+		self.bases[jid] = 0
+		self.writer.queue.put(('open', jid, header))
+
+
+	def record(self, tab, kind, pos, text):
+		'''	kind is 'insert' or 'delete', pos is (line, col)
+		'''
+		jid = self.ids[tab]
+
+		if kind == 'insert':
+			op = ['i', pos[0], pos[1], text]
+		else:
+			op = ['d', pos[0], pos[1], len(text)]
+
+		self.writer.queue.put(('record', jid, self.counts[jid], op))
+		self.counts[jid] += 1
+
+
+	def mark(self, tab):
+		'''	Returns (jid, seq): journal of tab and seq of next op.
+			None if tab has no journal.
+		'''
+		jid = self.ids.get(tab)
+		if jid is None:
+			return None
+
+		return (jid, self.counts[jid])
+
+
+	def size(self, tab):
+		'''	Count of ops since header.
+		'''
+		jid = self.ids[tab]
+		return self.counts[jid] - self.bases[jid]
+
+
+	def rebase(self, mark, header):
+		'''	Replace header of journal of mark, ops before mark are dropped.
+			If journal is not attached to tab anymore, it is removed.
+		'''
+		jid, seq = mark
+
+		if jid not in self.ids.values():
+			self.remove(jid)
+			return
+
+		self.bases[jid] = max(self.bases[jid], seq)
+		self.writer.queue.put(('rebase', jid, header, seq))
+
+
+	def detach(self, tab, remove=False):
+		jid = self.ids.pop(tab, None)
+		if jid is None:
+			return
+
+		if remove:
+			self.remove(jid)
+
+
+	def remove(self, jid):
+		self.counts.pop(jid, None)
+		self.bases.pop(jid, None)
+		self.writer.queue.put(('remove', jid))
+
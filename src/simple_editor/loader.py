@@ -0,0 +1,79 @@
+import threading
+import codecs
+import queue
+import io
+
+
+# Files larger than this, in bytes, are loaded in chunks
+LARGE_FILE = 4 * 2**20
+
+# Bytes read at a time
+CHUNK_SIZE = 256 * 2**10
+
+# Max count of chunks waiting to be inserted
+QUEUE_SIZE = 16
+
+
+class FileReader(threading.Thread):
+	'''	Reads file path in background, decodes it as utf-8 with universal
+		newlines like open() does, and puts it to self.chunks as strings.
+		After last chunk, None is put, or exception if reading failed.
+
+		Chunks are inserted to widget in Tk-thread, see Editor.poll_load()
+	'''
+
+	def __init__(self, path, size, chunksize=CHUNK_SIZE):
+		super().__init__(daemon=True)
+		self.path = path
+		self.size = size
+		self.chunksize = chunksize
+		self.chunks = queue.Queue(maxsize=QUEUE_SIZE)
+		self.bytesread = 0
+		self.cancelled = threading.Event()
+
+
+	def progress(self):
+		'''	Percentage of file read.
+		'''
+		if self.size == 0:
+			return 100
+
+		return min(100, 100 * self.bytesread // self.size)
+
+
+	def cancel(self):
+		self.cancelled.set()
+
+
+	def put(self, item):
+		while not self.cancelled.is_set():
+			try:
+				self.chunks.put(item, timeout=0.1)
+				return
+			except queue.Full:
+				pass
+
+
+	def run(self):
+		decoder = io.IncrementalNewlineDecoder(
+			codecs.getincrementaldecoder('utf-8')(), translate=True)
+
+		try:
+			with open(self.path, 'rb') as f:
+				while not self.cancelled.is_set():
+					data = f.read(self.chunksize)
+					text = decoder.decode(data, final=(not data))
+					self.bytesread += len(data)
+
+					if text:
+						self.put(text)
+
+					if not data:
+						break
+
+		except (EnvironmentError, ValueError) as e:
+			self.put(e)
+			return
+
+		self.put(None)
+
@@ -0,0 +1,213 @@
+import threading
+import pathlib
+import heapq
+import json
+import os
+import re
+
+from .checkpoint import atomic_write
+
+
+# Kept in cwd like editor.cnf
+CACHEPATH = pathlib.Path().cwd() / 'editor.files'
+
+# Directories not indexed
+SKIPDIRS = frozenset([
+					'.git',
+					'.hg',
+					'.svn',
+					'__pycache__',
+					'.mypy_cache',
+					'.pytest_cache',
+					'.ruff_cache',
+					'.tox',
+					'.nox',
+					'.venv',
+					'venv',
+					'node_modules'
+					])
+
+# Max count of results of Matcher.match()
+MAX_RESULTS = 50
+
+
+def scan(path):
+	'''	Returns (names of files, names of directories) in directory path.
+		Directories in SKIPDIRS and symlinks to directories are left out.
+	'''
+	files = list()
+	dirs = list()
+
+	with os.scandir(path) as it:
+		for entry in it:
+			try:
+				if entry.is_dir(follow_symlinks=False):
+					if entry.name not in SKIPDIRS:
+						dirs.append(entry.name)
+				elif entry.is_file():
+					files.append(entry.name)
+			except OSError:
+				pass
+
+	return files, dirs
+
+
+class ProjectIndex(threading.Thread):
+	'''	List of files under directory root, paths relative to root, built
+		with os.scandir() in background.
+
+		Listings of directories are cached in cachepath with mtime of
+		directory. Adding, removing or renaming entry changes mtime of
+		its directory, so only directories whose mtime has changed are
+		scanned again, others are just stat()ed.
+
+		Files from cache are available in self.files at once, and are
+		replaced with current ones when self.done is True.
+	'''
+
+	def __init__(self, root, cachepath=CACHEPATH):
+		super().__init__(daemon=True)
+		self.root = str(root)
+		self.cachepath = cachepath
+		self.files = list()
+		self.done = False
+		self.cancelled = threading.Event()
+
+
+	def cancel(self):
+		self.cancelled.set()
+
+
+	def load_cache(self):
+		'''	Returns cached listings of directories: relative path of
+			directory as key, [mtime_ns, files, dirs] as value.
+		'''
+		try:
+			with open(self.cachepath, 'r', encoding='utf-8') as f:
+				data = json.load(f)
+
+			if data['root'] == self.root:
+				return data['dirs']
+
+		except (EnvironmentError, ValueError, KeyError, TypeError):
+			pass
+
+		return dict()
+
+
+	def listing(self, dirs):
+		return sorted( os.path.join(rel, name) if rel else name
+			for rel, item in dirs.items() for name in item[1] )
+
+
+	def run(self):
+		cached = self.load_cache()
+		self.files = self.listing(cached)
+
+		dirs = dict()
+		stack = ['']
+
+		while stack:
+			if self.cancelled.is_set():
+				return
+
+			rel = stack.pop()
+			path = os.path.join(self.root, rel)
+
+			try:
+				mtime = os.stat(path).st_mtime_ns
+				item = cached.get(rel)
+
+				if item is None or item[0] != mtime:
+					item = [mtime, *scan(path)]
+
+			except OSError:
+				continue
+
+			dirs[rel] = item
+			stack.extend( os.path.join(rel, name) if rel else name for name in item[2] )
+
+		self.files = self.listing(dirs)
+		self.done = True
+
+		try:
+			atomic_write(self.cachepath, json.dumps(dict(root=self.root, dirs=dirs)))
+		except EnvironmentError as e:
+			print(e.__str__())
+			print('\nCould not save file index %s' % self.cachepath)
+
+
+def compile_query(query):
+	'''	Pattern matching chars of query in same order, ignoring case.
+		Pattern is like: [^a]*(a[^b]*b[^c]*c), it is used with match(),
+		so path is scanned once and first occurrence of every char is
+		found without backtracking. Group 1 is the matched part.
+	'''
+	parts = list()
+
+	for c in query:
+		c = re.escape(c)
+
+		# First char starts group 1
+		if not parts:
+			parts.append('[^%s]*(%s' % (c, c))
+		else:
+			parts.append('[^%s]*%s' % (c, c))
+
+	return re.compile(''.join(parts) + ')', re.IGNORECASE)
+
+
+class Matcher:
+	'''	Fuzzy matching of paths: query matches path if chars of query
+		are in path in same order, ignoring case.
+
+		When query is continuation of previous query, only previous
+		matches are searched, so typing is fast also with many files.
+	'''
+
+	def __init__(self):
+		self.files = None
+		# path as key, index of start of file name as value
+		self.names = None
+		self.query = None
+		self.matches = None
+
+
+	def match(self, query, files, limit=MAX_RESULTS):
+		'''	Returns at most limit best matches of query in files.
+			Matches in file name are better than matches in
+			directories, then shorter matches and shorter paths.
+		'''
+		if files is not self.files:
+			self.files = files
+			self.names = { path: path.rfind(os.sep) + 1 for path in files }
+			self.query = None
+
+		if self.query is not None and query.startswith(self.query):
+			candidates = self.matches
+		else:
+			candidates = files
+
+		self.query = query
+
+		if query == '':
+			self.matches = files
+			return files[:limit]
+
+		match = compile_query(query).match
+		names = self.names
+
+		self.matches = [ path for path in candidates if match(path) ]
+
+		# If there are enough matches in file name, others need no scoring
+		innames = [ path for path in self.matches if match(path, names[path]) ]
+		if len(innames) >= limit:
+			candidates = innames
+		else:
+			candidates = self.matches
+
+		def score(path):
+			m = match(path, names[path]) or match(path)
+			return (m.start(1) < names[path], m.end(1) - m.start(1), len(path))
+
+		return heapq.nsmallest(limit, candidates, key=score)
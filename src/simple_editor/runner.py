@@ -0,0 +1,378 @@
+import subprocess
+import threading
+import tempfile
+import signal
+import codecs
+import shutil
+import socket
+import queue
+import json
+import time
+import sys
+import io
+import os
+
+
+# Script of helper process of ForkServer
+HELPER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'forkhelper.py')
+
+# Bootstrap which sends exceptions of file being run, see capture.py
+CAPTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'capture.py')
+
+# Seconds to wait for helper to start file
+FORK_TIMEOUT = 2
+
+# ru_maxrss is in kilobytes, except on macOS in bytes
+MAXRSS_SCALE = 1 if sys.platform == 'darwin' else 1024
+
+
+def usage(user, system, maxrss):
+	'''	Returns dict of resource usage, maxrss as ru_maxrss.
+	'''
+	return dict(user=user, system=system, maxrss=maxrss * MAXRSS_SCALE)
+
+
+class Runner:
+	'''	Runs command in its own process group, so that whole process tree
+		of it can be stopped with stop().
+
+		Output is read in background threads and put to self.output as
+		tuples: (name, line), name is 'stdout' or 'stderr' and line is
+		without newline. They are collected in Tk-thread with get(),
+		see Editor.poll_run()
+
+		If capture is True, command should be capture.py. It is given
+		pipe to which it sends exceptions and profile, and they are put
+		to self.output as: ('capture', dict), see capture.py. Only on
+		posix, self.capture is False elsewhere.
+
+		Process is waited in background thread. On posix, its resource
+		usage is then in self.usage, see usage(), it includes children
+		it has waited. Wall time is from elapsed().
+	'''
+
+	def __init__(self, args, capture=False):
+		self.args = args
+		self.capture = capture and os.name == 'posix'
+		self.output = queue.Queue()
+		self.proc = None
+		self.readers = list()
+		self.waiter = None
+		self.code = None
+		self.usage = None
+		self.started = None
+		self.ended = None
+
+
+	def start(self):
+		'''	Start command, raises OSError if it can not be started.
+		'''
+		if os.name == 'posix':
+			options = dict(start_new_session=True)
+		else:
+			options = dict(creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+
+		if self.capture:
+			capr, capw = os.pipe()
+			options['pass_fds'] = (capw,)
+			options['env'] = dict(os.environ, SIMPLE_EDITOR_CAPTURE=str(capw))
+
+		try:
+			self.started = time.monotonic()
+			self.proc = subprocess.Popen(self.args, stdout=subprocess.PIPE,
+				stderr=subprocess.PIPE, **options)
+
+		except OSError:
+			if self.capture:
+				os.close(capr)
+			raise
+
+		finally:
+			# Child has it now
+			if self.capture:
+				os.close(capw)
+
+		self.waiter = threading.Thread(target=self.wait, daemon=True)
+		self.waiter.start()
+
+		for name, pipe in (('stdout', self.proc.stdout), ('stderr', self.proc.stderr)):
+			reader = threading.Thread(target=self.read, args=(name, pipe), daemon=True)
+			reader.start()
+			self.readers.append(reader)
+
+		if self.capture:
+			self.start_capture(capr)
+
+
+	def wait(self):
+		if os.name == 'posix':
+			pid, status, ru = os.wait4(self.proc.pid, 0)
+			# Popen does not know process has been waited
+			self.proc.returncode = os.waitstatus_to_exitcode(status)
+			self.usage = usage(ru.ru_utime, ru.ru_stime, ru.ru_maxrss)
+		else:
+			self.proc.wait()
+
+		self.ended = time.monotonic()
+		self.code = self.proc.returncode
+
+
+	def start_capture(self, fd):
+		reader = threading.Thread(target=self.read_capture,
+			args=(os.fdopen(fd, 'rb'),), daemon=True)
+		reader.start()
+		self.readers.append(reader)
+
+
+	def read_capture(self, pipe):
+		with pipe:
+			for line in pipe:
+				try:
+					record = json.loads(line)
+				except ValueError:
+					continue
+
+				self.output.put(('capture', record))
+
+
+	def read(self, name, pipe):
+		decoder = io.IncrementalNewlineDecoder(
+			codecs.getincrementaldecoder('utf-8')(errors='replace'), translate=True)
+
+		rest = ''
+
+		with pipe:
+			while True:
+				# Returns what is available, does not wait for full buffer
+				data = pipe.read1(65536)
+
+				lines = (rest + decoder.decode(data, final=(not data))).split('\n')
+				rest = lines.pop()
+
+				for line in lines:
+					self.output.put((name, line))
+
+				if not data:
+					break
+
+		if rest:
+			self.output.put((name, rest))
+
+
+	def get(self):
+		'''	Next (name, line) of output, or None if there is none yet.
+		'''
+		try:
+			return self.output.get_nowait()
+		except queue.Empty:
+			return None
+
+
+	def running(self):
+		return self.code is None
+
+
+	def elapsed(self):
+		'''	Seconds since start, until exit if process has exited.
+		'''
+		if self.ended is None:
+			return time.monotonic() - self.started
+
+		return self.ended - self.started
+
+
+	def done(self):
+		'''	True when process has exited and all its output has been read.
+			Output can still be in self.output.
+		'''
+		return not self.running() and not any(reader.is_alive() for reader in self.readers)
+
+
+	def returncode(self):
+		return self.code
+
+
+	def stop(self, sig=signal.SIGTERM):
+		'''	Send sig to every process in process group of command.
+		'''
+		if os.name != 'posix':
+			if self.running():
+				self.proc.terminate()
+			return
+
+		try:
+			os.killpg(self.proc.pid, sig)
+		except (ProcessLookupError, PermissionError):
+			# Group is empty
+			pass
+
+
+	def kill(self):
+		self.stop(getattr(signal, 'SIGKILL', signal.SIGTERM))
+
+
+class ForkRunner(Runner):
+	'''	Runs file path in child forked from helper process of ForkServer.
+		Child has own process group like in Runner. If options is not
+		None, exceptions are captured with them, see capture.py
+	'''
+
+	def __init__(self, path, socketpath, options=None):
+		super().__init__([path], capture=(options is not None))
+		self.path = path
+		self.options = options
+		self.socketpath = socketpath
+		self.pid = None
+
+
+	def start(self):
+		'''	Raises OSError if helper can not start file.
+		'''
+		outr, outw = os.pipe()
+		errr, errw = os.pipe()
+		reads = [outr, errr]
+		writes = [outw, errw]
+
+		if self.capture:
+			capr, capw = os.pipe()
+			reads.append(capr)
+			writes.append(capw)
+
+		sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+		try:
+			sock.settimeout(FORK_TIMEOUT)
+			sock.connect(self.socketpath)
+
+			request = json.dumps(dict(path=str(self.path), cwd=os.getcwd(),
+				options=self.options))
+			self.started = time.monotonic()
+			socket.send_fds(sock, [request.encode()], writes)
+
+			replies = sock.makefile('rb')
+			self.pid = int(replies.readline())
+
+		except (OSError, ValueError) as e:
+			sock.close()
+			for fd in reads:
+				os.close(fd)
+			raise OSError('Fork-server could not start %s: %s' % (self.path, e))
+
+		finally:
+			# Child has them now
+			for fd in writes:
+				os.close(fd)
+
+		sock.settimeout(None)
+		self.waiter = threading.Thread(target=self.wait, args=(sock, replies), daemon=True)
+		self.waiter.start()
+
+		for name, fd in (('stdout', outr), ('stderr', errr)):
+			reader = threading.Thread(target=self.read, args=(name, os.fdopen(fd, 'rb')), daemon=True)
+			reader.start()
+			self.readers.append(reader)
+
+		if self.capture:
+			self.start_capture(capr)
+
+
+	def wait(self, sock, replies):
+		try:
+			reply = replies.readline()
+		except OSError:
+			reply = b''
+
+		sock.close()
+		self.ended = time.monotonic()
+
+		# exit code user system maxrss
+		fields = reply.split()
+
+		if fields[:1] == [b'exit'] and len(fields) == 5:
+			self.usage = usage(float(fields[2]), float(fields[3]), int(fields[4]))
+			self.code = int(fields[1])
+		else:
+			# Helper died
+			self.code = -1
+
+
+	def stop(self, sig=signal.SIGTERM):
+		try:
+			os.killpg(self.pid, sig)
+		except (ProcessLookupError, PermissionError):
+			pass
+
+
+class ForkServer:
+	'''	Long-lived helper process, forkhelper.py, which imports modules
+		once. Every run is forked from it, so imports are already done,
+		but state of runs is not shared.
+
+		Only on posix. Helper is run with python, and runs inherit its
+		environment variables and sys.path. So usable() is False if
+		helper has died, or if what a normal run would get has changed
+		since helper was started: python found from PATH or its binary,
+		environment variables, or cwd which relative paths in sys.path
+		are relative to. Then runs should not be forked from it.
+	'''
+
+	def __init__(self, python='python', modules=()):
+		self.python = python
+		self.modules = list(modules)
+		self.proc = None
+		self.directory = None
+		self.socketpath = None
+		self.key = None
+
+
+	@staticmethod
+	def available():
+		return os.name == 'posix' and hasattr(socket, 'send_fds')
+
+
+	def environment(self):
+		python = shutil.which(self.python)
+
+		if python is not None:
+			python = os.path.realpath(python)
+
+			try:
+				python = (python, os.stat(python).st_mtime_ns)
+			except OSError:
+				pass
+
+		return (python, dict(os.environ), os.getcwd(), self.modules)
+
+
+	def start(self):
+		'''	Raises OSError if helper can not be started.
+		'''
+		self.directory = tempfile.mkdtemp(prefix='simple-editor-')
+		self.socketpath = os.path.join(self.directory, 'socket')
+		self.key = self.environment()
+
+		self.proc = subprocess.Popen([self.python, HELPER, self.socketpath, *self.modules],
+			stdin=subprocess.DEVNULL, start_new_session=True)
+
+
+	def usable(self):
+		return (self.proc is not None and self.proc.poll() is None
+			and self.key == self.environment())
+
+
+	def runner(self, path, options=None):
+		return ForkRunner(path, self.socketpath, options)
+
+
+	def stop(self):
+		if self.proc is not None and self.proc.poll() is None:
+			self.proc.terminate()
+
+			try:
+				self.proc.wait(timeout=1)
+			except subprocess.TimeoutExpired:
+				self.proc.kill()
+
+		if self.directory:
+			shutil.rmtree(self.directory, ignore_errors=True)
+			self.directory = None
@@ -0,0 +1,104 @@
+import collections
+import threading
+import queue
+
+from .checkpoint import atomic_write
+
+
+class SaveQueue(threading.Thread):
+	'''	Writes files in background with checkpoint.atomic_write(), so that
+		file is never left truncated and UI does not wait for disk.
+
+		Writes are keyed, usually by Tab. If there already is a pending
+		write with same key, it is replaced, so consecutive saves of same
+		tab are written only once.
+
+		Results are put to self.results as tuples:
+		(key, path, info, error), error is None if write succeeded.
+		They are collected in Tk-thread, see Editor.poll_saves()
+	'''
+
+	def __init__(self, fsync=False):
+		super().__init__(daemon=True)
+		self.fsync = fsync
+		self.results = queue.Queue()
+
+		# Key of write as key, (path, data, info) as value, oldest first
+		self.pending = collections.OrderedDict()
+		# Key of write being done, None when worker is idle
+		self.busy = None
+		self.stopping = False
+		self.cond = threading.Condition()
+
+
+	def put(self, key, path, data, info=None):
+		'''	Queue write of string data to path. info is returned
+			with result as is.
+		'''
+		with self.cond:
+			self.pending.pop(key, None)
+			self.pending[key] = (path, data, info)
+			self.cond.notify_all()
+
+
+	def __contains__(self, key):
+		'''	True if write with key is pending or being done.
+		'''
+		with self.cond:
+			return key in self.pending or self.busy is key
+
+
+	def unfinished(self):
+		with self.cond:
+			return len(self.pending) > 0 or self.busy is not None
+
+
+	def flush(self):
+		'''	Wait until every queued write is done.
+		'''
+		with self.cond:
+			while self.is_alive() and (self.pending or self.busy is not None):
+				self.cond.wait()
+
+
+	def stop(self):
+		'''	Finish queued writes and wait for thread to finish.
+		'''
+		with self.cond:
+			self.stopping = True
+			self.cond.notify_all()
+
+		if self.is_alive():
+			self.join()
+
+
+	def run(self):
+		while True:
+			with self.cond:
+				while not self.pending and not self.stopping:
+					self.cond.wait()
+
+				if not self.pending:
+					break
+
+				key, (path, data, info) = self.pending.popitem(last=False)
+				self.busy = key
+
+			error = None
+
+			# Any exception is reported, like UnicodeEncodeError from
+			# lone surrogate, so that thread stays alive and flush()
+			# does not wait forever.
+			try:
+				try:
+					atomic_write(path, data, fsync=self.fsync)
+				except Exception as e:
+					error = e
+
+				self.results.put((key, path, info, error))
+
+			finally:
+				with self.cond:
+					self.busy = None
+					self.cond.notify_all()
+
@@ -0,0 +1,70 @@
+import re
+
+
+# Line boundaries of str.splitlines() other than newline. Earlier
+# per-line tabify split lines with it, so indentation after these
+# is tabified too.
+LINE_BREAKS = '\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
+
+_breaks = re.compile('[%s]' % LINE_BREAKS)
+
+# Compiled patterns, (width, breaks) as key
+_patterns = dict()
+
+
+class _Indents(dict):
+	'''	Maps indentation string to tabified one. Files have only few
+		different indentations, so every one of them is converted once.
+	'''
+
+	def __init__(self, width):
+		super().__init__()
+		self.spaces = width * ' '
+
+
+	def __missing__(self, indent):
+		res = self[indent] = indent.replace(self.spaces, '\t')
+		return res
+
+
+def pattern(width, breaks=False):
+	'''	Matches indentation of line if it has width consecutive spaces.
+		Used with split(), so indentation is captured.
+
+		Line starts after newline, and if breaks is True, also after
+		LINE_BREAKS, like in str.splitlines(). That is slower, so it is
+		used only for text that has them.
+	'''
+	key = (width, breaks)
+
+	if key not in _patterns:
+		start = r'(?:^|(?<=[%s]))' % LINE_BREAKS if breaks else '^'
+		_patterns[key] = re.compile(r'(?m)%s([\t ]* {%d}[\t ]*)' % (start, width))
+
+	return _patterns[key]
+
+
+def tabify(text, width=4):
+	'''	Replace every width consecutive spaces in indentation of lines of
+		text with tab. Spaces after text has started are left alone, as
+		are spaces in indentation that do not fill width. Lines are
+		those of str.splitlines().
+
+		This is done for whole text at once: text is split at
+		indentations, and those are converted through _Indents.
+		If there are no width consecutive spaces in text at all,
+		text is returned as is.
+	'''
+	if width * ' ' not in text:
+		return text
+
+	breaks = _breaks.search(text) is not None
+	parts = pattern(width, breaks).split(text)
+
+	if len(parts) == 1:
+		return text
+
+	# Every odd item is indentation
+	parts[1::2] = map(_Indents(width).__getitem__, parts[1::2])
+
+	return ''.join(parts)
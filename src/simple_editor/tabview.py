@@ -0,0 +1,223 @@
+import collections
+import tkinter
+import re
+
+
+# Default number of live Text-widgets kept in pool
+POOLSIZE = 8
+
+
+def valid_position(position):
+	'''	True if position is index like '12.3', like those in Tab.position.
+		Widget command does not raise TclError with bad index, see
+		undo.EditHook.dispatch, so index is checked before it is used.
+	'''
+	return re.fullmatch(r'[0-9]+\.[0-9]+', str(position)) is not None
+
+
+class TabView:
+	'''	Keeps live Text-widgets for the most recently used tabs.
+
+		Every tab in pool has its own Text-widget, so switching between
+		them is just pack_forget() and pack(). Tags, scroll position,
+		insert-mark and undo-stack of widget are kept as they were.
+
+		When pool gets full, least recently used widget is evicted:
+		its contents and cursor position are copied back to Tab.contents
+		and Tab.position and widget is destroyed. Only evicted tabs
+		need to be inserted again when they are shown next time.
+
+		Widgets that are not tied to any tab, like the one used to show
+		errors and help, are created with add_view().
+	'''
+
+	def __init__(self, master, factory, maxsize=POOLSIZE):
+		'''	master is parent widget of self.frame
+
+			factory is callable which takes parent widget as argument
+			and returns new tkinter.scrolledtext.ScrolledText instance
+			with bindings and tags already set up.
+		'''
+		self.frame = tkinter.Frame(master)
+		self.factory = factory
+		self.maxsize = max(1, maxsize)
+
+		# Tab as key, widget as value, least recently used first
+		self.pool = collections.OrderedDict()
+		self.views = list()
+		self.current = None
+
+		# Options applied to every existing and future widget
+		self.options = dict()
+		self.vbar_options = dict()
+
+
+	def __contains__(self, tab):
+		return tab in self.pool
+
+
+	def widgets(self):
+		return list(self.pool.values()) + self.views
+
+
+	def new_widget(self):
+		widget = self.factory(self.frame)
+
+		if self.options:
+			widget.config(**self.options)
+		if self.vbar_options:
+			widget.vbar.config(**self.vbar_options)
+
+		return widget
+
+
+	def add_view(self):
+		'''	Create widget which is not tied to any tab.
+		'''
+		widget = self.new_widget()
+		self.views.append(widget)
+		return widget
+
+
+	def config(self, **options):
+		'''	Configure every widget, also those created later.
+		'''
+		self.options.update(options)
+
+		for widget in self.widgets():
+			widget.config(**options)
+
+
+	def config_vbar(self, **options):
+		'''	Configure scrollbar of every widget, also those created later.
+		'''
+		self.vbar_options.update(options)
+
+		for widget in self.widgets():
+			widget.vbar.config(**options)
+
+
+	def widget(self, tab):
+		'''	Return live widget of tab, create and fill it if there
+			is not one yet. This marks tab as most recently used and
+			may evict least recently used tab from pool.
+		'''
+		if tab in self.pool:
+			self.pool.move_to_end(tab)
+			return self.pool[tab]
+
+		widget = self.new_widget()
+		widget.insert('1.0', tab.contents)
+		widget.edit_reset()
+		widget.edit_modified(False)
+
+		if not valid_position(tab.position):
+			tab.position = '1.0'
+
+		widget.mark_set('insert', tab.position)
+
+		self.pool[tab] = widget
+		self.shrink(keep=tab)
+
+		return widget
+
+
+	def show(self, widget):
+		'''	Replace currently shown widget with widget.
+		'''
+		if widget is self.current:
+			return
+
+		if self.current is not None:
+			self.current.pack_forget()
+
+		widget.pack(expand=True, fill=tkinter.BOTH)
+		self.current = widget
+
+
+	def sync(self, tab, contents=True):
+		'''	Copy position, and contents if contents is True, from live
+			widget of tab back to tab. Does nothing if tab is not in pool.
+
+			Contents are copied only if modified flag of widget is set,
+			and flag is then cleared. So the flag tells if widget has
+			changed since it was filled or last synced.
+		'''
+		widget = self.pool.get(tab)
+		if widget is None:
+			return
+
+		if contents and widget.edit_modified():
+			tmp = widget.get('1.0', tkinter.END)
+			# [:-1]: remove unwanted extra newline
+			tab.contents = tmp[:-1]
+			widget.edit_modified(False)
+
+		try:
+			tab.position = widget.index(tkinter.INSERT)
+		except tkinter.TclError:
+			tab.position = '1.0'
+
+
+	def position(self, tab):
+		'''	Return current position of tab without changing tab.
+		'''
+		widget = self.pool.get(tab)
+		if widget is None:
+			return tab.position
+
+		try:
+			return widget.index(tkinter.INSERT)
+		except tkinter.TclError:
+			return '1.0'
+
+
+	def sync_all(self, contents=True):
+		for tab in self.pool:
+			self.sync(tab, contents=contents)
+
+
+	def evict(self, tab):
+		'''	Copy state of tab back from its widget and destroy widget.
+		'''
+		if tab not in self.pool:
+			return
+
+		self.sync(tab)
+		self.discard(tab)
+
+
+	def discard(self, tab):
+		'''	Destroy widget of tab without copying its state back,
+			used when tab is closed.
+		'''
+		widget = self.pool.pop(tab, None)
+		if widget is None:
+			return
+
+		if widget is self.current:
+			widget.pack_forget()
+			self.current = None
+
+		# ScrolledText is inside its own frame
+		widget.frame.destroy()
+
+
+	def resize(self, maxsize):
+		self.maxsize = max(1, maxsize)
+		self.shrink()
+
+
+	def shrink(self, keep=None):
+		'''	Evict least recently used tabs until pool fits in maxsize.
+			Currently shown widget and widget of tab keep are never evicted.
+		'''
+		for tab in list(self.pool):
+			if len(self.pool) <= self.maxsize:
+				break
+
+			if tab is keep or self.pool[tab] is self.current:
+				continue
+
+			self.evict(tab)
+
@@ -0,0 +1,192 @@
+import bisect
+import heapq
+import re
+
+
+# Frame-line of traceback:   File "/path/to/file.py", line 12, in func
+FRAME = re.compile(r'\s*File "(?P<path>[^"]+)", line (?P<line>\d+)')
+
+# Titles of kinds of exception records, see capture.py
+KINDS = {
+		'uncaught': 'Uncaught',
+		'thread': 'Uncaught in thread',
+		'logged': 'Logged',
+		'handled': 'Handled'
+		}
+
+# Orders of profile table: name as key, index of sorted column in
+# profile row as value, see capture.py. Biggest values first.
+PROFILE_ORDERS = {
+		'cumulative time': 6,
+		'self time': 5,
+		'calls': 4
+		}
+
+# Orders of memory table, like PROFILE_ORDERS. Column of growth is
+# added to memory rows in add_memory().
+MEMORY_ORDERS = {
+		'size': 2,
+		'peak': 4,
+		'growth': 5
+		}
+
+
+def format_size(size, sign=False):
+	'''	Returns size in bytes as short string, with + if sign is True
+		and size is positive.
+	'''
+	prefix = '+' if sign and size > 0 else ''
+
+	if abs(size) < 1024:
+		return '%s%d B' % (prefix, size)
+
+	for unit in ('KiB', 'MiB', 'GiB'):
+		size /= 1024
+		if abs(size) < 1024:
+			break
+
+	return '%s%.1f %s' % (prefix, size, unit)
+
+
+class TraceLinks:
+	'''	Output lines of run, and locations of traceback frames found in
+		them, parsed one line at a time as output comes in.
+
+		Line numbers are of output lines and start from 1, same as in
+		Text-widget where output is shown. Locations are kept sorted by
+		line number, so location of line is found with bisect.
+	'''
+
+	def __init__(self):
+		self.lines = list()
+		# Line numbers of frame-lines, and (filepath, line) of each
+		self.starts = list()
+		self.locations = list()
+
+
+	def add(self, line, parse=True):
+		'''	Add output line, and parse it if parse is True.
+			Returns True if line is frame-line.
+		'''
+		self.lines.append(line)
+
+		if not parse:
+			return False
+
+		m = FRAME.match(line)
+		if m is None:
+			return False
+
+		self.starts.append(len(self.lines))
+		self.locations.append((m.group('path'), int(m.group('line'))))
+
+		return True
+
+
+	def add_record(self, record):
+		'''	Add exception record sent by capture.py, as lines like in
+			traceback. Locations are taken from record, not parsed.
+		'''
+		message = record.get('message', '').split('\n', 1)[0]
+		title = KINDS.get(record.get('kind'), 'Exception')
+		self.lines.append('%s %s: %s' % (title, record.get('type'), message))
+
+		for filename, line, function in record.get('frames', ()):
+			self.lines.append('  File "%s", line %d, in %s' % (filename, line, function))
+			self.starts.append(len(self.lines))
+			self.locations.append((filename, int(line)))
+
+
+	def add_profile(self, rows, order, limit):
+		'''	Add table of at most limit rows of profile, sorted by order
+			which is key of PROFILE_ORDERS. Rows of functions with
+			source are frame-lines.
+		'''
+		column = PROFILE_ORDERS[order]
+		rows = heapq.nlargest(limit, rows, key=lambda row: row[column])
+
+		self.lines.append('Profile, %d functions by %s, Alt-s changes order:' % (len(rows), order))
+		self.lines.append('%10s %10s %14s  %s' % ('cumtime', 'tottime', 'calls', 'function'))
+
+		for filename, line, function, primitive, calls, tottime, cumtime in rows:
+			if calls != primitive:
+				calls = '%d/%d' % (calls, primitive)
+
+			# Built-in functions have no file
+			if filename == '~':
+				self.lines.append('%10.4f %10.4f %14s  %s' % (cumtime, tottime, calls, function))
+				continue
+
+			self.lines.append('%10.4f %10.4f %14s  %s:%d(%s)'
+				% (cumtime, tottime, calls, filename, line, function))
+			self.starts.append(len(self.lines))
+			self.locations.append((filename, line))
+
+
+	def add_memory(self, record, previous, order, limit):
+		'''	Add table of at most limit lines of memory record sent by
+			capture.py, sorted by order which is key of MEMORY_ORDERS.
+			previous is None, or dict of previous record of same file:
+			(filename, line) as key, size as value. Growth of line is
+			compared to it.
+		'''
+		if previous is None:
+			previous = dict()
+			compared = ', no previous run to compare'
+		else:
+			compared = ''
+
+		rows = [ [*row, row[2] - previous.get((row[0], row[1]), 0)] for row in record['rows'] ]
+		column = MEMORY_ORDERS[order]
+		rows = heapq.nlargest(limit, rows, key=lambda row: row[column])
+
+		self.lines.append('Memory at exit: current %s, peak %s%s'
+			% (format_size(record['current']), format_size(record['peak']), compared))
+		self.lines.append('%d lines by %s, Alt-s changes order:' % (len(rows), order))
+		self.lines.append('%10s %10s %10s %8s  %s' % ('size', 'peak', 'growth', 'count', 'line'))
+
+		for filename, line, size, count, peak, growth in rows:
+			self.lines.append('%10s %10s %10s %8d  %s:%d' % (format_size(size),
+				format_size(peak), format_size(growth, sign=True), count, filename, line))
+
+			# Allocations can be made outside of files, like in <frozen ...>
+			if not filename.startswith('<'):
+				self.starts.append(len(self.lines))
+				self.locations.append((filename, line))
+
+
+	def truncate(self, count):
+		'''	Remove lines after first count lines.
+		'''
+		del self.lines[count:]
+
+		i = bisect.bisect_right(self.starts, count)
+		del self.starts[i:]
+		del self.locations[i:]
+
+
+	def find(self, line):
+		'''	Returns (filepath, line) of frame-line line, or None if
+			line is not frame-line.
+		'''
+		i = bisect.bisect_left(self.starts, line)
+
+		if i < len(self.starts) and self.starts[i] == line:
+			return self.locations[i]
+
+		return None
+
+
+	def ranges(self, first=0):
+		'''	Returns flat list of Text-indexes: start and end of every
+			frame-line, starting from frame first. Can be passed
+			as is to tag_add()
+		'''
+		res = list()
+
+		for line in self.starts[first:]:
+			res.append('%d.0' % line)
+			res.append('%d.0 lineend' % line)
+
+		return res
+
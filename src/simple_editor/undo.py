@@ -0,0 +1,389 @@
+import collections
+import itertools
+import weakref
+import tkinter
+
+
+# Default byte budgets of undo-history, per tab and for all tabs together
+TAB_BUDGET = 8 * 2**20
+TOTAL_BUDGET = 64 * 2**20
+
+# Estimated bytes used by one record, added to length of its text
+RECORD_OVERHEAD = 100
+
+
+def text_end(index, text):
+	'''	Return (line, col) where text ends if it is inserted at index,
+		which is also (line, col).
+	'''
+	line, col = index
+	lines = text.count('\n')
+
+	if lines == 0:
+		return (line, col + len(text))
+
+	return (line + lines, len(text) - text.rfind('\n') - 1)
+
+
+class Group:
+	'''	One undo-step: list of records done between two separators.
+		Record is list: [kind, (line, col), text], kind is 'insert'
+		or 'delete'.
+	'''
+	__slots__ = ('seq', 'records', 'size')
+
+	def __init__(self, seq):
+		self.seq = seq
+		self.records = list()
+		self.size = 0
+
+
+class UndoStack:
+	'''	Undo-history of one tab. Kept in Tab.undo, so it survives
+		tab switches and eviction of widget from tabview.
+
+		Consecutive keystrokes are coalesced into single record.
+	'''
+
+	def __init__(self, history):
+		self.history = history
+		self.undo = collections.deque()
+		self.redo = list()
+		self.size = 0
+		# True when next record can be added to last group
+		self.open = False
+
+
+	def record(self, kind, index, text, auto=True):
+		'''	kind is 'insert' or 'delete', index is (line, col) where text
+			was inserted or deleted from.
+
+			auto is value of -autoseparators option of widget. When it is
+			True, new group is started if kind of edit changes or edit
+			is not contiguous with previous one.
+		'''
+		self.redo.clear()
+
+		if self.open and self.undo:
+			group = self.undo[-1]
+			last = group.records[-1]
+
+			if last[0] == kind == 'insert' and index == text_end(last[1], last[2]):
+				last[2] += text
+				self.grow(group, len(text))
+				return
+
+			# Backspace
+			if last[0] == kind == 'delete' and text_end(index, text) == last[1]:
+				last[1] = index
+				last[2] = text + last[2]
+				self.grow(group, len(text))
+				return
+
+			# Delete-key
+			if last[0] == kind == 'delete' and index == last[1]:
+				last[2] += text
+				self.grow(group, len(text))
+				return
+
+			if not auto:
+				group.records.append([kind, index, text])
+				self.grow(group, len(text) + RECORD_OVERHEAD)
+				return
+
+		group = Group(next(self.history.seq))
+		group.records.append([kind, index, text])
+		self.undo.append(group)
+		self.open = True
+		self.grow(group, len(text) + RECORD_OVERHEAD)
+
+
+	def grow(self, group, size):
+		group.size += size
+		self.size += size
+
+		while self.size > self.history.tab_budget and len(self.undo) > 1:
+			self.drop_oldest()
+
+		self.history.trim()
+
+
+	def drop_oldest(self):
+		group = self.undo.popleft()
+		self.size -= group.size
+
+
+	def separator(self):
+		self.open = False
+
+
+	def clear(self):
+		self.undo.clear()
+		self.redo.clear()
+		self.size = 0
+		self.open = False
+
+
+	def pop_undo(self):
+		self.open = False
+		group = self.undo.pop()
+		self.size -= group.size
+		self.redo.append(group)
+		return group
+
+
+	def pop_redo(self):
+		group = self.redo.pop()
+		self.size += group.size
+		self.undo.append(group)
+		return group
+
+
+class UndoHistory:
+	'''	Keeps undo-stacks of all tabs within total byte budget by
+		dropping oldest groups first, no matter in which tab they are.
+	'''
+
+	def __init__(self, tab_budget=TAB_BUDGET, total_budget=TOTAL_BUDGET):
+		self.tab_budget = tab_budget
+		self.total_budget = total_budget
+		self.stacks = weakref.WeakSet()
+		self.seq = itertools.count()
+
+
+	def new_stack(self):
+		stack = UndoStack(self)
+		self.stacks.add(stack)
+		return stack
+
+
+	def total_size(self):
+		return sum(stack.size for stack in self.stacks)
+
+
+	def trim(self):
+		total = self.total_size()
+
+		while total > self.total_budget:
+			stacks = [ stack for stack in self.stacks if len(stack.undo) > 1 ]
+			if len(stacks) == 0:
+				break
+
+			oldest = min(stacks, key=lambda stack: stack.undo[0].seq)
+			size = oldest.size
+			oldest.drop_oldest()
+			total -= size - oldest.size
+
+
+class EditHook:
+	'''	Replaces Tcl-command of Text-widget with Python-function, so that
+		every insert and delete, also those done by bindings of Text-class,
+		can be recorded to self.stack. Also 'edit undo', 'edit redo',
+		'edit separator' and 'edit reset' are done with self.stack.
+
+		When self.stack is None, everything is passed to original widget.
+
+		If self.listener is set, it is called with (kind, (line, col), text)
+		before every insert and delete, also those done by undo and redo.
+	'''
+
+	def __init__(self, widget):
+		self.widget = widget
+		self.tk = widget.tk
+		self.stack = None
+		self.listener = None
+		self.orig = widget._w + '_orig'
+
+		self.tk.call('rename', widget._w, self.orig)
+		self.tk.createcommand(widget._w, self.dispatch)
+
+		# So that command is deleted when widget is destroyed
+		if widget._tclCommands is None:
+			widget._tclCommands = []
+		widget._tclCommands.append(widget._w)
+
+
+	def call(self, *args):
+		return self.tk.call((self.orig,) + args)
+
+
+	def index(self, index):
+		return str(self.call('index', index))
+
+
+	def compare(self, index1, op, index2):
+		return self.tk.getboolean(self.call('compare', index1, op, index2))
+
+
+	def position(self, index):
+		line, col = self.index(index).split('.')
+		return (int(line), int(col))
+
+
+	def dispatch(self, operation, *args):
+		'''	Called instead of widget command. Exception raised here would
+			not reach Tcl-caller, _tkinter stores it and raises it later
+			in mainloop. So TclError is not raised, but '' is returned,
+			like in idlelib.redirector. Callers must check for example
+			selection with tag_ranges('sel') instead of catching TclError.
+		'''
+		try:
+			if self.stack is None:
+				return self.call(operation, *args)
+
+			if operation == 'insert':
+				return self.insert(*args)
+			elif operation == 'delete':
+				return self.delete(*args)
+			elif operation == 'replace':
+				return self.replace(*args)
+			elif operation == 'edit' and args:
+				return self.edit(*args)
+
+			return self.call(operation, *args)
+
+		except tkinter.TclError:
+			return ''
+
+
+	def editable(self):
+		return str(self.call('cget', '-state')) == 'normal'
+
+
+	def autoseparators(self):
+		return bool(self.tk.getboolean(self.call('cget', '-autoseparators')))
+
+
+	def insert(self, index, *args):
+		if not self.editable():
+			return self.call('insert', index, *args)
+
+		# Text inserted at end goes before the last newline
+		if self.compare(index, '>=', 'end'):
+			index = 'end -1c'
+
+		pos = self.position(index)
+		text = ''.join(args[::2])
+
+		if text and self.listener:
+			self.listener('insert', pos, text)
+
+		res = self.call('insert', index, *args)
+
+		if text:
+			self.stack.record('insert', pos, text, self.autoseparators())
+
+		return res
+
+
+	def delete(self, index1, index2=None, *args):
+		if not self.editable():
+			return self.call('delete', index1, *(args if index2 is None else (index2,) + args))
+
+		if args:
+			# Multiple ranges, compute all before deleting anything
+			indexes = (index1, index2) + args
+			ranges = [ (self.index(indexes[i]), self.index(indexes[i+1]))
+						for i in range(0, len(indexes) - 1, 2) ]
+
+			if len(indexes) % 2 == 1:
+				ranges.append((self.index(indexes[-1]), self.index('%s +1c' % indexes[-1])))
+
+			ranges.sort(key=lambda r: self.position(r[0]), reverse=True)
+
+			for start, end in ranges:
+				self.delete(start, end)
+			return ''
+
+		start = self.index(index1)
+
+		if index2 is None:
+			end = self.index('%s +1c' % start)
+		else:
+			end = self.index(index2)
+
+		# Last newline can not be deleted
+		if self.compare(end, '>', 'end -1c'):
+			end = self.index('end -1c')
+
+		if not self.compare(start, '<', end):
+			return ''
+
+		pos = self.position(start)
+		text = str(self.call('get', start, end))
+
+		if self.listener:
+			self.listener('delete', pos, text)
+
+		res = self.call('delete', start, end)
+
+		self.stack.record('delete', pos, text, self.autoseparators())
+
+		return res
+
+
+	def replace(self, index1, index2, *args):
+		index = self.index(index1)
+		self.delete(index1, index2)
+		return self.insert(index, *args)
+
+
+	def edit(self, command, *args):
+		if command == 'undo':
+			if not self.stack.undo:
+				self.widget.bell()
+				return ''
+
+			group = self.stack.pop_undo()
+
+			for kind, pos, text in reversed(group.records):
+				self.apply(kind == 'delete', pos, text)
+
+			return ''
+
+		elif command == 'redo':
+			if not self.stack.redo:
+				self.widget.bell()
+				return ''
+
+			group = self.stack.pop_redo()
+
+			for kind, pos, text in group.records:
+				self.apply(kind == 'insert', pos, text)
+
+			return ''
+
+		elif command == 'separator':
+			self.stack.separator()
+			return ''
+
+		elif command == 'reset':
+			self.stack.clear()
+			return self.call('edit', 'reset')
+
+		elif command == 'canundo':
+			return int(bool(self.stack.undo))
+
+		elif command == 'canredo':
+			return int(bool(self.stack.redo))
+
+		return self.call('edit', command, *args)
+
+
+	def apply(self, insert, pos, text):
+		'''	Insert or delete text at pos without recording it.
+		'''
+		index = '%d.%d' % pos
+
+		if self.listener:
+			self.listener('insert' if insert else 'delete', pos, text)
+
+		if insert:
+			self.call('insert', index, text)
+			self.call('mark', 'set', 'insert', '%s +%dc' % (index, len(text)))
+		else:
+			self.call('delete', index, '%s +%dc' % (index, len(text)))
+			self.call('mark', 'set', 'insert', index)
+
+		self.call('see', 'insert')
+
@@ -0,0 +1,245 @@
+import itertools
+import threading
+import bisect
+import array
+import mmap
+import os
+
+
+# Every STRIDE:th line start is kept in index
+STRIDE = 64
+
+# Bytes indexed or counted at a time
+BLOCK = 4 * 2**20
+
+
+class LineIndex(threading.Thread):
+	'''	Finds line starts of mmap mm in background. Offset of every
+		STRIDE:th line is kept in self.offsets, rest are found with
+		mm.find() when needed, see line_offset().
+
+		If file descriptor fileno of mapped file is given, indexing
+		stops if file is truncated, see FileView.check()
+	'''
+
+	def __init__(self, mm, fileno=None):
+		super().__init__(daemon=True)
+		self.mm = mm
+		self.fileno = fileno
+		# offsets[k] is offset of line k * STRIDE, lines start from 0
+		self.offsets = array.array('Q', [0])
+		# Count of newlines indexed so far
+		self.newlines = 0
+		self.done = False
+		self.cancelled = threading.Event()
+
+
+	def run(self):
+		size = len(self.mm)
+		pos = 0
+
+		while pos < size and not self.cancelled.is_set():
+			if self.fileno is not None and os.fstat(self.fileno).st_size < size:
+				break
+
+			end = min(size, pos + BLOCK)
+			block = self.mm[pos:end]
+			count = block.count(b'\n')
+
+			# Offsets of line starts in block, relative to pos. Line
+			# after k:th newline of block is line self.newlines + 1 + k
+			starts = itertools.accumulate(map((1).__add__, map(len, block.split(b'\n'))))
+			first = -(self.newlines + 1) % STRIDE
+
+			self.offsets.extend(pos + start for start in
+				itertools.islice(starts, first, count, STRIDE))
+
+			# Updated after offsets, it is read in other thread
+			self.newlines += count
+			pos = end
+
+		self.done = True
+
+
+	def cancel(self):
+		self.cancelled.set()
+
+
+class FileView:
+	'''	Read-only view to file, which can be larger than memory.
+		File is mmapped and only lines asked with text() are decoded.
+
+		Lines and columns are counted from 0.
+
+		If file is truncated while it is mapped, reading past its new
+		end would crash editor with SIGBUS. So before mapping is read,
+		file is mapped again if it has become shorter, see check().
+	'''
+
+	def __init__(self, path):
+		self.path = path
+		self.file = open(path, 'rb')
+
+		try:
+			self.map()
+		except BaseException:
+			self.file.close()
+			raise
+
+		# Lines currently in widget: first line and count
+		self.first = 0
+		self.count = 0
+
+
+	def map(self):
+		'''	Map file with its current size and start indexing it.
+		'''
+		fileno = self.file.fileno()
+		size = os.fstat(fileno).st_size
+
+		# Empty file can not be mmapped
+		self.mm = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) if size else b''
+		self.index = LineIndex(self.mm, fileno)
+
+		if size:
+			self.index.start()
+		else:
+			self.index.done = True
+
+
+	def unmap(self):
+		self.index.cancel()
+
+		if self.index.is_alive():
+			self.index.join()
+
+		if isinstance(self.mm, mmap.mmap):
+			self.mm.close()
+
+
+	def check(self):
+		'''	Map file again if it is shorter than mapping. Returns True
+			if it was, then lines are indexed again from start.
+		'''
+		if os.fstat(self.file.fileno()).st_size >= len(self.mm):
+			return False
+
+		self.unmap()
+		self.map()
+		return True
+
+
+	def size(self):
+		return len(self.mm)
+
+
+	def lines(self):
+		'''	Count of lines known so far.
+		'''
+		return self.index.newlines + 1
+
+
+	def line_offset(self, line):
+		'''	Offset of start of line, or None if line is not indexed yet.
+		'''
+		if line < 0 or line > self.index.newlines:
+			return None
+
+		k, rest = divmod(line, STRIDE)
+		pos = self.index.offsets[k]
+
+		for i in range(rest):
+			pos = self.mm.find(b'\n', pos) + 1
+
+		return pos
+
+
+	def line_end(self, line):
+		'''	Offset of end of line, before its newline.
+		'''
+		start = self.line_offset(line)
+		end = self.mm.find(b'\n', start)
+
+		if end == -1:
+			end = len(self.mm)
+
+		return end
+
+
+	def text(self, first, count):
+		'''	Lines first ... first + count - 1 as string, without
+			newline at end.
+		'''
+		self.check()
+		start = self.line_offset(first)
+		if start is None:
+			return ''
+
+		last = min(first + count, self.index.newlines)
+
+		if first + count > self.index.newlines and self.index.done:
+			end = len(self.mm)
+		else:
+			end = self.line_offset(last)
+
+		text = self.mm[start:end].decode('utf-8', errors='replace')
+
+		if text.endswith('\n'):
+			text = text[:-1]
+
+		return text
+
+
+	def line_of(self, offset):
+		'''	Line at offset.
+		'''
+		k = bisect.bisect_right(self.index.offsets, offset) - 1
+		pos = self.index.offsets[k]
+		line = k * STRIDE
+
+		while pos < offset:
+			end = min(offset, pos + BLOCK)
+			line += self.mm[pos:end].count(b'\n')
+			pos = end
+
+		return line
+
+
+	def find(self, word, line, col, backwards=False):
+		'''	Search word from position (line, col). Search wraps around
+			at start or end of file. Returns (line, col) of match,
+			or None if there is no match.
+		'''
+		self.check()
+		start = self.line_offset(line)
+		if start is None:
+			start = 0
+		else:
+			linetext = self.mm[start:self.line_end(line)].decode('utf-8', errors='replace')
+			start += len(linetext[:col].encode('utf-8'))
+
+		pattern = word.encode('utf-8')
+
+		if backwards:
+			offset = self.mm.rfind(pattern, 0, start)
+			if offset == -1:
+				offset = self.mm.rfind(pattern, start)
+		else:
+			offset = self.mm.find(pattern, start)
+			if offset == -1:
+				offset = self.mm.find(pattern, 0, start + len(pattern))
+
+		if offset == -1:
+			return None
+
+		line = self.line_of(offset)
+		linestart = self.mm.rfind(b'\n', 0, offset) + 1
+		col = len(self.mm[linestart:offset].decode('utf-8', errors='replace'))
+
+		return (line, col)
+
+
+	def close(self):
+		self.unmap()
+		self.file.close()
+
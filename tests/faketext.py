@@ -0,0 +1,79 @@
+class FakeText:
+	'''	Minimal stand-in of tkinter.Text for tests without display: text
+		with trailing newline which can not be deleted, and indexes like
+		'line.col' and 'end'. Indexes past end are clamped like in Tk.
+		Like in Tk, edits are ignored when state is 'disabled', and they
+		set modified flag.
+	'''
+
+	def __init__(self, text=''):
+		self.text = text + '\n'
+		self.options = dict(state='normal', autoseparators=True)
+		self.modified = False
+
+
+	def offset(self, index):
+		if index == 'end':
+			return len(self.text) - 1
+
+		line, col = map(int, index.split('.'))
+		lines = self.text.split('\n')
+
+		if line > len(lines):
+			return len(self.text) - 1
+
+		offset = sum(len(l) + 1 for l in lines[:line - 1])
+		return min(offset + min(col, len(lines[line - 1])), len(self.text) - 1)
+
+
+	def get(self, index1, index2):
+		if index2 == 'end':
+			return self.text[self.offset(index1):]
+
+		return self.text[self.offset(index1):self.offset(index2)]
+
+
+	def insert(self, index, text):
+		if self.options['state'] != 'normal':
+			return
+
+		i = self.offset(index)
+		self.text = self.text[:i] + text + self.text[i:]
+		self.modified = True
+
+
+	def delete(self, index1, index2):
+		if self.options['state'] != 'normal':
+			return
+
+		i, j = self.offset(index1), self.offset(index2)
+		self.text = self.text[:i] + self.text[j:]
+		self.modified = True
+
+
+	def replace(self, index1, index2, text):
+		self.delete(index1, index2)
+		self.insert(index1, text)
+
+
+	def cget(self, option):
+		return self.options[option]
+
+
+	def config(self, **options):
+		self.options.update(options)
+
+
+	def edit_separator(self):
+		pass
+
+
+	def edit_modified(self, flag=None):
+		if flag is None:
+			return self.modified
+
+		self.modified = flag
+
+
+	def contents(self):
+		return self.text[:-1]
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from simple_editor import runner
+
+
+pytestmark = pytest.mark.skipif(not runner.ForkServer.available(),
+	reason='capture pipe needs posix')
+
+
+def run(path, options='-'):
+	proc = runner.Runner(['python', runner.CAPTURE, options, str(path)], capture=True)
+	proc.start()
+
+	while not proc.done():
+		time.sleep(0.02)
+
+	items = list()
+	while (item := proc.get()) is not None:
+		items.append(item)
+
+	return proc, items
+
+
+def records(items):
+	return [ data for name, data in items if name == 'capture' ]
+
+
+def test_uncaught_exception_has_frame_of_file(tmp_path):
+	path = tmp_path / 'fail.py'
+	path.write_text('def f():\n\traise ValueError("x")\nf()\n')
+
+	proc, items = run(path)
+	record, = records(items)
+
+	assert proc.returncode() == 1
+	assert record['kind'] == 'uncaught'
+	assert record['type'] == 'ValueError'
+	assert record['frames'][-1][:2] == [str(path), 2]
+
+
+def test_syntax_error_has_location_of_error(tmp_path):
+	path = tmp_path / 'syntax.py'
+	path.write_text('a = 1\nx = (\n')
+
+	proc, items = run(path)
+	record, = records(items)
+
+	assert record['type'] == 'SyntaxError'
+	assert record['frames'][-1][:2] == [str(path), 2]
+
+
+def test_logged_exception(tmp_path):
+	path = tmp_path / 'logged.py'
+	path.write_text('import logging\ntry:\n\t1/0\nexcept ZeroDivisionError:\n'
+		'\tlogging.exception("oops")\n')
+
+	proc, items = run(path, 'logging')
+	record, = records(items)
+
+	assert proc.returncode() == 0
+	assert record['kind'] == 'logged'
+	assert record['frames'][-1][:2] == [str(path), 3]
+
+
+def test_parse_options():
+	from simple_editor import capture
+
+	assert capture.parse('-') == dict(profile=False, memory=None, limits=dict())
+	assert capture.parse('logging,cpu=5,as=1000,memory=0.5') == dict(
+		profile=False, memory=0.5, limits=dict(cpu=5, **{'as': 1000}))
+	assert capture.parse('profile,memory,cpu=x')['memory'] == 0
+
+
+def test_memory_limit(tmp_path):
+	pytest.importorskip('resource')
+	path = tmp_path / 'big.py'
+	path.write_text('x = bytearray(4 * 2**30)\n')
+
+	proc, items = run(path, 'as=%d' % 2**30)
+	record, = records(items)
+
+	assert proc.returncode() == 1
+	assert record['type'] == 'MemoryError'
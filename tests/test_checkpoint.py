@@ -0,0 +1,54 @@
+import stat
+import os
+
+from simple_editor.checkpoint import atomic_write, CheckpointWriter
+
+
+def test_write_new_and_existing_file(tmp_path):
+	path = tmp_path / 'file.py'
+
+	atomic_write(path, 'first')
+	assert path.read_text() == 'first'
+
+	atomic_write(path, 'second', fsync=True)
+	assert path.read_text() == 'second'
+
+	# No temporary files left
+	assert os.listdir(tmp_path) == ['file.py']
+
+
+def test_mode_is_kept(tmp_path):
+	path = tmp_path / 'script.py'
+	path.write_text('old')
+	path.chmod(0o751)
+
+	atomic_write(path, 'new')
+
+	assert stat.S_IMODE(path.stat().st_mode) == 0o751
+
+
+def test_symlink_target_is_written(tmp_path):
+	target = tmp_path / 'real' / 'file.py'
+	target.parent.mkdir()
+	target.write_text('old')
+
+	link = tmp_path / 'link.py'
+	link.symlink_to(target)
+
+	atomic_write(link, 'new')
+
+	assert link.is_symlink()
+	assert target.read_text() == 'new'
+	assert sorted(os.listdir(target.parent)) == ['file.py']
+
+
+def test_checkpoint_writer_writes_latest(tmp_path):
+	path = tmp_path / 'editor.cnf'
+	writer = CheckpointWriter(path)
+	writer.start()
+
+	writer.put(dict(a=1))
+	writer.put(dict(a=2))
+	writer.stop()
+
+	assert path.read_text() == '{"a": 2}'
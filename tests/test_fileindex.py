@@ -0,0 +1,73 @@
+from simple_editor import Tab, fileindex
+
+
+def tab(path):
+	return Tab(filepath=path, type='normal')
+
+
+def test_same_file_through_other_paths(tmp_path, monkeypatch):
+	path = tmp_path / 'file.py'
+	path.write_text('')
+	link = tmp_path / 'link.py'
+	link.symlink_to(path)
+	hard = tmp_path / 'hard.py'
+	hard.hardlink_to(path)
+
+	index = fileindex.FileIndex()
+	t = tab(path)
+	index.add(t)
+
+	monkeypatch.chdir(tmp_path)
+	assert index.find(link) is t
+	assert index.find(hard) is t
+	assert index.find('file.py') is t
+	assert index.find(tmp_path / 'other.py') is None
+
+
+def test_replaced_file_is_found_by_path(tmp_path):
+	path = tmp_path / 'file.py'
+	path.write_text('old')
+	index = fileindex.FileIndex()
+	t = tab(path)
+	index.add(t)
+
+	# New inode, like after atomic save
+	new = tmp_path / 'new.py'
+	new.write_text('new')
+	new.replace(path)
+
+	assert index.find(path) is t
+
+
+def test_remove_and_rebuild(tmp_path):
+	first, second = tab(tmp_path / 'a.py'), tab(tmp_path / 'b.py')
+	index = fileindex.FileIndex()
+	index.rebuild([first, second, tab(None)])
+
+	index.remove(first)
+	assert index.find(first.filepath) is None
+	assert index.find(second.filepath) is second
+
+	# Filepath changed, like in save as
+	second.filepath = tmp_path / 'c.py'
+	index.add(second)
+	assert index.find(tmp_path / 'b.py') is None
+	assert index.find(tmp_path / 'c.py') is second
+
+
+def test_reused_inode_is_not_found(tmp_path, monkeypatch):
+	first, second = tmp_path / 'a.py', tmp_path / 'b.py'
+	keys = { str(first): ('inode', 1, 10), str(second): ('inode', 1, 20) }
+	monkeypatch.setattr(fileindex, 'file_key', lambda path: keys[str(path)])
+
+	index = fileindex.FileIndex()
+	t = tab(first)
+	index.add(t)
+
+	# a.py is replaced outside editor, and b.py gets its old inode
+	keys[str(first)] = ('inode', 1, 30)
+	keys[str(second)] = ('inode', 1, 10)
+
+	assert index.find(second) is None
+	assert index.find(first) is t
+	assert index.entries[t][0] == ('inode', 1, 30)
@@ -0,0 +1,108 @@
+import types
+
+import pytest
+
+from simple_editor import Tab, Editor, checksum, filewatch, undo
+from faketext import FakeText
+
+
+@pytest.mark.parametrize('old, new', [
+	('a\nb\nc\n', 'a\nB\nc\n'),
+	('a\nb\nc\n', 'a\nc\n'),
+	('a\nb\nc\n', 'x\na\nb\nc\ny\n'),
+	('a\nb\nc', 'a\nb\nc\nd'),
+	('a\nb\nc\nd', 'a\nb'),
+	('', 'new\nfile\n'),
+	('old\n', ''),
+	('a = 1\n\x0c\nb = 2\nc = 3\n', 'a = 1\n\x0c\nb = 2\nc = 4\n'),
+	('a\x0cb\nc\n', 'a\x0cB\nc\n'),
+	])
+def test_patch_makes_new_contents(old, new):
+	widget = FakeText(old)
+	filewatch.patch(widget, old, new)
+	assert widget.contents() == new
+
+
+def test_poll_sees_changed_file(tmp_path):
+	path = tmp_path / 'file.py'
+	path.write_text('old')
+
+	watcher = filewatch.FileWatcher(use_inotify=False)
+	watcher.set_files([str(path)])
+	assert watcher.poll() == set()
+
+	path.write_text('new contents')
+	assert watcher.poll() == {str(path)}
+	assert watcher.poll() == set()
+
+
+def editor(tab):
+	'''	Enough of Editor for load_tab() and reload_tab() of tab without
+		widget.
+	'''
+	return types.SimpleNamespace(
+		prefetch=dict(),
+		tabview=types.SimpleNamespace(pool=dict()),
+		conflicts=set(),
+		journal=types.SimpleNamespace(isopen=lambda tab: False),
+		)
+
+
+def tab_with_undo(path, contents):
+	path.write_text(contents)
+	tab = Tab(filepath=path, contents=contents, type='normal')
+	tab.diskhash = checksum(contents)
+	tab.undo = undo.UndoHistory().new_stack()
+	tab.undo.record('insert', (1, 0), 'x')
+	return tab
+
+
+def test_reload_patches_disabled_widget(tmp_path):
+	tab = tab_with_undo(tmp_path / 'file.py', 'old\nsame\n')
+	widget = FakeText(tab.contents)
+	# Like in search
+	widget.config(state='disabled')
+
+	ed = editor(tab)
+	ed.tabview.pool[tab] = widget
+	new = 'new\nsame\n'
+
+	Editor.reload_tab(ed, tab, new, checksum(new))
+
+	assert widget.contents() == tab.contents == new
+	assert widget.cget('state') == 'disabled'
+
+
+def test_reload_without_widget_clears_undo(tmp_path):
+	tab = tab_with_undo(tmp_path / 'file.py', 'old\n')
+	new = 'changed\n'
+
+	Editor.reload_tab(editor(tab), tab, new, checksum(new))
+
+	assert tab.contents == new
+	assert len(tab.undo.undo) == 0
+
+
+def test_rehydrate_of_changed_file_clears_undo(tmp_path):
+	path = tmp_path / 'file.py'
+	tab = tab_with_undo(path, 'old\n')
+
+	# Clean contents are dropped, then file changes in disk
+	tab.hibernate()
+	assert tab.contents is None
+	path.write_text('changed\n')
+
+	assert Editor.load_tab(editor(tab), tab)
+	assert tab.contents == 'changed\n'
+	assert len(tab.undo.undo) == 0
+
+
+def test_rehydrate_of_same_file_keeps_undo(tmp_path):
+	path = tmp_path / 'file.py'
+	tab = tab_with_undo(path, 'old\n')
+
+	tab.hibernate()
+	assert Editor.load_tab(editor(tab), tab)
+
+	assert tab.contents == 'old\n'
+	assert len(tab.undo.undo) == 1
@@ -0,0 +1,67 @@
+import os
+
+from simple_editor import follow
+
+
+def append(path, data):
+	with open(path, 'ab') as f:
+		f.write(data)
+
+
+def test_new_lines_are_read(tmp_path):
+	path = tmp_path / 'log.txt'
+	path.write_bytes(b'first\r\n')
+	follower = follow.Follower(path)
+
+	assert follower.read() == ('first\n', True)
+	assert follower.read() == ('', False)
+
+	# Character split between writes
+	append(path, 'ä'.encode('utf-8')[:1])
+	assert follower.read() == ('', False)
+	append(path, 'ä'.encode('utf-8')[1:] + b'\n')
+	assert follower.read() == ('ä\n', False)
+
+	follower.close()
+
+
+def test_truncated_file_is_read_from_start(tmp_path):
+	path = tmp_path / 'log.txt'
+	path.write_bytes(b'long line of old log\n')
+	follower = follow.Follower(path)
+	follower.read()
+
+	path.write_bytes(b'new\n')
+	assert follower.read() == ('new\n', True)
+
+	follower.close()
+
+
+def test_rotated_file_is_followed(tmp_path):
+	path = tmp_path / 'log.txt'
+	path.write_bytes(b'old\n')
+	follower = follow.Follower(path)
+	follower.read()
+
+	append(path, b'last of old\n')
+	os.rename(path, tmp_path / 'log.txt.1')
+	assert follower.read() == ('last of old\n', False)
+
+	path.write_bytes(b'new\n')
+	assert follower.read() == ('new\n', False)
+
+	follower.close()
+
+
+def test_only_tail_of_big_file_is_read(tmp_path, monkeypatch):
+	monkeypatch.setattr(follow, 'TAIL_BYTES', 100)
+	path = tmp_path / 'log.txt'
+	path.write_bytes(b''.join(b'line %d\n' % i for i in range(100)))
+	follower = follow.Follower(path)
+
+	text, restarted = follower.read()
+	assert restarted
+	assert text.endswith('line 99\n')
+	assert text.startswith('line ') and len(text) <= 100
+
+	follower.close()
@@ -0,0 +1,48 @@
+import tkinter.font
+import os
+
+import pytest
+
+from simple_editor import fontcache
+
+
+@pytest.fixture
+def fonts(tmp_path, monkeypatch):
+	'''	Fake font listing without display. Returns list of calls.
+	'''
+	calls = list()
+
+	def families(root=None):
+		calls.append(root)
+		return ('Mono', 'Dingbats', 'Sans', 'Mono')
+
+	monkeypatch.setattr(tkinter.font, 'families', families)
+	monkeypatch.setattr(fontcache, '_cache', None)
+	monkeypatch.setattr(fontcache, 'FONTCONFIG_CACHEDIRS', [tmp_path / 'fontconfig'])
+	(tmp_path / 'fontconfig').mkdir()
+
+	return calls
+
+
+def test_families_are_filtered_and_cached(tmp_path, fonts):
+	cachepath = tmp_path / 'editor.fonts'
+
+	assert fontcache.families(cachepath=cachepath) == ['Mono', 'Sans']
+	assert fontcache.families(cachepath=cachepath) == ['Mono', 'Sans']
+	assert len(fonts) == 1
+
+	# New process reads cache file
+	fontcache._cache = None
+	assert fontcache.families(cachepath=cachepath) == ['Mono', 'Sans']
+	assert len(fonts) == 1
+
+
+def test_cache_is_invalid_when_fonts_change(tmp_path, fonts):
+	cachepath = tmp_path / 'editor.fonts'
+	fontcache.families(cachepath=cachepath)
+
+	# Fontconfig cache directory is updated when fonts are installed
+	os.utime(tmp_path / 'fontconfig', ns=(0, 10**9))
+
+	fontcache.families(cachepath=cachepath)
+	assert len(fonts) == 2
@@ -0,0 +1,55 @@
+import pathlib
+import types
+
+from simple_editor import Editor, imports
+
+
+def test_absolute_and_relative_imports(tmp_path):
+	package = tmp_path / 'pkg'
+	filepath = package / 'sub' / 'main.py'
+	source = 'import os.path\nfrom . import helper\nfrom ..base import thing\n'
+
+	paths = imports.imported_files(source, filepath, [tmp_path])
+
+	assert package / 'sub' / 'os' / 'path.py' in paths
+	assert tmp_path / 'os' / '__init__.py' in paths
+	assert package / 'sub' / 'helper.py' in paths
+	assert package / 'base.py' in paths
+	assert package / 'base' / 'thing.py' in paths
+
+
+def test_syntax_error_has_no_imports(tmp_path):
+	assert imports.imported_files('import (', tmp_path / 'main.py') == set()
+
+
+def watcher(tab):
+	calls = list()
+	editor = types.SimpleNamespace(
+		watching=tab,
+		watch_paths=set(),
+		watch_after=None,
+		cancel_watch_run=lambda: None,
+		after=lambda ms, func: calls.append(func) or 'id',
+		watch_run=object(),
+		)
+	editor.watch_imports = lambda: Editor.watch_imports(editor)
+	return editor, calls
+
+
+def test_save_through_symlink_runs_watched_file(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	(tmp_path / 'helper.py').write_text('')
+	main = tmp_path / 'main.py'
+	main.write_text('import helper\n')
+	link = tmp_path / 'link.py'
+	link.symlink_to('helper.py')
+
+	tab = types.SimpleNamespace(filepath=main, contents=main.read_text())
+	editor, calls = watcher(tab)
+	editor.watch_imports()
+
+	Editor.watch_saved(editor, pathlib.Path('link.py'))
+	assert calls == [editor.watch_run]
+
+	Editor.watch_saved(editor, tmp_path / 'other.py')
+	assert calls == [editor.watch_run]
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from simple_editor import journal
+from faketext import FakeText
+
+
+EDITS = [
+	('insert', (1, 0), 'hello'),
+	('insert', (1, 5), ' world\nsecond'),
+	('delete', (1, 2), 'llo wor'),
+	('insert', (2, 6), '\n\nfourth'),
+	('delete', (1, 4), 'd\nsecond\n'),
+	]
+
+
+def edited(base, edits):
+	'''	base with edits done to Text-widget.
+	'''
+	widget = FakeText(base)
+
+	for kind, (line, col), text in edits:
+		index = '%d.%d' % (line, col)
+
+		if kind == 'insert':
+			widget.insert(index, text)
+		else:
+			end = widget.text[:widget.offset(index) + len(text)]
+			widget.delete(index, '%d.%d' % (end.count('\n') + 1, len(end) - end.rfind('\n') - 1))
+
+	return widget.contents()
+
+
+def ops(edits):
+	return [ ['i', line, col, text] if kind == 'insert' else ['d', line, col, len(text)]
+		for kind, (line, col), text in edits ]
+
+
+@pytest.mark.parametrize('count', range(1, len(EDITS) + 1))
+def test_replay_is_same_as_edits(count):
+	base = 'base\n'
+	assert journal.replay(base, ops(EDITS[:count])) == edited(base, EDITS[:count])
+
+
+def test_journal_is_recovered(tmp_path):
+	tab = object()
+	header = dict(filepath=None, type='newtab', diskhash=None, snapshot='base\n')
+
+	j = journal.Journal(tmp_path)
+	j.start()
+	j.open(tab, header)
+
+	for kind, pos, text in EDITS:
+		j.record(tab, kind, pos, text)
+
+	j.stop()
+
+	[(read_header, read_ops)] = journal.read_journals(tmp_path)
+	assert read_header == header
+	assert journal.replay(read_header['snapshot'], read_ops) == edited('base\n', EDITS)
+
+
+def test_rebase_drops_older_ops(tmp_path):
+	tab = object()
+	j = journal.Journal(tmp_path)
+	j.start()
+	j.open(tab, dict(snapshot=''))
+	j.record(tab, 'insert', (1, 0), 'saved')
+	mark = j.mark(tab)
+	j.record(tab, 'insert', (1, 5), ' unsaved')
+
+	j.rebase(mark, dict(snapshot='saved'))
+	assert j.size(tab) == 1
+	j.stop()
+
+	[(header, read_ops)] = journal.read_journals(tmp_path)
+	assert journal.replay(header['snapshot'], read_ops) == 'saved unsaved'
+
+
+def test_partial_last_line_is_ignored(tmp_path):
+	path = tmp_path / ('0' + journal.SUFFIX)
+	path.write_text(json.dumps(dict(snapshot='')) + '\n'
+		+ json.dumps(['i', 1, 0, 'ok']) + '\n' + '["i", 1, 2, "lo')
+
+	[(header, read_ops)] = journal.read_journals(tmp_path)
+	assert journal.replay(header['snapshot'], read_ops) == 'ok'
@@ -0,0 +1,36 @@
+from simple_editor import loader
+
+
+def read_all(reader):
+	reader.start()
+	chunks = list()
+
+	while True:
+		item = reader.chunks.get(timeout=5)
+		if item is None or isinstance(item, Exception):
+			return chunks, item
+
+		chunks.append(item)
+
+
+def test_chunks_are_same_as_open(tmp_path):
+	path = tmp_path / 'big.txt'
+	# Chunks of 7 bytes split \r\n and multibyte chars
+	data = ''.join('rivi ä %d\r\nline\r%d\n' % (i, i) for i in range(200)).encode('utf-8')
+	path.write_bytes(data)
+
+	reader = loader.FileReader(path, len(data), chunksize=7)
+	chunks, end = read_all(reader)
+
+	assert end is None
+	assert ''.join(chunks) == path.read_text(encoding='utf-8')
+	assert reader.progress() == 100
+
+
+def test_invalid_utf8_is_reported(tmp_path):
+	path = tmp_path / 'binary'
+	path.write_bytes(b'ok\n\xff\xfe')
+
+	chunks, end = read_all(loader.FileReader(path, 5))
+
+	assert isinstance(end, ValueError)
@@ -0,0 +1,78 @@
+import os
+
+from simple_editor import projectfiles
+
+
+FILES = [
+	os.path.join('src', 'editor', 'main.py'),
+	os.path.join('src', 'editor', 'tabview.py'),
+	os.path.join('docs', 'tabs.md'),
+	os.path.join('tests', 'test_main.py'),
+	'setup.py',
+	'a+b (copy).txt',
+	]
+
+
+def test_chars_in_order_ignoring_case():
+	matcher = projectfiles.Matcher()
+
+	assert set(matcher.match('TBV', FILES)) == {FILES[1]}
+	assert matcher.match('vbt', FILES) == []
+	assert matcher.match('+b (', FILES) == ['a+b (copy).txt']
+
+
+def test_query_starting_with_star():
+	files = FILES + ['a*b.py']
+	matcher = projectfiles.Matcher()
+
+	assert matcher.match('*', files) == ['a*b.py']
+	assert matcher.match('*.py', files) == ['a*b.py']
+	assert projectfiles.Matcher().match('*', FILES) == []
+
+
+def test_match_in_file_name_is_better():
+	matcher = projectfiles.Matcher()
+
+	# Same match in file name, so shorter path first
+	assert matcher.match('main', FILES) == [FILES[0], FILES[3]]
+	assert matcher.match('tab', FILES)[:2] == [FILES[2], FILES[1]]
+
+
+def test_continued_query_is_same_as_fresh():
+	typed = projectfiles.Matcher()
+
+	for i in range(1, len('tabpy') + 1):
+		query = 'tabpy'[:i]
+		assert typed.match(query, FILES) == projectfiles.Matcher().match(query, FILES)
+
+	# Shorter query searches all files again
+	assert typed.match('s', FILES) == projectfiles.Matcher().match('s', FILES)
+
+
+def test_empty_query_and_limit():
+	matcher = projectfiles.Matcher()
+
+	assert matcher.match('', FILES, limit=2) == FILES[:2]
+	assert len(matcher.match('py', FILES, limit=1)) == 1
+
+
+def test_index_skips_dirs_and_uses_cache(tmp_path):
+	root = tmp_path / 'project'
+	(root / 'pkg').mkdir(parents=True)
+	(root / '.git').mkdir()
+	(root / 'pkg' / 'mod.py').write_text('')
+	(root / '.git' / 'HEAD').write_text('')
+	(root / 'top.py').write_text('')
+	cache = tmp_path / 'cache.json'
+
+	index = projectfiles.ProjectIndex(root, cache)
+	index.run()
+	assert index.files == [os.path.join('pkg', 'mod.py'), 'top.py']
+
+	(root / 'new.py').write_text('')
+
+	index = projectfiles.ProjectIndex(root, cache)
+	index.start()
+	index.join()
+	assert index.done
+	assert index.files == ['new.py', os.path.join('pkg', 'mod.py'), 'top.py']
@@ -0,0 +1,95 @@
+import time
+import os
+
+import pytest
+
+from simple_editor import runner
+
+
+pytestmark = pytest.mark.skipif(not runner.ForkServer.available(),
+	reason='fork-server needs posix')
+
+
+def drain(proc):
+	proc.start()
+	deadline = time.monotonic() + 10
+
+	while not proc.done():
+		assert time.monotonic() < deadline
+		time.sleep(0.02)
+
+	items = list()
+	while (item := proc.get()) is not None:
+		items.append(item)
+
+	return items
+
+
+def start_forkserver():
+	server = runner.ForkServer('python')
+	server.start()
+
+	# Wait until helper listens
+	deadline = time.monotonic() + 10
+	while not os.path.exists(server.socketpath):
+		assert time.monotonic() < deadline
+		time.sleep(0.02)
+
+	return server
+
+
+@pytest.fixture
+def forkserver():
+	server = start_forkserver()
+	yield server
+	server.stop()
+
+
+EXITING = '''\
+import threading, atexit, time
+atexit.register(lambda: print("atexit ran", flush=True))
+def work():
+	time.sleep(0.2)
+	print("thread done", flush=True)
+threading.Thread(target=work).start()
+print("main done", flush=True)
+'''
+
+
+def test_normal_run_output_and_usage(tmp_path):
+	path = tmp_path / 'hello.py'
+	path.write_text('print("hello")\n')
+
+	proc = runner.Runner(['python', str(path)])
+	items = drain(proc)
+
+	assert items == [('stdout', 'hello')]
+	assert proc.returncode() == 0
+	assert proc.usage['maxrss'] > 0
+	assert proc.elapsed() > 0
+
+
+def test_forked_run_exits_like_normal_run(tmp_path, forkserver):
+	path = tmp_path / 'exiting.py'
+	path.write_text(EXITING)
+
+	normal = drain(runner.Runner(['python', str(path)]))
+	forked = drain(forkserver.runner(str(path)))
+
+	assert sorted(normal) == sorted(forked)
+	assert ('stdout', 'atexit ran') in forked
+	assert ('stdout', 'thread done') in forked
+
+
+def test_forkserver_not_usable_when_environment_changes(monkeypatch):
+	# Started here: pytest changes environment between setup and test
+	server = start_forkserver()
+
+	try:
+		assert server.usable()
+
+		monkeypatch.setenv('SIMPLE_EDITOR_TEST', '1')
+		assert not server.usable()
+
+	finally:
+		server.stop()
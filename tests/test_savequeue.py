@@ -0,0 +1,71 @@
+from simple_editor.savequeue import SaveQueue
+
+
+def results(savequeue):
+	res = list()
+	while not savequeue.results.empty():
+		res.append(savequeue.results.get())
+	return res
+
+
+def test_pending_write_of_same_key_is_replaced(tmp_path):
+	path = tmp_path / 'file.py'
+	savequeue = SaveQueue()
+
+	# Not started yet, so both are pending
+	savequeue.put('tab', path, 'first', info=1)
+	savequeue.put('tab', path, 'second', info=2)
+	assert 'tab' in savequeue
+
+	savequeue.start()
+	savequeue.flush()
+
+	assert path.read_text() == 'second'
+	assert results(savequeue) == [('tab', path, 2, None)]
+	assert not savequeue.unfinished()
+	savequeue.stop()
+
+
+def test_failed_write_is_reported(tmp_path):
+	path = tmp_path / 'missing' / 'file.py'
+	savequeue = SaveQueue()
+	savequeue.start()
+
+	savequeue.put('tab', path, 'data')
+	savequeue.stop()
+
+	(key, respath, info, error), = results(savequeue)
+	assert respath == path
+	assert isinstance(error, OSError)
+
+
+def test_stop_finishes_queued_writes(tmp_path):
+	savequeue = SaveQueue(fsync=True)
+	savequeue.start()
+
+	for i in range(5):
+		savequeue.put(i, tmp_path / ('%d.py' % i), str(i))
+
+	savequeue.stop()
+
+	assert [ (tmp_path / ('%d.py' % i)).read_text() for i in range(5) ] == list('01234')
+
+
+def test_unencodable_data_is_reported(tmp_path):
+	path = tmp_path / 'file.py'
+	savequeue = SaveQueue()
+	savequeue.start()
+
+	# Lone surrogate can not be encoded to utf-8
+	savequeue.put('tab', path, 'bad \ud800')
+	savequeue.flush()
+	assert savequeue.is_alive()
+
+	savequeue.put('tab', path, 'good')
+	savequeue.stop()
+
+	(key, respath, info, error), result = results(savequeue)
+	assert isinstance(error, UnicodeEncodeError)
+	assert result[3] is None
+	assert path.read_text() == 'good'
+	assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,17 @@
+import subprocess
+import pathlib
+import sys
+import os
+
+import simple_editor
+
+
+def test_import_does_not_load_deferred_modules():
+	src = pathlib.Path(simple_editor.__file__).parent.parent
+	code = ('import sys, simple_editor; '
+		'print(*[m for m in ("subprocess", "ast", "tempfile") if m in sys.modules])')
+
+	res = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE,
+		env=dict(os.environ, PYTHONPATH=str(src)), check=True)
+
+	assert res.stdout.decode().split() == []
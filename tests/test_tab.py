@@ -0,0 +1,114 @@
+import types
+import zlib
+
+import pytest
+
+from simple_editor import Tab, Editor, checksum
+from faketext import FakeText
+
+
+def normal_tab(contents, path='/tmp/file.py'):
+	tab = Tab(filepath=path, contents=contents, type='normal')
+	tab.diskhash = checksum(contents)
+	tab.active = False
+	tab.touched = 0
+	return tab
+
+
+def test_hibernate_drops_clean_contents():
+	tab = normal_tab('clean\n')
+	tab.hibernate()
+
+	assert tab.asleep and tab.dropped
+	assert tab.contents is None
+	assert not tab.dirty
+
+
+def test_wake_decompresses_once(monkeypatch):
+	tab = normal_tab('disk\n')
+	tab.contents = 'edited\n'
+	tab.hibernate()
+	assert tab.asleep and not tab.dropped and tab.dirty
+
+	tab.wake()
+
+	# No more decompressing on access
+	monkeypatch.setattr(zlib, 'decompress', None)
+	assert not tab.asleep
+	assert tab.contents == 'edited\n'
+	assert tab.dirty
+
+
+def test_load_tab_wakes_compressed_tab(tmp_path):
+	path = tmp_path / 'file.py'
+	path.write_text('disk\n')
+	tab = normal_tab('disk\n', path)
+	tab.contents = 'edited\n'
+	tab.hibernate()
+
+	editor = types.SimpleNamespace(prefetch=dict())
+	assert Editor.load_tab(editor, tab)
+
+	assert not tab.asleep
+	assert tab.contents == 'edited\n'
+
+
+@pytest.mark.parametrize('pooled', [False, True])
+def test_hibernate_tabs_skips_tabs_with_widget(pooled):
+	tab = normal_tab('x' * 1000)
+	editor = types.SimpleNamespace(
+		tabs=[tab],
+		tabview={tab} if pooled else set(),
+		memory_budget=0,
+		after=lambda ms, func: None,
+		hibernate_tabs=None,
+		)
+	editor.resident_sizes = lambda: Editor.resident_sizes(editor)
+
+	Editor.hibernate_tabs(editor)
+
+	assert tab.asleep is not pooled
+
+
+class EditText(FakeText):
+	'''	FakeText which records replaced ranges and separators
+	'''
+
+	def __init__(self, text=''):
+		super().__init__(text)
+		self.edits = list()
+
+
+	def replace(self, index1, index2, text):
+		self.edits.append((index1, index2, text))
+		super().replace(index1, index2, text)
+
+
+	def edit_separator(self):
+		self.edits.append('separator')
+
+
+def test_tabify_tab_edits_widget_too():
+	contents = 'a\n        b\nc  d\n\x0c    e\n'
+	tab = normal_tab(contents)
+	widget = EditText(contents)
+	# Like in search
+	widget.config(state='disabled')
+	widget.modified = True
+	editor = types.SimpleNamespace(tabview=types.SimpleNamespace(pool={tab: widget}))
+
+	Editor.tabify_tab(editor, tab)
+
+	assert tab.contents == widget.contents() == 'a\n\t\tb\nc  d\n\x0c\te\n'
+	assert widget.edits == ['separator', ('2.0', '2.8', '\t\t'), ('4.1', '4.5', '\t'), 'separator']
+	assert not widget.modified
+	assert widget.options == dict(state='disabled', autoseparators=True)
+
+
+def test_tabify_tab_without_widget():
+	tab = normal_tab('    a\n')
+	editor = types.SimpleNamespace(tabview=types.SimpleNamespace(pool=dict()))
+
+	Editor.tabify_tab(editor, tab)
+
+	assert tab.contents == '\ta\n'
@@ -0,0 +1,45 @@
+import pytest
+
+from simple_editor.tabify import tabify
+
+
+def tabify_line(line, width=4):
+	'''	Earlier per-line tabify, see bench/tabify.py
+	'''
+	indent = line[:len(line) - len(line.lstrip(' \t'))]
+	count = 0
+
+	for char in indent:
+		if char == '\t':
+			count = 0
+			continue
+
+		count += 1
+		if count == width:
+			indent = indent.replace(width * ' ', '\t', 1)
+			count = 0
+
+	return indent + line[len(line) - len(line.lstrip(' \t')):]
+
+
+def reference(text):
+	return ''.join(tabify_line(line) for line in text.splitlines(True))
+
+
+@pytest.mark.parametrize('text', [
+	'',
+	'no indent\n',
+	'    one\n        two\n  short\n',
+	'\t    mixed\n  \t    x\n',
+	'x = 1    # spaces after text\n',
+	'        \n    ',
+	'a\r    carriage return\r\n    crlf\n',
+	'a\x0c        form feed\n\x0c    x',
+	'x\x85    y     z     w\x0b    v\x1c    u',
+	])
+def test_same_as_per_line(text):
+	assert tabify(text) == reference(text)
+
+
+def test_other_width():
+	assert tabify('  a\n    b\n', 2) == '\ta\n\t\tb\n'
@@ -0,0 +1,119 @@
+import types
+
+import pytest
+
+from simple_editor import Tab, tabview
+from faketext import FakeText
+
+
+class FakeWidget(FakeText):
+	'''	FakeText with what TabView uses from ScrolledText
+	'''
+
+	def __init__(self, master):
+		super().__init__()
+		self.mark = '1.0'
+		self.packed = False
+		self.destroyed = False
+		self.frame = types.SimpleNamespace(destroy=self.destroy)
+
+
+	def edit_reset(self):
+		pass
+
+
+	def mark_set(self, name, index):
+		self.mark = index
+
+
+	def index(self, index):
+		return self.mark
+
+
+	def pack(self, **options):
+		self.packed = True
+
+
+	def pack_forget(self):
+		self.packed = False
+
+
+	def destroy(self):
+		self.destroyed = True
+
+
+@pytest.fixture
+def view(monkeypatch):
+	monkeypatch.setattr(tabview.tkinter, 'Frame', lambda master: None)
+	return tabview.TabView(None, FakeWidget, maxsize=2)
+
+
+def tabs(count):
+	return [ Tab(filepath='/tmp/%d.py' % i, contents='tab %d\n' % i, type='normal')
+		for i in range(count) ]
+
+
+def test_least_recently_used_is_evicted(view):
+	first, second, third = tabs(3)
+	widgets = [ view.widget(tab) for tab in (first, second) ]
+
+	# first is used again, so second is the oldest
+	assert view.widget(first) is widgets[0]
+	view.widget(third)
+
+	assert list(view.pool) == [first, third]
+	assert second not in view
+	assert widgets[1].destroyed and not widgets[0].destroyed
+
+
+def test_eviction_copies_contents_and_position(view):
+	first, second, third = tabs(3)
+	widget = view.widget(first)
+	widget.insert('1.0', 'edit\n')
+	widget.mark_set('insert', '2.3')
+
+	view.widget(second)
+	view.widget(third)
+
+	assert first not in view
+	assert first.contents == 'edit\ntab 0\n'
+	assert first.position == '2.3'
+
+
+def test_evicted_tab_is_created_again(view):
+	first, second, third = tabs(3)
+	old = view.widget(first)
+	old.insert('1.0', 'edit\n')
+	old.mark_set('insert', '2.3')
+	view.widget(second)
+	view.widget(third)
+
+	widget = view.widget(first)
+
+	assert widget is not old
+	assert widget.contents() == 'edit\ntab 0\n'
+	assert widget.mark == '2.3'
+	assert not widget.edit_modified()
+	# second was now the least recently used
+	assert list(view.pool) == [third, first]
+
+
+def test_shown_widget_is_not_evicted(view):
+	first, second, third = tabs(3)
+	view.show(view.widget(first))
+	view.widget(second)
+	view.widget(third)
+
+	assert list(view.pool) == [first, third]
+	assert view.current.packed
+
+	view.resize(1)
+	assert list(view.pool) == [first]
+
+
+def test_bad_position_is_reset(view):
+	tab, = tabs(1)
+	tab.position = 'bad'
+
+	assert view.widget(tab).mark == '1.0'
+	assert tab.position == '1.0'
@@ -0,0 +1,111 @@
+from simple_editor import tracelinks
+
+
+OUTPUT = [
+	'Traceback (most recent call last):',
+	'  File "/tmp/main.py", line 3, in <module>',
+	'    f()',
+	'  File "/tmp/lib.py", line 10, in f',
+	'    raise ValueError',
+	'ValueError',
+	]
+
+
+def parsed(lines):
+	links = tracelinks.TraceLinks()
+
+	for line in lines:
+		links.add(line)
+
+	return links
+
+
+def test_frame_lines_are_found():
+	links = parsed(OUTPUT)
+
+	assert links.find(2) == ('/tmp/main.py', 3)
+	assert links.find(4) == ('/tmp/lib.py', 10)
+	assert links.find(3) is None
+	assert links.find(100) is None
+	assert links.ranges(1) == ['4.0', '4.0 lineend']
+
+
+def test_unparsed_lines_have_no_links():
+	links = tracelinks.TraceLinks()
+
+	assert not links.add(OUTPUT[1], parse=False)
+	assert links.find(1) is None
+
+
+def test_truncate_removes_later_links():
+	links = parsed(OUTPUT)
+	links.truncate(3)
+
+	assert links.lines == OUTPUT[:3]
+	assert links.find(2) == ('/tmp/main.py', 3)
+	assert links.starts == [2]
+
+	links.add(OUTPUT[3])
+	assert links.find(4) == ('/tmp/lib.py', 10)
+
+
+def test_record_frames_are_links():
+	links = parsed(['output'])
+	links.add_record(dict(kind='handled', type='KeyError', message='x\nmore',
+		frames=[['/tmp/main.py', 5, '<module>']]))
+
+	assert links.lines[1:] == ['Handled KeyError: x',
+		'  File "/tmp/main.py", line 5, in <module>']
+	assert links.find(3) == ('/tmp/main.py', 5)
+
+
+PROFILE = [
+	['/tmp/main.py', 1, '<module>', 1, 1, 0.001, 0.5],
+	['/tmp/main.py', 4, 'slow', 3, 10, 0.4, 0.45],
+	['~', 0, '<built-in method time.sleep>', 5, 5, 0.05, 0.05],
+	]
+
+
+def test_profile_is_sorted_and_linked():
+	links = parsed(['output'])
+	links.add_profile(PROFILE, 'self time', 2)
+
+	assert links.lines[1].startswith('Profile, 2 functions by self time')
+	assert links.lines[3].endswith('10/3  /tmp/main.py:4(slow)')
+	assert links.lines[4].endswith('<built-in method time.sleep>')
+	assert links.find(4) == ('/tmp/main.py', 4)
+	assert links.find(5) is None
+
+
+def test_format_size():
+	assert tracelinks.format_size(100) == '100 B'
+	assert tracelinks.format_size(1536) == '1.5 KiB'
+	assert tracelinks.format_size(3 * 2**20, sign=True) == '+3.0 MiB'
+	assert tracelinks.format_size(-2048, sign=True) == '-2.0 KiB'
+
+
+def test_memory_growth_is_compared_to_previous():
+	record = dict(current=4096, peak=8192, rows=[
+		['/tmp/main.py', 3, 1000, 10, 2000],
+		['<frozen importlib._bootstrap>', 1, 5000, 1, 5000],
+		['/tmp/main.py', 7, 3000, 30, 3000],
+		])
+	previous = {('/tmp/main.py', 7): 2500}
+
+	links = tracelinks.TraceLinks()
+	links.add_memory(record, previous, 'growth', 3)
+
+	assert links.lines[0] == 'Memory at exit: current 4.0 KiB, peak 8.0 KiB'
+	# Growth: frozen 5000, main.py:3 1000, main.py:7 500
+	assert links.lines[3].endswith('<frozen importlib._bootstrap>:1')
+	assert links.lines[4].endswith('/tmp/main.py:3')
+	assert '+500 B' in links.lines[5]
+	assert links.find(3) is None
+	assert links.find(5) == ('/tmp/main.py', 3)
+
+
+def test_memory_without_previous_run():
+	links = tracelinks.TraceLinks()
+	links.add_memory(dict(current=0, peak=0, rows=[]), None, 'size', 10)
+
+	assert links.lines[0].endswith('no previous run to compare')
@@ -0,0 +1,124 @@
+from simple_editor import undo
+
+
+def records(stack):
+	return [ [ list(record) for record in group.records ] for group in stack.undo ]
+
+
+def test_typing_is_one_record():
+	stack = undo.UndoHistory().new_stack()
+
+	for col, char in enumerate('abc'):
+		stack.record('insert', (1, col), char)
+
+	assert records(stack) == [[['insert', (1, 0), 'abc']]]
+
+
+def test_backspace_and_delete_key_coalesce():
+	stack = undo.UndoHistory().new_stack()
+
+	# Backspace from col 5 to 2
+	for col in (4, 3, 2):
+		stack.record('delete', (1, col), 'x')
+
+	stack.separator()
+
+	# Delete-key at col 0
+	for char in 'ab':
+		stack.record('delete', (2, 0), char)
+
+	assert records(stack) == [
+		[['delete', (1, 2), 'xxx']],
+		[['delete', (2, 0), 'ab']],
+		]
+
+
+def test_new_group_when_not_contiguous():
+	stack = undo.UndoHistory().new_stack()
+	stack.record('insert', (1, 0), 'a')
+	stack.record('insert', (5, 0), 'b')
+	stack.record('delete', (5, 0), 'b')
+
+	assert len(stack.undo) == 3
+
+
+def test_without_autoseparators_records_join_group():
+	stack = undo.UndoHistory().new_stack()
+	stack.record('insert', (1, 0), 'a', auto=False)
+	stack.record('insert', (5, 0), 'b', auto=False)
+
+	assert records(stack) == [[['insert', (1, 0), 'a'], ['insert', (5, 0), 'b']]]
+
+
+def test_multiline_insert_coalesces_at_its_end():
+	stack = undo.UndoHistory().new_stack()
+	stack.record('insert', (1, 3), 'a\nbc')
+	stack.record('insert', (2, 2), 'd')
+
+	assert records(stack) == [[['insert', (1, 3), 'a\nbcd']]]
+
+
+def test_undo_redo_and_new_edit_clears_redo():
+	stack = undo.UndoHistory().new_stack()
+	stack.record('insert', (1, 0), 'a')
+	stack.separator()
+	stack.record('insert', (1, 1), 'b')
+
+	group = stack.pop_undo()
+	assert group.records == [['insert', (1, 1), 'b']]
+	assert stack.pop_redo() is group
+
+	stack.pop_undo()
+	stack.record('insert', (1, 1), 'c')
+	assert stack.redo == []
+
+
+def test_budgets_drop_oldest_groups():
+	history = undo.UndoHistory(tab_budget=1000, total_budget=1500)
+	first, second = history.new_stack(), history.new_stack()
+
+	for i in range(20):
+		first.record('insert', (i + 1, 0), 'x' * 50)
+		second.record('insert', (i + 1, 0), 'y' * 50)
+
+	assert first.size <= 1000 and second.size <= 1000
+	assert history.total_size() <= 1500
+	# Newest groups are kept
+	assert first.undo[-1].records[0][1] == (20, 0)
+	assert second.undo[-1].records[0][1] == (20, 0)
+
+
+def hooked_widget():
+	'''	Tcl-command .w stands for Text-widget, it fails with index.
+	'''
+	import tkinter
+	import types
+
+	tcl = tkinter.Tcl()
+	tcl.eval('proc .w {args} { if {[lindex $args 0] eq "index"} { error "bad text index" } }')
+
+	bells = list()
+	widget = types.SimpleNamespace(tk=tcl.tk, _w='.w', _tclCommands=None,
+		bell=lambda: bells.append(1))
+
+	hook = undo.EditHook(widget)
+	hook.stack = undo.UndoHistory().new_stack()
+	return tcl, hook, bells
+
+
+def test_edithook_empty_stack_rings_bell_without_error():
+	tcl, hook, bells = hooked_widget()
+
+	for command in ('.w edit undo', '.w edit redo'):
+		assert tcl.eval('catch {%s} result' % command) == '0'
+		assert tcl.eval('set result') == ''
+
+	assert len(bells) == 2
+
+
+def test_edithook_does_not_raise_tclerror_to_tcl():
+	tcl, hook, bells = hooked_widget()
+
+	assert tcl.eval('catch {.w index sel.first} result') == '0'
+	assert tcl.eval('set result') == ''
+	assert bells == []
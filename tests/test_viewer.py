@@ -0,0 +1,53 @@
+import mmap
+
+from simple_editor import viewer
+
+
+def open_view(path):
+	view = viewer.FileView(path)
+	if view.index.is_alive():
+		view.index.join()
+	return view
+
+
+def test_lines_and_find(tmp_path):
+	path = tmp_path / 'big.txt'
+	path.write_text(''.join('line %d\n' % i for i in range(1000)))
+	view = open_view(path)
+
+	assert view.lines() == 1001
+	assert view.text(200, 2) == 'line 200\nline 201'
+	assert view.find('line 999', 0, 0) == (999, 0)
+	assert view.find('line 5', 999, 0) == (5, 0)
+
+	view.close()
+
+
+def test_truncated_file_is_mapped_again(tmp_path):
+	path = tmp_path / 'log.txt'
+	path.write_bytes(b'x' * 100 + b'\n' + b'y' * 10 * mmap.PAGESIZE)
+	view = open_view(path)
+	assert view.lines() == 2
+
+	# Reading old mapping past new end would be SIGBUS
+	with open(path, 'r+b') as f:
+		f.truncate(10)
+
+	assert view.check()
+	view.index.join()
+	assert view.text(0, 10) == 'x' * 10
+	assert view.size() == 10
+	assert view.find('y', 0, 0) is None
+
+	view.close()
+
+
+def test_empty_file(tmp_path):
+	path = tmp_path / 'empty.txt'
+	path.write_bytes(b'')
+	view = open_view(path)
+
+	assert view.lines() == 1
+	assert view.text(0, 10) == ''
+
+	view.close()